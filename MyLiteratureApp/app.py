@@ -1,13 +1,45 @@
 # literature_reviewer_web_optimized.py
 import streamlit as st
 import pandas as pd
-import openpyxl
-from openpyxl.styles import PatternFill
+import numpy as np
 import os
+import io
+import html
 import tempfile
+import itertools
+import re
+import sys
+import sqlite3
+import threading
+import time
 import warnings
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from screening.decisions import STATUS_CODES, STATUS_LABELS, DecisionStore, get_record_note
+from screening.ingest import (
+    INGEST_CACHE_DIR, detect_column_candidates, file_content_hash, load_cached_frame, prepare_frame,
+    screening_columns, store_cached_frame, store_upload_source,
+)
+from screening.reader import read_workbook_frame, read_workbook_header, sample_frame
+from screening.citations import CITATION_SUFFIXES
+from screening.merge import merge_frames, merged_file_hash
+from screening.resume import is_results_workbook, load_results_workbook
+from screening.journal import JOURNAL_PATH, DecisionJournal, restore_decisions
+from screening.review import ReviewBoard
+from screening.dedup import dedup_texts, find_duplicate_groups
+from screening.search import SearchIndex, search_texts
+from screening.rules import RULE_FIELDS, evaluate_rules
+from screening.ranking import RANK_RETRAIN_EVERY, build_feature_matrix, train_ranker
+from screening.export import write_changes_workbook, write_results_workbook
+from screening.metrics import METRICS_ENABLED, MetricsRegistry, RunTimer
+from screening.project import PROJECT_SUFFIXES, is_project_file, load_project, save_project
+from screening.queues import ColumnValueIndex, ScreeningQueue, note_presence
+
 # 忽略警告
 warnings.filterwarnings('ignore')
 
@@ -149,10 +181,15 @@ def initialize_session_state():
         'df': None,
         'column_mapping': {},
         'current_index': 0,
-        'selections': {},
-        'notes': {},
+        'decisions': None,
         'file_processed': False,
         'current_filename': None,
+        'file_hash': None,
+        'source_path': None,
+        'source_columns': None,
+        'df_complete': False,
+        'sample_df': None,
+        'progressive_load': True,
         'show_column_mapping': False,
         'mapping_confirmed': False,
         'auto_advance': True,
@@ -161,216 +198,944 @@ def initialize_session_state():
         'font_size_translation': 14,
         'extra_columns': {},
         'show_extra_columns': True,
-        'should_auto_advance': False,  # 新增：自动跳转标记
-        'current_note': ''  # 新增：当前备注临时存储
+        'dup_groups': None,
+        'priority_mode': False,
+        'ranker': None,
+        'nav_history': [],
+        'render_cache': None,
+        'corpus': None,
+        'reviewer': '',
+        'review_board_csv': None,
+        'instrumentation': METRICS_ENABLED,
+        'run_timer': None,
+        'screening_mode': '逐篇卡片',
+        'table_version': 0,
+        'queue': None,
+        'export_job': None,
+        'last_export': None,
+        'pending_parse': None
     }
     
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
+# ====================== 文件导入 ======================
+def read_uploaded_workbook(uploaded_file):
+    """保存上传文件；相同内容的文件直接取共享文献库或缓存中的完整表格，否则句柄为None"""
+    data = uploaded_file.getvalue()
+    file_hash = file_content_hash(data)
+    suffix = os.path.splitext(uploaded_file.name)[1].lower() or '.xlsx'
+    source_path = store_upload_source(data, file_hash, suffix)
+    
+    return acquire_corpus(file_hash, lambda: load_cached_frame(file_hash)), file_hash, source_path
+
+def load_full_frame(file_hash, source_path):
+    """读取完整表格（用于导出），优先使用共享文献库和缓存"""
+    def load():
+        df = load_cached_frame(file_hash)
+        if df is None:
+            if not source_path or not os.path.exists(source_path):
+                raise FileNotFoundError("原始文件已从缓存中清除，请重新上传")
+            df = read_workbook_frame(source_path)
+            store_cached_frame(file_hash, df)
+        return df
+    
+    return acquire_corpus(file_hash, load).df
+
+def merge_uploaded_files(uploaded_files):
+    """合并多个上传文件，返回(句柄, 合并结果的哈希, 去除的重复篇数)
+    
+    各文件的解析结果和合并结果都写入导入缓存；同一组文件再次上传时直接取用，此时重复篇数为None。
+    """
+    names, hashes, paths = [], [], []
+    for uploaded_file in uploaded_files:
+        if is_project_file(uploaded_file.name):
+            raise ValueError("项目文件不能与其他文件合并，请单独上传")
+        data = uploaded_file.getvalue()
+        file_hash = file_content_hash(data)
+        suffix = os.path.splitext(uploaded_file.name)[1].lower() or '.xlsx'
+        names.append(uploaded_file.name)
+        hashes.append(file_hash)
+        paths.append(store_upload_source(data, file_hash, suffix))
+    
+    merged_hash = merged_file_hash(hashes)
+    result = {'duplicates': None}
+    
+    def load():
+        df = load_cached_frame(merged_hash)
+        if df is not None:
+            return df
+        
+        frames = []
+        for file_hash, path in zip(hashes, paths):
+            frame = load_cached_frame(file_hash)
+            if frame is None:
+                frame = read_workbook_frame(path)
+                store_cached_frame(file_hash, frame)
+            frames.append(frame)
+        df, result['duplicates'] = merge_frames(frames, names)
+        store_cached_frame(merged_hash, df)
+        return df
+    
+    return acquire_corpus(merged_hash, load), merged_hash, result['duplicates']
+
+# ====================== 共享文献库 ======================
+# 同一文件的文献表在进程内只保留一份，所有会话只读共享；
+# 会话只持有各自的决策和备注。会话结束后句柄被回收，无人使用的文献表随之释放。
+# 由文献表构建的索引等派生数据存放在同一条目中，随文献表一同释放。
+class CorpusHandle:
+    """会话持有的共享文献表引用"""
+    
+    def __init__(self, key, entry):
+        self.key = key
+        self.df = entry['df']
+        self.derived = entry['derived']
+
+@st.cache_resource
+def get_corpus_registry():
+    """进程内的共享文献库：(file_hash, 列) -> 条目"""
+    return {'lock': threading.Lock(), 'entries': {}}
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+def _prune_corpora(entries):
+    for key in [key for key, entry in entries.items() if not entry['handles']]:
+        del entries[key]
+
+def _corpus_key(file_hash, columns=None, variant=None):
+    """登记键(file_hash, 列)：完整表格为None，投影为列名元组；
+    项目文件和导出结果中的文献表与原始文件内容不同，以variant（如'project:<哈希>'）单独登记"""
+    if variant is not None:
+        return file_hash, variant
+    return file_hash, tuple(columns) if columns is not None else None
+
+def lookup_corpus(file_hash, columns=None, variant=None):
+    """取已登记的文献表句柄，未登记时返回None"""
+    key = _corpus_key(file_hash, columns, variant)
+    registry = get_corpus_registry()
+    with registry['lock']:
+        _prune_corpora(registry['entries'])
+        entry = registry['entries'].get(key)
+        if entry is None:
+            return None
+        handle = CorpusHandle(key, entry)
+        entry['handles'].add(handle)
+        return handle
+
+def acquire_corpus(file_hash, loader, columns=None, variant=None):
+    """取共享的只读文献表；未登记时调用loader读取并登记，loader返回None时结果为None
+    
+    columns为None表示完整表格，否则为只含这些列的投影；variant见_corpus_key。登记的表格不得原地修改。
+    """
+    handle = lookup_corpus(file_hash, columns, variant)
+    if handle is not None:
+        return handle
+    
+    # 读取在锁外进行；并发读取同一文件时以先登记的为准
+    df = loader()
+    if df is None:
+        return None
+    df = prepare_frame(df)
+    
+    key = _corpus_key(file_hash, columns, variant)
+    registry = get_corpus_registry()
+    with registry['lock']:
+        entry = registry['entries'].get(key)
+        if entry is None:
+            entry = {'df': df, 'handles': weakref.WeakSet(), 'nbytes': frame_nbytes(df), 'derived': {}}
+            registry['entries'][key] = entry
+        handle = CorpusHandle(key, entry)
+        entry['handles'].add(handle)
+        return handle
+
+def corpus_derived(handle, key, build):
+    """取文献表的派生数据，没有时调用build构建；同一文献表的各会话共享，随文献表一同释放"""
+    value = handle.derived.get(key)
+    if value is None:
+        value = build()
+        with get_corpus_registry()['lock']:
+            value = handle.derived.setdefault(key, value)
+    return value
+
+def use_corpus(handle):
+    """将文献表句柄设为当前会话的数据，释放之前持有的句柄"""
+    st.session_state.corpus = handle
+    st.session_state.df = handle.df if handle is not None else None
+
+def corpus_report():
+    """共享文献库中各文献表的行数、内存占用和使用中的会话数"""
+    registry = get_corpus_registry()
+    with registry['lock']:
+        _prune_corpora(registry['entries'])
+        rows = [{
+            '文件': file_hash[:8],
+            '列': '全部' if columns is None else '项目文件' if isinstance(columns, str) else f"{len(columns)} 列",
+            '行数': len(entry['df']),
+            '内存(MB)': round(entry['nbytes'] / 1024 ** 2, 1),
+            '会话数': len(entry['handles']),
+        } for (file_hash, columns), entry in registry['entries'].items()]
+    return pd.DataFrame(rows, columns=['文件', '列', '行数', '内存(MB)', '会话数'])
+
+def session_overhead():
+    """当前会话私有数据的内存占用（字节）"""
+    items = {}
+    df = st.session_state.df
+    if df is not None and st.session_state.corpus is None:
+        items['文献表（未共享）'] = frame_nbytes(df)
+    
+    decisions = st.session_state.decisions
+    if decisions is not None:
+        items['决策数组'] = decisions.status.nbytes + decisions.counts.nbytes
+        items['备注'] = sum(sys.getsizeof(note) for note in decisions.notes.values())
+    
+    cache = st.session_state.render_cache
+    if cache is not None:
+        items['卡片缓存'] = sum(
+            sys.getsizeof(value) for card in list(cache.cards.values())
+            for value in itertools.chain(card['fields'].values(),
+                                         (markup for extra in card['extra'].values() if extra for markup in extra))
+            if value is not None)
+    
+    ranker = st.session_state.ranker
+    if ranker is not None and ranker['probs'] is not None:
+        items['排序模型'] = ranker['probs'].nbytes + ranker['order'].nbytes
+    if st.session_state.dup_groups is not None:
+        items['重复分组'] = st.session_state.dup_groups.nbytes
+    if st.session_state.sample_df is not None:
+        items['样本行'] = frame_nbytes(st.session_state.sample_df)
+    return items
+
+# ====================== 性能监测 ======================
+@st.cache_resource
+def get_metrics_registry():
+    return MetricsRegistry()
+
+def start_run_timer(kind):
+    """开始一次运行的分阶段计时；未开启性能监测时只计时不记录"""
+    registry = get_metrics_registry() if st.session_state.instrumentation else None
+    ctx = get_script_run_ctx()
+    return RunTimer(registry, kind, ctx.session_id[:8] if ctx is not None else '')
+
+def finish_run_timer(timer):
+    """结束计时，开启性能监测时连同本会话的内存占用一起记录"""
+    memory = None
+    if timer.registry is not None:
+        memory = session_overhead()
+        handle = st.session_state.corpus
+        entry = get_corpus_registry()['entries'].get(handle.key) if handle is not None else None
+        if entry is not None:
+            memory['共享文献表'] = entry['nbytes']
+    timer.finish(memory)
+
+def run_instrumented(phase, render):
+    """在片段中调用render；整页运行时耗时计入主流程，片段单独重新运行时记录为一次'fragment'运行"""
+    timer = st.session_state.run_timer
+    if timer is not None and not timer.finished:
+        render()
+        return
+    
+    timer = start_run_timer('fragment')
+    timer.mark(phase)
+    render()
+    finish_run_timer(timer)
+
+def create_metrics_panel():
+    """侧边栏的性能监测面板"""
+    with st.expander("⏱️ 性能监测", expanded=False):
+        st.checkbox("记录各阶段耗时和内存占用", key="instrumentation",
+                    help="开启后每次运行的分阶段耗时写入metrics.jsonl，汇总指标写入Prometheus文本格式的metrics.prom")
+        if not st.session_state.instrumentation:
+            return
+        
+        registry = get_metrics_registry()
+        summary = registry.summary()
+        if summary.empty:
+            st.caption("下一次运行后显示统计")
+        else:
+            st.dataframe(summary, hide_index=True, use_container_width=True)
+        st.caption(f"指标文件：{registry.jsonl_path}、{registry.prom_path}")
+
+# ====================== 后台解析 ======================
+# 表头嗅探时读取的样本行数
+SNIFF_ROWS = 20
+
+# 后台解析线程数（进程内所有会话共享）
+INGEST_WORKERS = 2
+
+# 已完成的解析任务在最后一次被等待的会话查询后保留的秒数，超过后才会被清理
+INGEST_JOB_KEEP_SECONDS = 60
+
+@st.cache_resource
+def get_ingest_executor():
+    return ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix='ingest')
+
+@st.cache_resource
+def get_ingest_jobs():
+    """进程内的后台解析任务表：file_hash -> 任务信息"""
+    return {}
+
+def start_background_parse(file_hash, path, total_rows):
+    """在后台线程解析完整表格并写入导入缓存；同一文件只解析一次"""
+    jobs = get_ingest_jobs()
+    job = jobs.get(file_hash)
+    if job is not None and not (job['future'].done() and job['future'].exception()):
+        return job
+    
+    # 清理已完成且一段时间没有会话等待的任务，避免结果常驻内存
+    now = time.time()
+    for other_hash in [h for h, j in jobs.items()
+                       if j['future'].done() and now - j['polled'] > INGEST_JOB_KEEP_SECONDS]:
+        jobs.pop(other_hash, None)
+    
+    job = {'rows_done': 0, 'total_rows': total_rows, 'polled': now}
+    
+    def report(n_rows):
+        job['rows_done'] = n_rows
+    
+    def parse():
+        # 重新开始的任务（之前的结果已被领取或清理）直接使用导入缓存
+        df = load_cached_frame(file_hash)
+        if df is None:
+            df = read_workbook_frame(path, progress=report)
+            store_cached_frame(file_hash, df)
+        return df
+    
+    job['future'] = get_ingest_executor().submit(parse)
+    jobs[file_hash] = job
+    return job
+
+def collect_background_parse(file_hash):
+    """领取已完成的后台解析结果；未完成时返回None，失败时抛出异常"""
+    jobs = get_ingest_jobs()
+    job = jobs.get(file_hash)
+    if job is None or not job['future'].done():
+        return None
+    jobs.pop(file_hash, None)
+    return job['future'].result()
+
+def adopt_parsed_frame(handle):
+    """使用解析完成的完整表格"""
+    use_corpus(handle)
+    st.session_state.df_complete = True
+    st.session_state.pending_parse = None
+    start_screening(len(handle.df))
+
+def poll_pending_parse():
+    """检查本会话等待的后台解析，返回job；完整表格可用时直接使用并返回None，解析失败时清除等待状态
+    
+    同一文件的任务可能已被其他会话领取或清理：共享文献库中有完整表格时直接使用，都没有时重新开始解析。
+    """
+    file_hash = st.session_state.file_hash
+    pending = st.session_state.pending_parse
+    handle = lookup_corpus(file_hash)
+    job = get_ingest_jobs().get(file_hash)
+    if handle is None and job is None:
+        job = start_background_parse(file_hash, st.session_state.source_path, pending['total_rows'])
+    
+    if handle is None:
+        job['polled'] = time.time()
+        try:
+            df = collect_background_parse(file_hash)
+        except Exception as e:
+            st.session_state.pending_parse = None
+            st.session_state.mapping_confirmed = False
+            st.error(f"读取文件失败: {str(e)}")
+            return None
+        if df is None:
+            return job
+        handle = acquire_corpus(file_hash, lambda: df)
+    
+    adopt_parsed_frame(handle)
+    return None
+
+@st.fragment(run_every=0.5)
+def ingest_progress_fragment():
+    """显示后台解析进度，完成后刷新整个页面"""
+    if st.session_state.df is not None or st.session_state.pending_parse is None:
+        return
+    
+    job = poll_pending_parse()
+    if st.session_state.df is not None:
+        st.rerun()
+    if job is None:
+        return
+    
+    total_rows = job['total_rows']
+    rows_done = job['rows_done']
+    if total_rows:
+        st.progress(min(rows_done / total_rows, 1.0), text=f"后台解析中：{rows_done}/{total_rows} 行")
+    else:
+        st.progress(0.0, text=f"后台解析中：{rows_done} 行")
+
+# ====================== 自动保存日志 ======================
+@st.cache_resource
+def get_journal():
+    return DecisionJournal(JOURNAL_PATH)
+
+def restore_from_journal(file_hash, decisions):
+    """从自动保存日志恢复当前筛选人的决策，并登记到多人对照表，返回恢复的分类数"""
+    reviewer = st.session_state.reviewer
+    try:
+        journal = get_journal()
+        restored = restore_decisions(journal, file_hash, decisions, reviewer)
+        if reviewer:
+            ensure_review_board(file_hash, len(decisions)).add_reviewer(reviewer, decisions.status)
+    except sqlite3.Error as e:
+        st.warning(f"读取自动保存记录失败: {str(e)}")
+        return 0
+    
+    if restored:
+        unscreened = np.flatnonzero(decisions.status == 0)
+        st.session_state.current_index = int(unscreened[0]) if len(unscreened) else len(decisions) - 1
+        st.info(f"已从自动保存记录恢复 {restored} 条筛选结果")
+    return restored
+
+def start_screening(size):
+    """为当前文件创建决策存储，并从自动保存日志恢复之前的进度"""
+    decisions = DecisionStore(size)
+    st.session_state.decisions = decisions
+    st.session_state.current_index = 0
+    
+    file_hash = st.session_state.file_hash
+    if file_hash:
+        restore_from_journal(file_hash, decisions)
+
+def record_decision(pos, label):
+    """记录分类并写入自动保存日志"""
+    st.session_state.decisions.set(pos, label)
+    update_queue([pos])
+    file_hash, reviewer = st.session_state.file_hash, st.session_state.reviewer
+    if file_hash:
+        get_journal().append(file_hash, pos, 'status', label, reviewer)
+        if reviewer:
+            ensure_review_board(file_hash, len(st.session_state.decisions)).set(reviewer, [pos], label)
+
+def record_decisions(positions, label, note=None):
+    """批量记录分类（可附带相同的备注）并写入自动保存日志"""
+    positions = np.asarray(positions, dtype=np.int64)
+    if not len(positions):
+        return
+    
+    decisions = st.session_state.decisions
+    decisions.set_many(positions, label)
+    if note is not None:
+        for pos in positions.tolist():
+            decisions.set_note(pos, note)
+    update_queue(positions)
+    
+    file_hash, reviewer = st.session_state.file_hash, st.session_state.reviewer
+    if file_hash:
+        journal = get_journal()
+        journal.append_many(file_hash, positions.tolist(), 'status', [label] * len(positions), reviewer)
+        if note is not None:
+            journal.append_many(file_hash, positions.tolist(), 'note', [note] * len(positions), reviewer)
+        if reviewer:
+            ensure_review_board(file_hash, len(decisions)).set(reviewer, positions, label)
+
+def record_note(pos, note):
+    """记录备注并写入自动保存日志"""
+    st.session_state.decisions.set_note(pos, note)
+    update_queue([pos])
+    if st.session_state.file_hash:
+        get_journal().append(st.session_state.file_hash, pos, 'note', note, st.session_state.reviewer)
+
+# ====================== 多人筛选 ======================
+# 多位审阅人在各自的会话中独立筛选同一文件，决策按审阅人写入同一日志；
+# 进程内为每个文件维护一张对照表，增量更新两两之间的一致性统计
+@st.cache_resource
+def get_review_boards():
+    """进程内的多人筛选对照表：file_hash -> ReviewBoard"""
+    return {'lock': threading.Lock(), 'boards': {}}
+
+def ensure_review_board(file_hash, size):
+    """取文件的多人筛选对照表，首次使用时从日志载入所有审阅人的决策"""
+    registry = get_review_boards()
+    with registry['lock']:
+        board = registry['boards'].get(file_hash)
+        if board is None or board.size != size:
+            board = ReviewBoard(size)
+            journal = get_journal()
+            for reviewer in journal.reviewers(file_hash):
+                decisions = DecisionStore(size)
+                restore_decisions(journal, file_hash, decisions, reviewer)
+                board.add_reviewer(reviewer, decisions.status)
+            registry['boards'][file_hash] = board
+    return board
+
+def change_reviewer():
+    """切换审阅人：按新审阅人重新载入决策"""
+    st.session_state.reviewer = st.session_state.reviewer_input.strip()
+    st.session_state.ranker = None
+    st.session_state.nav_history = []
+    st.session_state.review_board_csv = None
+    if st.session_state.df is not None:
+        start_screening(len(st.session_state.df))
+
+def jump_to_next_conflict():
+    board = ensure_review_board(st.session_state.file_hash, len(st.session_state.df))
+    pos = board.next_conflict(st.session_state.current_index)
+    if pos is not None:
+        move_to(pos)
+
+# ====================== 重复检测 ======================
+def resolve_duplicate_group(keep_pos):
+    """保留当前文献，将同簇其余文献标记为排除"""
+    dup_groups = st.session_state.dup_groups
+    others = np.flatnonzero(dup_groups == dup_groups[keep_pos])
+    others = others[others != keep_pos]
+    record_decisions(others, '排除', note=f"重复文献（保留 #{keep_pos + 1}）")
+
+# ====================== 全文检索 ======================
+def ensure_search_index(handle, column_mapping):
+    """在后台线程构建检索索引（每个文献表和映射只构建一次），返回Future"""
+    columns = tuple(column_mapping.get(key) for key in
+                    ('title', 'title_translation', 'abstract', 'abstract_translation'))
+    df = handle.df
+    return corpus_derived(handle, ('search', columns), lambda: get_ingest_executor().submit(
+        lambda: SearchIndex(search_texts(df, column_mapping))))
+
+def jump_to(pos):
+    """跳转到指定文献"""
+    move_to(int(pos))
+
+# ====================== 筛选视图 ======================
+# 视图只保存满足条件的位置数组，分类和备注变化时增量更新，上一篇/下一篇按二分查找定位
+def column_value_index(handle, col):
+    """文献表中某列的取值索引（每个文献表和列只构建一次）"""
+    return corpus_derived(handle, ('values', col), lambda: ColumnValueIndex(handle.df[col]))
+
+def active_queue():
+    """当前的筛选视图；换了文件（决策存储已替换）时视图失效"""
+    queue = st.session_state.queue
+    if queue is not None and queue.decisions is not st.session_state.decisions:
+        st.session_state.queue = queue = None
+    return queue
+
+def update_queue(positions):
+    queue = active_queue()
+    if queue is not None:
+        queue.update(positions)
+
+def view_positions():
+    """当前视图中的文献位置（升序），没有视图时为全部文献"""
+    queue = active_queue()
+    if queue is not None:
+        return queue.positions
+    return np.arange(len(st.session_state.df))
+
+def apply_queue(statuses, note, column_filters):
+    """按条件建立视图，并跳转到视图中当前位置之后的第一篇"""
+    df = st.session_state.df
+    static_mask = None
+    for col, (kind, value) in column_filters.items():
+        index = column_value_index(st.session_state.corpus, col)
+        mask = index.range_mask(*value) if kind == 'range' else index.value_mask(value)
+        static_mask = mask if static_mask is None else static_mask & mask
+    
+    note = {'有备注': True, '无备注': False}.get(note)
+    if not statuses and note is None and static_mask is None:
+        clear_queue()
+        return
+    
+    queue = ScreeningQueue(st.session_state.decisions, note_presence(df), statuses, note, static_mask)
+    st.session_state.queue = queue
+    st.session_state.nav_history = []
+    pos = queue.first_from(st.session_state.current_index)
+    if pos is not None:
+        st.session_state.current_index = pos
+
+def clear_queue():
+    st.session_state.queue = None
+
+# ====================== 规则预筛选 ======================
+def apply_rule_results(results):
+    """把规则评估结果批量写入决策存储（相同分类和原因的文献一次写入）"""
+    for (label, note), group in results.groupby(['label', 'note'], sort=False):
+        record_decisions(group['pos'].to_numpy(), label, note=note)
+
+# ====================== 优先级排序 ======================
+def ensure_feature_matrix(handle, column_mapping):
+    """在后台线程构建特征矩阵（每个文献表和映射只构建一次），返回Future"""
+    columns = tuple(column_mapping.get(key) for key in
+                    ('title', 'title_translation', 'abstract', 'abstract_translation'))
+    df = handle.df
+    return corpus_derived(handle, ('features', columns), lambda: get_ingest_executor().submit(
+        lambda: build_feature_matrix(search_texts(df, column_mapping))))
+
+def update_ranker():
+    """收取已完成的训练结果；新增决策达到间隔时在后台重新训练"""
+    ranker = st.session_state.ranker
+    if ranker is None:
+        ranker = {'probs': None, 'order': None, 'trained_on': 0, 'future': None, 'pending_on': 0}
+        st.session_state.ranker = ranker
+    
+    if ranker['future'] is not None and ranker['future'].done():
+        future, ranker['future'] = ranker['future'], None
+        if future.exception() is None:
+            ranker['probs'] = future.result()
+            ranker['order'] = np.argsort(-ranker['probs'], kind='stable')
+            ranker['trained_on'] = ranker['pending_on']
+    
+    decisions = st.session_state.decisions
+    n_include, n_exclude = decisions.count('纳入'), decisions.count('排除')
+    labeled = n_include + n_exclude
+    if ranker['future'] is not None or not n_include or not n_exclude:
+        return ranker
+    if ranker['probs'] is not None and labeled - ranker['trained_on'] < RANK_RETRAIN_EVERY:
+        return ranker
+    
+    features = ensure_feature_matrix(st.session_state.corpus, st.session_state.column_mapping)
+    if not features.done():
+        return ranker
+    
+    # 待定的文献不参与训练
+    positions = np.flatnonzero(decisions.mask('纳入') | decisions.mask('排除'))
+    labels = decisions.status[positions] == STATUS_CODES['纳入']
+    ranker['pending_on'] = labeled
+    ranker['future'] = get_ingest_executor().submit(train_ranker, features.result(), positions, labels)
+    return ranker
+
+def estimated_remaining_relevant():
+    """未筛选文献的相关概率之和，作为剩余相关文献数的估计"""
+    ranker = st.session_state.ranker
+    if ranker is None or ranker['probs'] is None:
+        return None
+    return float(ranker['probs'][st.session_state.decisions.status == 0].sum())
+
+def next_position(current):
+    """下一篇：优先级模式下为相关概率最高的未筛选文献，否则按文件顺序"""
+    ranker = st.session_state.ranker
+    queue = active_queue()
+    if st.session_state.priority_mode and ranker is not None and ranker['order'] is not None:
+        order = ranker['order']
+        eligible = st.session_state.decisions.status[order] == 0
+        if queue is not None:
+            eligible &= queue.member[order]
+        candidates = order[eligible]
+        candidates = candidates[candidates != current]
+        if len(candidates):
+            return int(candidates[0])
+    if queue is not None:
+        pos = queue.next_after(current)
+        return current if pos is None else pos
+    return min(current + 1, len(st.session_state.df) - 1)
+
+def has_next(current):
+    if st.session_state.priority_mode or active_queue() is not None:
+        return next_position(current) != current
+    return current < len(st.session_state.df) - 1
+
+def has_prev(current):
+    if st.session_state.priority_mode and st.session_state.nav_history:
+        return True
+    queue = active_queue()
+    if queue is not None:
+        return queue.prev_before(current) is not None
+    return current > 0
+
+def move_to(pos):
+    """跳转并记录浏览历史，供优先级模式下返回上一篇"""
+    if pos != st.session_state.current_index:
+        st.session_state.nav_history.append(st.session_state.current_index)
+        st.session_state.current_index = pos
+
+# ====================== 卡片渲染缓存 ======================
+# 预渲染当前文献之后/之前的篇数
+RENDER_AHEAD = 10
+RENDER_BEHIND = 3
+
+# 每个会话最多缓存的卡片数，超出时淘汰最久未使用的
+RENDER_CACHE_SIZE = 256
+
+# 卡片中的原文/翻译字段：(映射键, 样式模板)
+CARD_FIELDS = {
+    'title': '<div style="margin-bottom: 15px; padding: 10px; background-color: #f8f9fa; border-radius: 4px; font-size: 18px;">{}</div>',
+    'abstract': '<div style="white-space: pre-wrap; line-height: 1.6; margin-bottom: 20px; font-size: {font_abstract}px;">{}</div>',
+    'title_translation': '<div style="margin-bottom: 15px; padding: 10px; background-color: #e8f5e9; border-radius: 4px; font-size: 18px;">{}</div>',
+    'abstract_translation': '<div style="white-space: pre-wrap; line-height: 1.6; margin-bottom: 20px; font-size: {font_translation}px;">{}</div>',
+}
+EXTRA_VALUE_TEMPLATE = '<div style="padding: 8px; background-color: #f8f9fa; border-radius: 4px; margin-bottom: 10px;">{}</div>'
+
+# 自定义列超过该长度时改用只读文本框显示
+EXTRA_INLINE_CHARS = 200
+
+@st.cache_resource
+def get_render_executor():
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='render')
+
+def render_signature(df, column_mapping, extra_columns, font_sizes):
+    """影响卡片内容的设置；任一变化时缓存失效"""
+    return (id(df), tuple(sorted(column_mapping.items())), tuple(extra_columns), font_sizes)
+
+def render_cards(df, positions, column_mapping, extra_columns, font_sizes):
+    """批量生成卡片：字段值已HTML转义并套入样式，空值为None"""
+    fields = {key: column_mapping.get(key) for key in CARD_FIELDS}
+    fields = {key: col for key, col in fields.items() if col and col in df.columns}
+    extras = [col for col in extra_columns if col in df.columns]
+    
+    rows = df.iloc[positions]
+    font_abstract, font_translation = font_sizes
+    field_values = {key: rows[col].tolist() for key, col in fields.items()}
+    extra_values = {col: rows[col].tolist() for col in extras}
+    
+    cards = {}
+    for i, pos in enumerate(positions):
+        card = {'fields': {}, 'extra': {}}
+        for key, values in field_values.items():
+            value = values[i]
+            card['fields'][key] = None if pd.isna(value) else CARD_FIELDS[key].format(
+                html.escape(str(value)), font_abstract=font_abstract, font_translation=font_translation)
+        for col, values in extra_values.items():
+            value = values[i]
+            if pd.isna(value):
+                card['extra'][col] = None
+                continue
+            text = str(value)
+            markup = EXTRA_VALUE_TEMPLATE.format(html.escape(text)) if len(text) <= EXTRA_INLINE_CHARS else None
+            card['extra'][col] = (text, markup)
+        cards[int(pos)] = card
+    return cards
+
+class RenderCache:
+    """每个会话的卡片LRU缓存；后台线程预渲染邻近文献"""
+    
+    def __init__(self, max_size=RENDER_CACHE_SIZE):
+        self.max_size = max_size
+        self.cards = OrderedDict()
+        self.signature = None
+        self.future = None
+        self.lock = threading.Lock()
+    
+    def _reset(self, signature):
+        if signature != self.signature:
+            self.cards.clear()
+            self.signature = signature
+    
+    def _store(self, signature, cards):
+        with self.lock:
+            if signature != self.signature:
+                return
+            for pos, card in cards.items():
+                self.cards[pos] = card
+                self.cards.move_to_end(pos)
+            while len(self.cards) > self.max_size:
+                self.cards.popitem(last=False)
+    
+    def get(self, df, pos, column_mapping, extra_columns, font_sizes):
+        """取出一篇文献的卡片；未命中时在当前线程渲染"""
+        signature = render_signature(df, column_mapping, extra_columns, font_sizes)
+        with self.lock:
+            self._reset(signature)
+            card = self.cards.get(pos)
+            if card is not None:
+                self.cards.move_to_end(pos)
+                return card
+        card = render_cards(df, [pos], column_mapping, extra_columns, font_sizes)[pos]
+        self._store(signature, {pos: card})
+        return card
+    
+    def prefetch(self, df, positions, column_mapping, extra_columns, font_sizes):
+        """在后台渲染尚未缓存的文献；上一批未完成时跳过"""
+        signature = render_signature(df, column_mapping, extra_columns, font_sizes)
+        with self.lock:
+            self._reset(signature)
+            if self.future is not None and not self.future.done():
+                return
+            missing = [pos for pos in dict.fromkeys(positions) if pos not in self.cards]
+        if not missing:
+            return
+        
+        # 传入设置的副本，避免会话中的字典在渲染过程中被修改
+        column_mapping, extra_columns = dict(column_mapping), list(extra_columns)
+        
+        def work():
+            self._store(signature, render_cards(df, missing, column_mapping, extra_columns, font_sizes))
+        
+        self.future = get_render_executor().submit(work)
+
+def upcoming_positions(current, ahead=RENDER_AHEAD, behind=RENDER_BEHIND):
+    """按导航顺序列出接下来及之前可能浏览的文献"""
+    n = len(st.session_state.df)
+    ranker = st.session_state.ranker
+    if st.session_state.priority_mode and ranker is not None and ranker['order'] is not None:
+        order = ranker['order']
+        candidates = order[st.session_state.decisions.status[order] == 0]
+        following = [int(pos) for pos in candidates[:ahead + 1] if pos != current][:ahead]
+        previous = st.session_state.nav_history[-behind:]
+    else:
+        following = list(range(current + 1, min(current + 1 + ahead, n)))
+        previous = list(range(max(current - behind, 0), current))
+    return following + previous
+
+def current_card(df, current_idx):
+    """取当前文献的卡片，并预渲染邻近文献"""
+    cache = st.session_state.render_cache
+    if cache is None:
+        cache = st.session_state.render_cache = RenderCache()
+    args = (st.session_state.column_mapping, st.session_state.extra_columns,
+            (st.session_state.font_size_abstract, st.session_state.font_size_translation))
+    card = cache.get(df, current_idx, *args)
+    cache.prefetch(df, upcoming_positions(current_idx), *args)
+    return card
+
 # ====================== 核心回调函数 ======================
 def go_prev():
     """安全跳转到上一篇"""
-    if st.session_state.current_index > 0:
+    queue = active_queue()
+    if st.session_state.priority_mode and st.session_state.nav_history:
+        st.session_state.current_index = st.session_state.nav_history.pop()
+    elif queue is not None:
+        pos = queue.prev_before(st.session_state.current_index)
+        if pos is not None:
+            st.session_state.current_index = pos
+    elif st.session_state.current_index > 0:
         st.session_state.current_index -= 1
 
 def go_next():
     """安全跳转到下一篇"""
-    df = st.session_state.df
-    if st.session_state.current_index < len(df) - 1:
-        st.session_state.current_index += 1
+    if has_next(st.session_state.current_index):
+        move_to(next_position(st.session_state.current_index))
 
 def handle_classification(selection):
     """处理分类选择的回调函数"""
-    df = st.session_state.df
     current_idx = st.session_state.current_index
     
-    # 保存当前备注
-    note_key = f"note_{current_idx}"
-    if st.session_state.current_note:
-        st.session_state.notes[note_key] = st.session_state.current_note
-    
-    # 记录分类选择
-    st.session_state.selections[current_idx] = selection
+    # 记录分类选择（备注在编辑时已由handle_note_change保存）
+    record_decision(current_idx, selection)
     
-    # 设置自动跳转标记（如果启用）
-    if st.session_state.auto_advance and current_idx < len(df) - 1:
-        st.session_state.should_auto_advance = True
+    # 自动跳转（如果启用）：回调在渲染前执行，无需额外的重新运行
+    if st.session_state.auto_advance and has_next(current_idx):
+        move_to(next_position(current_idx))
+
+def handle_note_change(pos):
+    """备注输入框修改后的回调函数"""
+    record_note(pos, st.session_state[f"note_{pos}"])
 
 def toggle_auto_advance():
     """切换自动跳转状态"""
     st.session_state.auto_advance = not st.session_state.auto_advance
 
-# ====================== 工具函数 ======================
-def detect_column_candidates(df):
-    """检测可能的列名候选"""
-    columns = df.columns.tolist()
-    candidates = {
-        'title': [],
-        'title_translation': [],
-        'abstract': [],
-        'abstract_translation': []
+# ====================== 保存结果 ======================
+# 导出在有界线程池中基于提交时的决策快照运行，导出期间可以继续筛选
+EXPORT_WORKERS = 2
+EXPORT_DIR = os.path.join(INGEST_CACHE_DIR, 'exports')
+
+# 导出文件保留的时间（秒），提交新的导出时清理过期文件
+EXPORT_RETENTION_SECONDS = 24 * 3600
+
+@st.cache_resource
+def get_export_executor():
+    return ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix='export')
+
+def prune_export_files():
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    deadline = time.time() - EXPORT_RETENTION_SECONDS
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < deadline:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
+def last_export():
+    """当前文件最近一次成功的导出任务，增量导出以它的决策快照为基准；换了文件时失效"""
+    job = st.session_state.last_export
+    if job is not None and job['source'] is not st.session_state.decisions:
+        st.session_state.last_export = job = None
+    return job
+
+def start_export_job(changes_only=False):
+    """提交后台导出任务，进度按工作表记录在任务中
+    
+    changes_only为True时只导出自上次导出以来分类或备注有变化的文献。
+    """
+    if st.session_state.df is None:
+        st.error("没有数据可保存")
+        return
+    
+    baseline = last_export()['decisions'] if changes_only else None
+    decisions = st.session_state.decisions.snapshot()
+    df = st.session_state.df if st.session_state.df_complete else None
+    file_hash, source_path = st.session_state.file_hash, st.session_state.source_path
+    
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    prune_export_files()
+    fd, path = tempfile.mkstemp(suffix='.xlsx', dir=EXPORT_DIR)
+    os.close(fd)
+    
+    timer = start_run_timer('export')
+    prefix = '文献筛选变更' if changes_only else '文献筛选结果'
+    job = {
+        'path': path,
+        'file_name': f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+        'source': st.session_state.decisions,
+        'decisions': decisions,
+        'changes_only': changes_only,
+        'stage': '排队中',
+        'sheets': {},
+        'started': time.time(),
+        'elapsed': None,
     }
+    clock = timer.stage_clock('export')
     
-    # 常见列名关键词
-    title_keywords = ['标题', 'title', '题名', '篇名', '文章标题', '题目', 'ti']
-    translation_keywords = ['翻译', 'translation', '英文', 'english', 'en']
-    abstract_keywords = ['摘要', 'abstract', '概要', '内容简介', '文章摘要', 'ab']
+    def on_stage(name):
+        job['stage'] = name
+        clock(name)
     
-    for col in columns:
-        col_lower = str(col).lower()
-        
-        # 检查标题
-        if any(keyword in col_lower for keyword in title_keywords):
-            if any(keyword in col_lower for keyword in translation_keywords):
-                candidates['title_translation'].append(col)
-            else:
-                candidates['title'].append(col)
-        
-        # 检查摘要
-        elif any(keyword in col_lower for keyword in abstract_keywords):
-            if any(keyword in col_lower for keyword in translation_keywords):
-                candidates['abstract_translation'].append(col)
-            else:
-                candidates['abstract'].append(col)
+    def progress(sheet, done, total):
+        job['sheets'][sheet] = (done, total)
     
-    return candidates
-
-def save_results():
-    """保存处理结果到Excel（包含四个工作表）"""
-    if st.session_state.df is None:
-        st.error("没有数据可保存")
-        return None
+    def run():
+        on_stage('load')
+        export_df = df
+        if export_df is None:
+            # 筛选时只加载了部分列，导出时再读取完整表格
+            export_df = load_full_frame(file_hash, source_path)
+        if changes_only:
+            on_stage('changes')
+            write_changes_workbook(path, export_df, decisions, baseline, progress=progress)
+        else:
+            write_results_workbook(path, export_df, decisions, on_stage=on_stage, progress=progress,
+                                   file_hash=file_hash)
+        job['elapsed'] = time.time() - job['started']
+        timer.finish()
+        return path
     
-    df = st.session_state.df
+    job['future'] = get_export_executor().submit(run)
+    st.session_state.export_job = job
+
+def read_export_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+@st.fragment(run_every=0.5)
+def export_progress_fragment():
+    """显示后台导出的进度，完成后刷新整个页面以显示下载按钮"""
+    job = st.session_state.export_job
+    if job is None:
+        return
+    if job['future'].done():
+        st.rerun()
     
-    # 创建结果DataFrame（主工作表）
-    result_df = df.copy()
-    
-    # 确保有备注列
-    if '备注' not in result_df.columns:
-        result_df['备注'] = ''
-    
-    # 更新备注
-    for i in range(len(result_df)):
-        note_key = f"note_{i}"
-        if note_key in st.session_state.notes:
-            result_df.at[i, '备注'] = st.session_state.notes[note_key]
-    
-    # 为每个分类创建DataFrame
-    include_indices = []
-    pending_indices = []
-    exclude_indices = []
-    
-    # 获取每个分类的索引
-    for idx in range(len(df)):
-        if idx in st.session_state.selections:
-            selection = st.session_state.selections[idx]
-            if selection == '纳入':
-                include_indices.append(idx)
-            elif selection == '待定':
-                pending_indices.append(idx)
-            elif selection == '排除':
-                exclude_indices.append(idx)
-    
-    # 创建分类DataFrame
-    df_include = df.iloc[include_indices].copy() if include_indices else pd.DataFrame(columns=df.columns)
-    df_pending = df.iloc[pending_indices].copy() if pending_indices else pd.DataFrame(columns=df.columns)
-    df_exclude = df.iloc[exclude_indices].copy() if exclude_indices else pd.DataFrame(columns=df.columns)
-    
-    # 为分类DataFrame添加备注
-    for idx in include_indices:
-        note_key = f"note_{idx}"
-        if note_key in st.session_state.notes:
-            df_include.at[idx, '备注'] = st.session_state.notes[note_key]
-    
-    for idx in pending_indices:
-        note_key = f"note_{idx}"
-        if note_key in st.session_state.notes:
-            df_pending.at[idx, '备注'] = st.session_state.notes[note_key]
-    
-    for idx in exclude_indices:
-        note_key = f"note_{idx}"
-        if note_key in st.session_state.notes:
-            df_exclude.at[idx, '备注'] = st.session_state.notes[note_key]
-    
-    # 保存到临时文件
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            temp_path = tmp_file.name
-            
-            # 使用pandas的ExcelWriter写入多个工作表
-            with pd.ExcelWriter(temp_path, engine='openpyxl') as writer:
-                # 写入主工作表（所有文献）
-                result_df.to_excel(writer, sheet_name='所有文献', index=False)
-                
-                # 写入分类工作表
-                df_include.to_excel(writer, sheet_name='纳入文章', index=False)
-                df_pending.to_excel(writer, sheet_name='待定文章', index=False)
-                df_exclude.to_excel(writer, sheet_name='排除文章', index=False)
-            
-            # 重新打开工作簿设置颜色格式
-            wb = openpyxl.load_workbook(temp_path)
-            
-            # 为"所有文献"工作表设置颜色标记
-            ws_all = wb['所有文献']
-            
-            # 颜色填充定义
-            red_fill = PatternFill(start_color='FFFF0000', end_color='FFFF0000', fill_type='solid')
-            yellow_fill = PatternFill(start_color='FFFFFF00', end_color='FFFFFF00', fill_type='solid')
-            green_fill = PatternFill(start_color='FF90EE90', end_color='FF90EE90', fill_type='solid')
-            
-            # 从第二行开始（第一行是标题）
-            for i, row in enumerate(ws_all.iter_rows(min_row=2, max_row=len(df)+1), start=0):
-                if i in st.session_state.selections:
-                    selection = st.session_state.selections[i]
-                    cell = row[0]  # 第一列（序号列）
-                    
-                    if selection == '排除':
-                        cell.fill = red_fill
-                    elif selection == '待定':
-                        cell.fill = yellow_fill
-                    elif selection == '纳入':
-                        cell.fill = green_fill
-            
-            # 为分类工作表的序号列添加简单格式
-            for sheet_name, df_sheet in [('纳入文章', df_include), ('待定文章', df_pending), ('排除文章', df_exclude)]:
-                if sheet_name in wb.sheetnames and len(df_sheet) > 0:
-                    ws_sheet = wb[sheet_name]
-                    if sheet_name == '纳入文章':
-                        fill_color = PatternFill(start_color='FF90EE90', end_color='FF90EE90', fill_type='solid')
-                    elif sheet_name == '待定文章':
-                        fill_color = PatternFill(start_color='FFFFE0B2', end_color='FFFFE0B2', fill_type='solid')
-                    elif sheet_name == '排除文章':
-                        fill_color = PatternFill(start_color='FFFFCCCC', end_color='FFFFCCCC', fill_type='solid')
-                    
-                    for i, row in enumerate(ws_sheet.iter_rows(min_row=2, max_row=len(df_sheet)+1), start=1):
-                        cell = row[0]
-                        cell.fill = fill_color
-            
-            wb.save(temp_path)
-        
-        return temp_path
-        
-    except Exception as e:
-        st.error(f"保存文件时出错: {str(e)}")
-        return None
+    if job['stage'] == '排队中':
+        st.caption("导出任务排队中...")
+    for sheet, (done, total) in job['sheets'].items():
+        st.progress(done / total if total else 1.0, text=f"{sheet}：{done}/{total} 行")
+    st.caption(f"已用时 {time.time() - job['started']:.0f} 秒，导出期间可以继续筛选")
 
 def display_custom_column_value(value, col_name, current_idx):
-    """显示自定义列的值"""
-    if pd.isna(value):
-        return ""
-    
-    value_str = str(value)
-    if len(value_str) > 200:
+    """显示自定义列的值；value为渲染缓存中的(原文, 已转义的HTML)"""
+    value_str, markup = value
+    if markup is None:
         st.text_area("", value=value_str, height=100, 
                     key=f"extra_{col_name}_{current_idx}", disabled=True, label_visibility="collapsed")
     else:
-        st.markdown(f'<div style="padding: 8px; background-color: #f8f9fa; border-radius: 4px; margin-bottom: 10px;">{value_str}</div>', 
-                   unsafe_allow_html=True)
+        st.markdown(markup, unsafe_allow_html=True)
 
-def display_custom_columns_by_position(position, df, current_idx):
+def display_custom_columns_by_position(position, card, current_idx):
     """按位置显示自定义列"""
     if not st.session_state.extra_columns:
         return
@@ -394,21 +1159,87 @@ def display_custom_columns_by_position(position, df, current_idx):
     
     # 显示不折叠的列
     for col_name, col_config in direct_cols:
-        if col_name in df.columns:
-            value = df.iloc[current_idx][col_name]
-            if pd.notna(value):
-                st.markdown(f"**{col_config['display_name']}**")
-                display_custom_column_value(value, col_name, current_idx)
+        value = card['extra'].get(col_name)
+        if value is not None:
+            st.markdown(f"**{col_config['display_name']}**")
+            display_custom_column_value(value, col_name, current_idx)
     
     # 显示折叠的列
     if collapsed_cols:
         with st.expander("📋 更多信息", expanded=False):
             for col_name, col_config in collapsed_cols:
-                if col_name in df.columns:
-                    value = df.iloc[current_idx][col_name]
-                    if pd.notna(value):
-                        st.markdown(f"**{col_config['display_name']}**")
-                        display_custom_column_value(value, col_name, current_idx)
+                value = card['extra'].get(col_name)
+                if value is not None:
+                    st.markdown(f"**{col_config['display_name']}**")
+                    display_custom_column_value(value, col_name, current_idx)
+
+# ====================== 项目文件 ======================
+def open_uploaded_project(uploaded_file):
+    """打开项目文件：文献表内存映射后登记到共享文献库，恢复列映射、显示列配置、决策和备注
+    
+    上传的是导出的结果文件时，按各分类工作表恢复决策，备注列中的备注载入决策存储。
+    之后在文件中的决策之上重放自动保存日志，恢复保存之后继续筛选的进度。
+    """
+    data = uploaded_file.getvalue()
+    project_hash = file_content_hash(data)
+    suffix = os.path.splitext(uploaded_file.name)[1].lower()
+    path = store_upload_source(data, project_hash, suffix)
+    project = load_project(path) if is_project_file(uploaded_file.name) else load_results_workbook(path)
+    
+    # 会话使用原始文件的哈希，与上传Excel时共用自动保存日志和多人对照表；
+    # 文献表按项目文件自身的哈希单独登记，不与原始文件解析出的表格互相替换
+    file_hash = project.file_hash or project_hash
+    handle = acquire_corpus(file_hash, lambda: project.df, variant=f"project:{project_hash}")
+    use_corpus(handle)
+    st.session_state.df_complete = True
+    st.session_state.pending_parse = None
+    st.session_state.source_columns = handle.df.columns.tolist()
+    st.session_state.sample_df = None
+    st.session_state.source_path = path
+    st.session_state.current_filename = uploaded_file.name
+    st.session_state.file_hash = file_hash
+    st.session_state.file_processed = True
+    st.session_state.show_column_mapping = False
+    st.session_state.column_mapping = project.column_mapping
+    st.session_state.extra_columns = project.extra_columns
+    st.session_state.mapping_confirmed = bool(project.column_mapping)
+    st.session_state.decisions = project.decisions
+    st.session_state.current_index = project.current_index
+    st.session_state.dup_groups = None
+    st.session_state.ranker = None
+    st.session_state.nav_history = []
+    st.session_state.render_cache = None
+    st.session_state.review_board_csv = None
+    
+    if restore_from_journal(file_hash, project.decisions):
+        project.current_index = st.session_state.current_index
+    return project
+
+def save_project_file():
+    """保存项目文件到临时路径"""
+    if st.session_state.df is None:
+        st.error("没有数据可保存")
+        return None
+    
+    try:
+        df = st.session_state.df
+        if not st.session_state.df_complete:
+            df = load_full_frame(st.session_state.file_hash, st.session_state.source_path)
+        
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.feather') as tmp_file:
+            temp_path = tmp_file.name
+        
+        save_project(temp_path, df, st.session_state.decisions,
+                     file_hash=st.session_state.file_hash,
+                     column_mapping=st.session_state.column_mapping,
+                     extra_columns=st.session_state.extra_columns,
+                     current_index=st.session_state.current_index)
+        
+        return temp_path
+        
+    except Exception as e:
+        st.error(f"保存项目文件时出错: {str(e)}")
+        return None
 
 # ====================== 字体大小设置界面 ======================
 def create_font_settings_ui():
@@ -449,10 +1280,440 @@ def create_font_settings_ui():
             st.session_state.font_size_translation = 14
             st.success("字体大小已重置")
 
+# ====================== 规则预筛选界面 ======================
+def _split_lines(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+def create_rules_ui(df):
+    """创建规则预筛选界面"""
+    with st.expander("🧹 规则预筛选", expanded=False):
+        exclude_text = st.text_area("排除关键词（每行一个）", key="rule_exclude",
+                                    placeholder="review\n综述\nmice")
+        include_text = st.text_area("命中后标记的关键词（每行一个）", key="rule_include",
+                                    placeholder="randomized\n随机对照")
+        include_label = st.radio("命中上述关键词时标记为", options=['待定', '纳入'], horizontal=True,
+                                 key="rule_include_label")
+        use_regex = st.checkbox("关键词按正则表达式匹配", key="rule_regex")
+        
+        field_options = [key for key in RULE_FIELDS if st.session_state.column_mapping.get(key)]
+        fields = st.multiselect("匹配范围", options=field_options,
+                                default=[key for key in ('title', 'abstract') if key in field_options],
+                                format_func=RULE_FIELDS.get, key="rule_fields")
+        
+        conditions = []
+        other_columns = [""] + [col for col in df.columns if col not in ('序号', '备注')]
+        
+        range_col = st.selectbox("数值范围条件列（如年份）", options=other_columns, key="rule_range_col")
+        if range_col:
+            col_min, col_max = st.columns(2)
+            with col_min:
+                low = st.number_input("最小值", value=None, step=1.0, key="rule_range_min")
+            with col_max:
+                high = st.number_input("最大值", value=None, step=1.0, key="rule_range_max")
+            if low is not None or high is not None:
+                conditions.append({'column': range_col, 'op': 'between', 'value': [low, high]})
+        
+        value_col = st.selectbox("取值条件列（如期刊）", options=other_columns, key="rule_value_col")
+        if value_col:
+            value_mode = st.radio("取值条件", options=['in', 'not_in'], horizontal=True, key="rule_value_mode",
+                                  format_func=lambda op: '只保留以下取值' if op == 'in' else '排除以下取值')
+            values = _split_lines(st.text_area("取值（每行一个）", key="rule_values"))
+            if values:
+                conditions.append({'column': value_col, 'op': value_mode, 'value': values})
+        
+        only_unscreened = st.checkbox("仅处理尚未分类的文献", value=True, key="rule_only_unscreened")
+        
+        rules = {
+            'exclude_keywords': _split_lines(exclude_text),
+            'include_keywords': _split_lines(include_text),
+            'include_label': include_label,
+            'use_regex': use_regex,
+            'fields': fields,
+            'conditions': conditions,
+            'only_unscreened': only_unscreened,
+        }
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            preview = st.button("预览结果", use_container_width=True, key="rule_preview")
+        with col2:
+            apply = st.button("应用规则", type="primary", use_container_width=True, key="rule_apply")
+        
+        if preview or apply:
+            try:
+                results = evaluate_rules(df, st.session_state.column_mapping, rules,
+                                         st.session_state.decisions.status)
+            except (KeyError, ValueError, re.error) as e:
+                st.error(f"规则有误: {str(e)}")
+                return
+            
+            summary = results.groupby('label').size()
+            if results.empty:
+                st.info("没有文献命中规则")
+            elif apply:
+                apply_rule_results(results)
+                st.success("已批量标记：" + "，".join(f"{label} {count} 篇" for label, count in summary.items()))
+            else:
+                st.write("将要标记：" + "，".join(f"**{label}** {count} 篇" for label, count in summary.items()))
+                st.dataframe(results['note'].value_counts().rename('篇数'), use_container_width=True)
+
+# ====================== 筛选视图界面 ======================
+def create_queue_ui(df):
+    """按分类状态、备注和额外列取值建立视图，上一篇/下一篇只在视图中移动"""
+    st.header("🗂️ 筛选视图")
+    
+    queue = active_queue()
+    statuses = st.multiselect("分类状态", options=STATUS_LABELS, key="queue_statuses", placeholder="不限")
+    note = st.selectbox("备注", options=['不限', '有备注', '无备注'], key="queue_note")
+    
+    column_filters = {}
+    extra_columns = [col for col in st.session_state.extra_columns if col in df.columns]
+    if extra_columns:
+        with st.expander("按额外列筛选", expanded=False):
+            for col in extra_columns:
+                index = column_value_index(st.session_state.corpus, col)
+                name = st.session_state.extra_columns[col]['display_name']
+                if index.numeric:
+                    bounds = index.bounds()
+                    if bounds is None or bounds[0] == bounds[1]:
+                        continue
+                    key = f"queue_range_{col}"
+                    low, high = st.session_state.get(key, bounds)
+                    st.session_state[key] = (max(low, bounds[0]), min(high, bounds[1]))
+                    selected = st.slider(name, min_value=bounds[0], max_value=bounds[1], key=key)
+                    if tuple(selected) != bounds:
+                        column_filters[col] = ('range', tuple(selected))
+                else:
+                    options = index.options()
+                    key = f"queue_values_{col}"
+                    if key in st.session_state:
+                        st.session_state[key] = [value for value in st.session_state[key] if value in options]
+                    selected = st.multiselect(name, options=options, key=key, placeholder="不限")
+                    if selected:
+                        column_filters[col] = ('values', selected)
+    
+    col_apply, col_clear = st.columns(2)
+    with col_apply:
+        st.button("应用视图", type="primary", use_container_width=True,
+                  on_click=apply_queue, args=(statuses, note, column_filters))
+    with col_clear:
+        st.button("显示全部", use_container_width=True, disabled=queue is None, on_click=clear_queue)
+    
+    if queue is not None:
+        st.caption(f"视图中共 {len(queue)} 篇；上一篇/下一篇和表格翻页只在视图中移动")
+
+# ====================== 筛选卡片 ======================
+@st.fragment
+def screening_fragment():
+    """文献卡片、分类按钮和备注；点击其中的按钮只重新运行本片段"""
+    run_instrumented('card_render', render_screening_card)
+
+def render_screening_card():
+    df = st.session_state.df
+    decisions = st.session_state.decisions
+    
+    if st.session_state.priority_mode:
+        update_ranker()
+    
+    current_idx = st.session_state.current_index
+    card = current_card(df, current_idx)
+    fields = card['fields']
+    
+    # 片段内的进度计数，分类后随卡片一起刷新（侧边栏统计在整页运行时刷新）
+    counter_text = (f"已处理 {decisions.processed}/{len(df)} · 纳入 {decisions.count('纳入')} · "
+                    f"排除 {decisions.count('排除')} · 待定 {decisions.count('待定')}")
+    if st.session_state.priority_mode:
+        remaining = estimated_remaining_relevant()
+        if remaining is not None:
+            counter_text += f" · 预计剩余相关约 {remaining:.0f} 篇"
+    queue = active_queue()
+    if queue is not None:
+        if queue.member[current_idx]:
+            counter_text += f" · 视图中第 {queue.rank(current_idx) + 1}/{len(queue)} 篇"
+        else:
+            counter_text += f" · 视图共 {len(queue)} 篇（当前文献不在视图中）"
+    st.caption(counter_text)
+    
+    st.markdown('<div class="paper-card">', unsafe_allow_html=True)
+    
+    col_top1, col_top2 = st.columns([4, 1])
+    
+    with col_top1:
+        st.markdown(f"### 文献 #{current_idx + 1}")
+    
+    with col_top2:
+        status = decisions.get(current_idx)
+        if status:
+            status_class = f"status-{status}"
+            st.markdown(f'<div class="status-badge {status_class}">{status}</div>', unsafe_allow_html=True)
+    
+    if st.session_state.reviewer and st.session_state.get('show_peer_decisions'):
+        board = ensure_review_board(st.session_state.file_hash, len(df))
+        peers = {name: label for name, label in board.decisions_at(current_idx).items()
+                 if name != st.session_state.reviewer}
+        if peers:
+            text = " · ".join(f"{name}：{label}" for name, label in peers.items())
+            if board.conflict[current_idx]:
+                st.warning(f"审阅人之间存在分歧 — {text}")
+            else:
+                st.caption(f"其他审阅人 — {text}")
+    
+    dup_groups = st.session_state.dup_groups
+    if dup_groups is not None and dup_groups[current_idx] >= 0:
+        members = np.flatnonzero(dup_groups == dup_groups[current_idx])
+        others = [int(pos) + 1 for pos in members if pos != current_idx]
+        col_dup1, col_dup2 = st.columns([3, 1])
+        with col_dup1:
+            st.warning(f"疑似重复：与 {', '.join(f'#{num}' for num in others)} 内容相近")
+        with col_dup2:
+            st.button(f"保留本篇，排除其余 {len(others)} 篇", key="resolve_dup_btn",
+                      on_click=resolve_duplicate_group, args=(current_idx,), use_container_width=True)
+    
+    st.markdown("---")
+    
+    col_content1, col_content2 = st.columns(2)
+    
+    with col_content1:
+        st.markdown('<div class="content-section">', unsafe_allow_html=True)
+        st.markdown("#### 原文信息")
+        
+        if fields.get('title'):
+            st.markdown("**标题**")
+            st.markdown(fields['title'], unsafe_allow_html=True)
+        
+        if fields.get('abstract'):
+            st.markdown("**摘要**")
+            st.markdown(fields['abstract'], unsafe_allow_html=True)
+        
+        display_custom_columns_by_position('原文信息栏', card, current_idx)
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    with col_content2:
+        st.markdown('<div class="content-section">', unsafe_allow_html=True)
+        st.markdown("#### 翻译信息")
+        
+        if 'title_translation' in fields:
+            if fields['title_translation']:
+                st.markdown("**标题翻译**")
+                st.markdown(fields['title_translation'], unsafe_allow_html=True)
+        else:
+            st.info("无标题翻译信息")
+        
+        if 'abstract_translation' in fields:
+            if fields['abstract_translation']:
+                st.markdown("**摘要翻译**")
+                st.markdown(fields['abstract_translation'], unsafe_allow_html=True)
+        else:
+            st.info("无摘要翻译信息")
+        
+        display_custom_columns_by_position('翻译信息栏', card, current_idx)
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    st.markdown("### 🏷️ 分类选择")
+    
+    col_btn1, col_btn2, col_btn3, col_btn4 = st.columns(4)
+    
+    with col_btn1:
+        st.button("✅ 纳入", key="include_btn", 
+                 on_click=handle_classification, args=('纳入',), use_container_width=True)
+    
+    with col_btn2:
+        st.button("❌ 排除", key="exclude_btn", 
+                 on_click=handle_classification, args=('排除',), use_container_width=True)
+    
+    with col_btn3:
+        st.button("⚠️ 待定", key="pending_btn", 
+                 on_click=handle_classification, args=('待定',), use_container_width=True)
+    
+    with col_btn4:
+        btn_label = "⏸️ 暂停跳转" if st.session_state.auto_advance else "▶️ 启用跳转"
+        st.button(btn_label, key="pause_btn", 
+                 on_click=toggle_auto_advance, use_container_width=True, type="secondary")
+    
+    if st.session_state.auto_advance:
+        st.info("自动跳转已启用 - 选择分类后将自动跳转到下一篇")
+    else:
+        st.warning("自动跳转已暂停 - 选择分类后不会自动跳转")
+    
+    display_custom_columns_by_position('分类选择后', card, current_idx)
+    
+    st.markdown("### 📝 备注")
+    
+    # 每篇文献使用独立的key，修改后通过回调保存，切换文献时无需额外的重新运行
+    st.text_area(
+        "在此输入备注内容",
+        value=get_record_note(df, decisions, current_idx),
+        height=100,
+        key=f"note_{current_idx}",
+        on_change=handle_note_change,
+        args=(current_idx,),
+        placeholder="输入备注内容...",
+        help="备注内容将保存到Excel文件的'备注'列中",
+        label_visibility="collapsed"
+    )
+    
+    st.markdown("---")
+    st.markdown("### 导航控制")
+    
+    col_bottom1, col_bottom2, col_bottom3 = st.columns([1, 2, 1])
+    
+    with col_bottom1:
+        st.button("◀ 上一篇", key="bottom_prev", disabled=not has_prev(current_idx), 
+                 on_click=go_prev, use_container_width=True)
+    
+    with col_bottom2:
+        st.markdown(f"**当前文献**: {current_idx + 1} / {len(df)}", help="当前文献序号/总文献数")
+    
+    with col_bottom3:
+        st.button("下一篇 ▶", key="bottom_next", disabled=not has_next(current_idx), 
+                 on_click=go_next, use_container_width=True)
+
+
+# ====================== 表格筛选 ======================
+# 标题初筛时按页显示文献列表，一页的修改在提交时一次写入，只有当前页的数据发送到浏览器
+SCREENING_MODES = ['逐篇卡片', '分页表格']
+TABLE_PAGE_SIZES = [25, 50, 100, 200]
+
+def table_page_frame(df, positions, column_mapping, extra_columns, decisions):
+    """当前页的表格：分类（可编辑）、序号、标题、标题翻译和选定的额外列"""
+    columns = ['序号'] + [column_mapping.get(key) for key in ('title', 'title_translation')] + list(extra_columns)
+    columns = [col for col in dict.fromkeys(columns) if col and col in df.columns and col != '分类']
+    frame = df.iloc[positions][columns].reset_index(drop=True)
+    frame.insert(0, '分类', [STATUS_LABELS[code] for code in decisions.status[positions].tolist()])
+    return frame
+
+def submit_table_page(positions, editor_key, rest_label=None):
+    """提交本页的修改：按新分类分组批量写入；rest_label不为空时本页仍未处理的文献一并标记"""
+    decisions = st.session_state.decisions
+    current = decisions.status[positions]
+    codes = current.copy()
+    for row, changes in st.session_state.get(editor_key, {}).get('edited_rows', {}).items():
+        label = changes.get('分类')
+        if label in STATUS_CODES:
+            codes[int(row)] = STATUS_CODES[label]
+    if rest_label is not None:
+        codes[codes == 0] = STATUS_CODES[rest_label]
+    
+    changed = codes != current
+    for code, label in enumerate(STATUS_LABELS):
+        record_decisions(positions[changed & (codes == code)], label)
+    
+    # 提交后本页的文献可能离开视图，按本页最后一篇之后的文献确定下一页
+    st.session_state.table_version += 1
+    order = view_positions()
+    page_size = st.session_state.table_page_size
+    following = int(np.searchsorted(order, positions[-1], side='right'))
+    if st.session_state.auto_advance and following < len(order):
+        st.session_state.table_page = following // page_size + 1
+    else:
+        st.session_state.table_page = max(min(st.session_state.table_page, (len(order) - 1) // page_size + 1), 1)
+    start = (st.session_state.table_page - 1) * page_size
+    if start < len(order):
+        st.session_state.current_index = int(order[start])
+    st.toast(f"已提交 {int(changed.sum())} 条修改")
+
+def change_table_page(delta):
+    st.session_state.table_page += delta
+    order = view_positions()
+    start = (st.session_state.table_page - 1) * st.session_state.table_page_size
+    if start < len(order):
+        st.session_state.current_index = int(order[start])
+
+@st.fragment
+def table_screening_fragment():
+    """分页表格筛选；翻页和提交只重新运行本片段"""
+    run_instrumented('table_render', render_screening_table)
+
+def render_screening_table():
+    df = st.session_state.df
+    decisions = st.session_state.decisions
+    
+    st.caption(f"已处理 {decisions.processed}/{len(df)} · 纳入 {decisions.count('纳入')} · "
+               f"排除 {decisions.count('排除')} · 待定 {decisions.count('待定')}")
+    
+    col_size, col_page, col_columns = st.columns([1, 1, 3])
+    with col_size:
+        page_size = st.selectbox("每页篇数", options=TABLE_PAGE_SIZES, index=1, key="table_page_size")
+    
+    order = view_positions()
+    n_pages = max((len(order) - 1) // page_size + 1, 1)
+    # 默认显示当前文献所在的页
+    page = st.session_state.get('table_page', int(np.searchsorted(order, st.session_state.current_index)) // page_size + 1)
+    st.session_state.table_page = min(max(page, 1), n_pages)
+    with col_page:
+        page = st.number_input(f"页码（共 {n_pages} 页）", min_value=1, max_value=n_pages, key="table_page")
+    
+    with col_columns:
+        extra_columns = st.multiselect(
+            "显示的额外列",
+            options=list(st.session_state.extra_columns),
+            default=list(st.session_state.extra_columns),
+            key="table_extra_columns"
+        )
+    
+    if not len(order):
+        st.info("当前视图中没有文献")
+        return
+    
+    start = (page - 1) * page_size
+    positions = order[start:start + page_size]
+    frame = table_page_frame(df, positions, st.session_state.column_mapping, extra_columns, decisions)
+    
+    column_config = {
+        '分类': st.column_config.SelectboxColumn("分类", options=STATUS_LABELS, required=True, width="small"),
+        '序号': st.column_config.Column("序号", width="small"),
+    }
+    for key in ('title', 'title_translation'):
+        col = st.session_state.column_mapping.get(key)
+        if col in frame.columns:
+            column_config[col] = st.column_config.TextColumn(col, width="large")
+    
+    # 每次提交后更换编辑器的key，使表格按新的分类重新显示
+    editor_key = f"table_editor_{page}_{page_size}_{st.session_state.table_version}"
+    with st.form("table_form", border=False):
+        st.data_editor(
+            frame,
+            key=editor_key,
+            hide_index=True,
+            use_container_width=True,
+            height=min(len(frame), 25) * 35 + 38,
+            column_config=column_config,
+            disabled=[col for col in frame.columns if col != '分类']
+        )
+        
+        col_submit1, col_submit2 = st.columns(2)
+        with col_submit1:
+            st.form_submit_button("提交本页", type="primary", use_container_width=True,
+                                  on_click=submit_table_page, args=(positions, editor_key))
+        with col_submit2:
+            st.form_submit_button("提交，本页其余未处理的标为排除", use_container_width=True,
+                                  on_click=submit_table_page, args=(positions, editor_key, '排除'))
+    
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        st.button("◀ 上一页", key="table_prev", disabled=page <= 1,
+                  on_click=change_table_page, args=(-1,), use_container_width=True)
+    with col_info:
+        st.markdown(f"**第 {page} / {n_pages} 页**（共 {len(order)} 篇，本页 #{positions[0] + 1}–#{positions[-1] + 1}）")
+    with col_next:
+        st.button("下一页 ▶", key="table_next", disabled=page >= n_pages,
+                  on_click=change_table_page, args=(1,), use_container_width=True)
+    
+    if st.session_state.auto_advance:
+        st.caption("提交后自动翻到下一页；未提交的修改在翻页时丢弃")
+    else:
+        st.caption("提交后停留在本页；未提交的修改在翻页时丢弃")
+
 # ====================== 主应用 ======================
 def main():
     # 初始化session state
     initialize_session_state()
+    timer = start_run_timer('script')
+    st.session_state.run_timer = timer
     
     # 应用标题
     st.title("📚 文献筛选工具")
@@ -462,43 +1723,127 @@ def main():
     with st.sidebar:
         st.header("📁 文件管理")
         
-        uploaded_file = st.file_uploader(
-            "上传Excel文件",
-            type=['xlsx', 'xls'],
-            help="请上传包含文献信息的Excel文件"
+        timer.mark('ingest')
+        uploaded_files = st.file_uploader(
+            "上传文献文件或项目文件",
+            type=['xlsx', 'xls'] + [suffix.lstrip('.') for suffix in CITATION_SUFFIXES + PROJECT_SUFFIXES],
+            accept_multiple_files=True,
+            help="请上传包含文献信息的Excel文件、数据库导出的题录文件（RIS、BibTeX、PubMed NBIB、WoS制表符分隔、CSV），"
+                 "或之前保存的项目文件（.feather）、导出的结果文件（文献筛选结果_*.xlsx）以继续筛选；"
+                 "同时上传多个文件时合并为一个文献表并去除重复"
         )
+        uploaded_files = uploaded_files or []
+        uploaded_file = uploaded_files[0] if len(uploaded_files) == 1 else None
+        upload_label = ' + '.join(f.name for f in uploaded_files)
+        
+        new_upload = not st.session_state.file_processed or upload_label != st.session_state.current_filename
+        if uploaded_file and is_project_file(uploaded_file.name):
+            if new_upload:
+                try:
+                    project = open_uploaded_project(uploaded_file)
+                    st.success(f"已打开项目：{len(project.df)} 篇文献，已筛选 {project.decisions.processed} 篇")
+                except Exception as e:
+                    st.error(f"打开项目文件失败: {str(e)}")
+        
+        elif new_upload and uploaded_file and uploaded_file.name.lower().endswith('.xlsx') and \
+                is_results_workbook(uploaded_file):
+            try:
+                with st.spinner("正在从导出结果恢复筛选进度..."):
+                    project = open_uploaded_project(uploaded_file)
+                st.success(f"已从导出结果恢复：{len(project.df)} 篇文献，已筛选 {project.decisions.processed} 篇，"
+                           f"从第 {project.current_index + 1} 篇继续")
+                if project.unmatched_rows:
+                    st.warning(f"分类工作表中有 {project.unmatched_rows} 行的序号在所有文献中找不到对应文献，这些分类未恢复")
+            except Exception as e:
+                st.error(f"恢复导出结果失败: {str(e)}")
         
-        if uploaded_file:
-            if not st.session_state.file_processed or uploaded_file.name != st.session_state.current_filename:
+        elif uploaded_files:
+            if new_upload:
                 try:
-                    df = pd.read_excel(uploaded_file)
+                    n_duplicates = None
+                    if uploaded_file is None:
+                        handle, file_hash, n_duplicates = merge_uploaded_files(uploaded_files)
+                        source_path = None
+                    else:
+                        handle, file_hash, source_path = read_uploaded_workbook(uploaded_file)
+                    df = handle.df if handle is not None else None
                     
-                    if '序号' not in df.columns:
-                        df.insert(0, '序号', range(1, len(df) + 1))
+                    sample_df = None
+                    pending_parse = None
+                    if df is not None:
+                        source_columns = df.columns.tolist()
+                        sample_df = df.head(SNIFF_ROWS)
+                    else:
+                        # 先读取表头和样本行，列映射无需等待完整解析
+                        source_columns, sample, total_rows = read_workbook_header(source_path, SNIFF_ROWS)
+                        sample_df = sample_frame(source_columns, sample)
+                        if st.session_state.progressive_load:
+                            start_background_parse(file_hash, source_path, total_rows)
+                            pending_parse = {'total_rows': total_rows}
                     
-                    st.session_state.df = df
-                    st.session_state.current_filename = uploaded_file.name
+                    use_corpus(handle)
+                    st.session_state.df_complete = df is not None
+                    st.session_state.pending_parse = pending_parse
+                    st.session_state.source_columns = source_columns
+                    st.session_state.sample_df = sample_df
+                    st.session_state.source_path = source_path
+                    st.session_state.current_filename = upload_label
+                    st.session_state.file_hash = file_hash
                     st.session_state.file_processed = True
                     st.session_state.show_column_mapping = True
                     st.session_state.mapping_confirmed = False
                     st.session_state.current_index = 0
-                    st.session_state.selections = {}
-                    st.session_state.notes = {}
+                    st.session_state.decisions = None
+                    if df is not None:
+                        start_screening(len(df))
                     st.session_state.extra_columns = {}
-                    st.session_state.should_auto_advance = False
+                    st.session_state.dup_groups = None
+                    st.session_state.ranker = None
+                    st.session_state.nav_history = []
+                    st.session_state.render_cache = None
+                    st.session_state.review_board_csv = None
                     
-                    st.success(f"成功加载 {len(df)} 篇文献")
+                    if uploaded_file is None:
+                        message = f"已合并 {len(uploaded_files)} 个文件，共 {len(df)} 篇文献"
+                        if n_duplicates is not None:
+                            message += f"（去除重复 {n_duplicates} 篇）"
+                        st.success(message)
+                    elif df is not None:
+                        st.success(f"成功加载 {len(df)} 篇文献")
+                    elif st.session_state.progressive_load:
+                        st.success(f"已读取表头（{len(source_columns)} 列），可以先配置列映射")
+                    else:
+                        st.success(f"已读取表头（{len(source_columns)} 列），请确认列映射后加载文献")
                     
                 except Exception as e:
                     st.error(f"读取文件失败: {str(e)}")
         
+        # 整页运行时先直接检查一次：解析已完成时在本次运行中使用完整表格，
+        # 不由进度片段触发重新运行，否则本次运行中的按钮点击（如确认映射）会丢失
+        if st.session_state.df is None and st.session_state.pending_parse is not None and \
+                poll_pending_parse() is not None:
+            ingest_progress_fragment()
+        
+        timer.mark('settings')
+        st.session_state.progressive_load = st.checkbox(
+            "渐进加载（后台解析完整文件）",
+            value=st.session_state.progressive_load,
+            help="上传后先读取表头和前几行用于列映射，完整文件在后台解析；关闭后确认映射时只读取需要的列"
+        )
+        
         create_font_settings_ui()
         
-        if st.session_state.df is not None and not st.session_state.mapping_confirmed:
+        timer.mark('mapping')
+        if st.session_state.source_columns is not None and not st.session_state.mapping_confirmed:
             st.header("🔧 列映射配置")
             
-            df = st.session_state.df
+            # 列映射只需要表头
+            df = pd.DataFrame(columns=st.session_state.source_columns)
             columns = [""] + df.columns.tolist()
+            
+            if st.session_state.sample_df is not None:
+                with st.expander("👀 数据预览（前几行）", expanded=False):
+                    st.dataframe(st.session_state.sample_df, use_container_width=True)
             candidates = detect_column_candidates(df)
             
             title_default = candidates['title'][0] if candidates['title'] else ""
@@ -623,8 +1968,32 @@ def main():
                             'abstract': abstract_col,
                             'abstract_translation': abstract_trans_col if abstract_trans_col else None
                         }
-                        st.session_state.mapping_confirmed = True
-                        st.success("列映射已确认！")
+                        
+                        if st.session_state.df is None and st.session_state.pending_parse is not None:
+                            # 后台解析仍在进行，完成后自动进入筛选
+                            st.session_state.mapping_confirmed = True
+                            st.success("列映射已确认！文献加载完成后将自动显示")
+                        elif st.session_state.df is None:
+                            # 只加载筛选需要的列，其余列在导出时读取
+                            try:
+                                with st.spinner("正在加载文献..."):
+                                    columns = screening_columns(
+                                        st.session_state.source_columns,
+                                        st.session_state.column_mapping,
+                                        st.session_state.extra_columns
+                                    )
+                                    source_path = st.session_state.source_path
+                                    handle = acquire_corpus(st.session_state.file_hash,
+                                                            lambda: read_workbook_frame(source_path, columns),
+                                                            columns)
+                                    use_corpus(handle)
+                                    start_screening(len(handle.df))
+                            except Exception as e:
+                                st.error(f"读取文件失败: {str(e)}")
+                        
+                        if st.session_state.df is not None:
+                            st.session_state.mapping_confirmed = True
+                            st.success("列映射已确认！")
             
             with col2:
                 if st.button("重置", type="secondary", use_container_width=True):
@@ -634,23 +2003,43 @@ def main():
         if st.session_state.df is not None and st.session_state.mapping_confirmed:
             df = st.session_state.df
             
+            timer.mark('navigation')
             st.header("⚙️ 设置与导航")
             
+            st.radio("筛选方式", options=SCREENING_MODES, key="screening_mode", horizontal=True,
+                     help="分页表格适合标题初筛：一页内修改多篇文献的分类后一次提交")
+            
             st.session_state.auto_advance = st.checkbox(
                 "选择分类后自动跳转到下一篇",
                 value=st.session_state.auto_advance,
                 help="启用后，选择分类会自动保存并显示下一篇文献"
             )
             
+            st.session_state.priority_mode = st.checkbox(
+                "按相关性优先排序（主动学习）",
+                value=st.session_state.priority_mode,
+                help=f"根据已有的纳入/排除决策训练模型，每新增{RANK_RETRAIN_EVERY}条决策在后台重新排序，"
+                     "下一篇优先显示最可能纳入的未筛选文献"
+            )
+            
+            if st.session_state.priority_mode:
+                ensure_feature_matrix(st.session_state.corpus, st.session_state.column_mapping)
+                ranker = update_ranker()
+                remaining = estimated_remaining_relevant()
+                if remaining is None:
+                    st.caption("至少各有一篇纳入和排除的文献后开始排序")
+                else:
+                    st.caption(f"模型基于 {ranker['trained_on']} 条决策；预计剩余相关文献约 {remaining:.0f} 篇")
+            
             current_idx = st.session_state.current_index
             
             col_nav1, col_nav2 = st.columns(2)
             with col_nav1:
-                st.button("◀ 上一篇", disabled=current_idx <= 0, 
+                st.button("◀ 上一篇", disabled=not has_prev(current_idx), 
                          on_click=go_prev, use_container_width=True)
             
             with col_nav2:
-                st.button("下一篇 ▶", disabled=current_idx >= len(df)-1, 
+                st.button("下一篇 ▶", disabled=not has_next(current_idx), 
                          on_click=go_next, use_container_width=True)
             
             target_idx = st.number_input(
@@ -663,203 +2052,193 @@ def main():
             
             if st.button("执行跳转", use_container_width=True):
                 if 1 <= target_idx <= len(df):
-                    st.session_state.current_index = target_idx - 1
+                    move_to(int(target_idx) - 1)
+            
+            create_queue_ui(df)
+            
+            st.header("🔎 全文检索")
             
+            index_future = ensure_search_index(st.session_state.corpus, st.session_state.column_mapping)
+            query = st.text_input(
+                "搜索标题、摘要及翻译",
+                key="search_query",
+                placeholder="如：deep learning 或 医学影像",
+                help="英文按单词匹配，中文按相邻两字匹配，结果按相关度排序"
+            )
+            
+            if query:
+                if not index_future.done():
+                    st.caption("正在构建检索索引，请稍候...")
+                elif index_future.exception() is not None:
+                    st.error(f"构建检索索引失败: {str(index_future.exception())}")
+                else:
+                    hits = index_future.result().search(query)
+                    if not hits:
+                        st.caption("没有找到匹配的文献")
+                    
+                    title_col = st.session_state.column_mapping.get('title')
+                    for pos, _ in hits:
+                        title = df[title_col].iat[pos] if title_col in df.columns else ''
+                        title = '' if pd.isna(title) else str(title)
+                        label = f"#{pos + 1} {title[:40]}{'…' if len(title) > 40 else ''}"
+                        st.button(label, key=f"search_hit_{pos}", on_click=jump_to, args=(pos,),
+                                  use_container_width=True)
+            
+            timer.mark('sidebar_stats')
             st.header("📊 进度统计")
             
+            decisions = st.session_state.decisions
             total = len(df)
-            processed = len(st.session_state.selections)
+            processed = decisions.processed
             progress = processed / total if total > 0 else 0
             
             st.progress(progress)
             st.write(f"**已处理**: {processed}/{total} 篇 ({progress:.1%})")
             
-            if st.session_state.selections:
-                from collections import Counter
-                counts = Counter(st.session_state.selections.values())
-                
+            if processed:
                 col_stat1, col_stat2, col_stat3 = st.columns(3)
                 with col_stat1:
-                    st.metric("纳入", counts.get('纳入', 0))
+                    st.metric("纳入", decisions.count('纳入'))
                 with col_stat2:
-                    st.metric("排除", counts.get('排除', 0))
+                    st.metric("排除", decisions.count('排除'))
                 with col_stat3:
-                    st.metric("待定", counts.get('待定', 0))
+                    st.metric("待定", decisions.count('待定'))
+            
+            with st.expander("🧠 内存占用", expanded=False):
+                report = corpus_report()
+                st.caption("共享文献库（所有会话只读共用）")
+                st.dataframe(report, hide_index=True, use_container_width=True)
+                
+                overhead = session_overhead()
+                st.caption(f"本会话私有数据：{sum(overhead.values()) / 1024 ** 2:.2f} MB")
+                for name, nbytes in overhead.items():
+                    st.write(f"- {name}: {nbytes / 1024:.1f} KB")
+            
+            timer.mark('sidebar_tools')
+            st.header("👥 多人筛选")
+            
+            st.text_input("审阅人", value=st.session_state.reviewer, key="reviewer_input",
+                          on_change=change_reviewer, placeholder="单人筛选时留空",
+                          help="填写姓名后进入多人筛选模式：决策按审阅人分别保存，并与其他审阅人对照")
+            
+            if st.session_state.reviewer and st.session_state.file_hash:
+                board = ensure_review_board(st.session_state.file_hash, len(df))
+                agreement = board.agreement()
+                if agreement.empty:
+                    st.caption("等待其他审阅人加入（填写不同的姓名并上传同一文件）")
+                else:
+                    st.dataframe(agreement, hide_index=True, use_container_width=True)
+                
+                st.metric("存在分歧的文献", board.n_conflicts)
+                st.button("跳转到下一处分歧", use_container_width=True, disabled=not board.n_conflicts,
+                          on_click=jump_to_next_conflict)
+                st.checkbox("在卡片上显示其他审阅人的决策", key="show_peer_decisions",
+                            help="独立筛选阶段建议关闭，处理分歧时再打开")
+                
+                if st.button("生成多人决策对照表", use_container_width=True):
+                    buffer = io.StringIO()
+                    board.frame(df['序号'].to_numpy()).to_csv(buffer, index=False)
+                    st.session_state.review_board_csv = buffer.getvalue().encode('utf-8-sig')
+                if st.session_state.review_board_csv:
+                    st.download_button(
+                        label="📥 下载对照表",
+                        data=st.session_state.review_board_csv,
+                        file_name=f"多人决策对照_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
+            
+            st.header("🔁 重复检测")
+            
+            if st.button("检测疑似重复文献", use_container_width=True,
+                         help="基于标题和摘要的MinHash相似度查找近似重复的文献"):
+                with st.spinner("正在检测重复文献..."):
+                    texts = dedup_texts(df, st.session_state.column_mapping)
+                    st.session_state.dup_groups = find_duplicate_groups(texts)
             
+            dup_groups = st.session_state.dup_groups
+            if dup_groups is not None:
+                dup_positions = np.flatnonzero(dup_groups >= 0)
+                n_groups = len(np.unique(dup_groups[dup_positions]))
+                st.write(f"**疑似重复**: {n_groups} 组，共 {len(dup_positions)} 篇")
+            
+            create_rules_ui(df)
+            
+            timer.mark('export')
             st.header("💾 保存导出")
             
             st.info("导出将生成包含以下工作表的Excel文件：\n1. 所有文献（带颜色标记）\n2. 纳入文章\n3. 待定文章\n4. 排除文章")
             
-            if st.button("保存进度并导出", type="primary", use_container_width=True):
-                temp_path = save_results()
+            job = st.session_state.export_job
+            running = job is not None and not job['future'].done()
+            if job is not None and not running and job['future'].exception() is None and \
+                    job['source'] is st.session_state.decisions:
+                st.session_state.last_export = job
+            previous = last_export()
+            
+            if st.button("保存进度并导出", type="primary", use_container_width=True, disabled=running,
+                         help="在后台生成Excel文件，包含点击时的全部决策和备注"):
+                start_export_job()
+                job = st.session_state.export_job
+                running = job is not None
+            
+            if previous is not None:
+                changed = len(st.session_state.decisions.changed_positions(previous['decisions']))
+                st.caption(f"自上次导出（{previous['file_name']}）以来有 {changed} 篇文献的分类或备注发生变化")
+                if st.button("仅导出变更", use_container_width=True, disabled=running or not changed,
+                             help="只导出变化的文献及其原分类和当前分类，耗时与变化的篇数成正比"):
+                    start_export_job(changes_only=True)
+                    job = st.session_state.export_job
+                    running = job is not None
+            
+            if running:
+                export_progress_fragment()
+            elif job is not None:
+                error = job['future'].exception()
+                if error is not None:
+                    st.error(f"保存文件时出错: {str(error)}")
+                elif os.path.exists(job['path']):
+                    st.download_button(
+                        label="📥 下载Excel文件",
+                        data=lambda path=job['path']: read_export_file(path),
+                        file_name=job['file_name'],
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        use_container_width=True
+                    )
+                    st.caption(f"导出用时 {job['elapsed']:.1f} 秒")
+            
+            if st.button("保存项目文件", use_container_width=True,
+                         help="保存文献表、列映射、显示列配置、决策和备注，之后上传即可继续筛选；打开大型项目几乎无需等待"):
+                timer.mark('project')
+                temp_path = save_project_file()
                 
                 if temp_path:
                     with open(temp_path, 'rb') as f:
                         st.download_button(
-                            label="📥 下载Excel文件",
+                            label="📥 下载项目文件",
                             data=f,
-                            file_name=f"文献筛选结果_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            file_name=f"文献筛选项目_{datetime.now().strftime('%Y%m%d_%H%M%S')}.feather",
+                            mime="application/octet-stream",
                             use_container_width=True
                         )
                     
                     os.unlink(temp_path)
     
     # ====================== 主内容区域 ======================
+    timer.mark('main_page')
     if st.session_state.df is not None and st.session_state.mapping_confirmed:
-        df = st.session_state.df
-        
-        # 关键修复：检查并执行自动跳转（必须在渲染前）
-        if st.session_state.get('should_auto_advance'):
-            if st.session_state.current_index < len(df) - 1:
-                st.session_state.current_index += 1
-            st.session_state.should_auto_advance = False
-            st.rerun()
-        
-        current_idx = st.session_state.current_index
-        column_mapping = st.session_state.column_mapping
-        
-        st.markdown('<div class="paper-card">', unsafe_allow_html=True)
-        
-        col_top1, col_top2 = st.columns([4, 1])
-        
-        with col_top1:
-            st.markdown(f"### 文献 #{current_idx + 1}")
-        
-        with col_top2:
-            if current_idx in st.session_state.selections:
-                status = st.session_state.selections[current_idx]
-                status_class = f"status-{status}"
-                st.markdown(f'<div class="status-badge {status_class}">{status}</div>', unsafe_allow_html=True)
-        
-        st.markdown("---")
-        
-        col_content1, col_content2 = st.columns(2)
-        
-        with col_content1:
-            st.markdown('<div class="content-section">', unsafe_allow_html=True)
-            st.markdown("#### 原文信息")
-            
-            title_col = column_mapping.get('title')
-            if title_col and title_col in df.columns:
-                title = df.iloc[current_idx][title_col]
-                if pd.notna(title):
-                    st.markdown("**标题**")
-                    st.markdown(f'<div style="margin-bottom: 15px; padding: 10px; background-color: #f8f9fa; border-radius: 4px; font-size: 18px;">{title}</div>', 
-                               unsafe_allow_html=True)
-            
-            abstract_col = column_mapping.get('abstract')
-            if abstract_col and abstract_col in df.columns:
-                abstract = df.iloc[current_idx][abstract_col]
-                if pd.notna(abstract):
-                    st.markdown("**摘要**")
-                    font_size = st.session_state.font_size_abstract
-                    st.markdown(f'<div style="white-space: pre-wrap; line-height: 1.6; margin-bottom: 20px; font-size: {font_size}px;">{abstract}</div>', 
-                               unsafe_allow_html=True)
-            
-            display_custom_columns_by_position('原文信息栏', df, current_idx)
-            
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col_content2:
-            st.markdown('<div class="content-section">', unsafe_allow_html=True)
-            st.markdown("#### 翻译信息")
-            
-            title_trans_col = column_mapping.get('title_translation')
-            if title_trans_col and title_trans_col in df.columns:
-                title_trans = df.iloc[current_idx][title_trans_col]
-                if pd.notna(title_trans):
-                    st.markdown("**标题翻译**")
-                    st.markdown(f'<div style="margin-bottom: 15px; padding: 10px; background-color: #e8f5e9; border-radius: 4px; font-size: 18px;">{title_trans}</div>', 
-                               unsafe_allow_html=True)
-            else:
-                st.info("无标题翻译信息")
-            
-            abstract_trans_col = column_mapping.get('abstract_translation')
-            if abstract_trans_col and abstract_trans_col in df.columns:
-                abstract_trans = df.iloc[current_idx][abstract_trans_col]
-                if pd.notna(abstract_trans):
-                    st.markdown("**摘要翻译**")
-                    font_size = st.session_state.font_size_translation
-                    st.markdown(f'<div style="white-space: pre-wrap; line-height: 1.6; margin-bottom: 20px; font-size: {font_size}px;">{abstract_trans}</div>', 
-                               unsafe_allow_html=True)
-            else:
-                st.info("无摘要翻译信息")
-            
-            display_custom_columns_by_position('翻译信息栏', df, current_idx)
-            
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown("### 🏷️ 分类选择")
-        
-        col_btn1, col_btn2, col_btn3, col_btn4 = st.columns(4)
-        
-        with col_btn1:
-            st.button("✅ 纳入", key="include_btn", 
-                     on_click=handle_classification, args=('纳入',), use_container_width=True)
-        
-        with col_btn2:
-            st.button("❌ 排除", key="exclude_btn", 
-                     on_click=handle_classification, args=('排除',), use_container_width=True)
-        
-        with col_btn3:
-            st.button("⚠️ 待定", key="pending_btn", 
-                     on_click=handle_classification, args=('待定',), use_container_width=True)
-        
-        with col_btn4:
-            btn_label = "⏸️ 暂停跳转" if st.session_state.auto_advance else "▶️ 启用跳转"
-            st.button(btn_label, key="pause_btn", 
-                     on_click=toggle_auto_advance, use_container_width=True, type="secondary")
-        
-        if st.session_state.auto_advance:
-            st.info("自动跳转已启用 - 选择分类后将自动跳转到下一篇")
+        if st.session_state.screening_mode == '分页表格':
+            timer.mark('table_render')
+            table_screening_fragment()
         else:
-            st.warning("自动跳转已暂停 - 选择分类后不会自动跳转")
-        
-        display_custom_columns_by_position('分类选择后', df, current_idx)
-        
-        st.markdown("### 📝 备注")
-        
-        note_key = f"note_{current_idx}"
-        if note_key not in st.session_state.notes:
-            existing_note = df.iloc[current_idx].get('备注', '') if '备注' in df.columns else ''
-            if pd.isna(existing_note):
-                existing_note = ''
-            st.session_state.notes[note_key] = existing_note
-        
-        current_note = st.text_area(
-            "在此输入备注内容",
-            value=st.session_state.notes[note_key],
-            height=100,
-            key="note_textarea",
-            placeholder="输入备注内容...",
-            help="备注内容将保存到Excel文件的'备注'列中",
-            label_visibility="collapsed"
-        )
-        
-        st.session_state.notes[note_key] = current_note
-        st.session_state.current_note = current_note
-        
-        st.markdown("---")
-        st.markdown("### 导航控制")
-        
-        col_bottom1, col_bottom2, col_bottom3 = st.columns([1, 2, 1])
-        
-        with col_bottom1:
-            st.button("◀ 上一篇", key="bottom_prev", disabled=current_idx <= 0, 
-                     on_click=go_prev, use_container_width=True)
-        
-        with col_bottom2:
-            st.markdown(f"**当前文献**: {current_idx + 1} / {len(df)}", help="当前文献序号/总文献数")
-        
-        with col_bottom3:
-            st.button("下一篇 ▶", key="bottom_next", disabled=current_idx >= len(df) - 1, 
-                     on_click=go_next, use_container_width=True)
+            timer.mark('card_render')
+            screening_fragment()
+    
+    elif st.session_state.mapping_confirmed and st.session_state.df is None:
+        st.info("⏳ 文献正在后台加载，完成后将自动显示")
     
     else:
-        st.info("👈 请在左侧边栏上传Excel文件开始使用")
+        st.info("👈 请在左侧边栏上传Excel文件或数据库导出的题录文件开始使用")
         
         with st.expander("📖 使用说明", expanded=True):
             st.markdown("""
@@ -888,7 +2267,7 @@ def main():
               - 4️⃣ **排除文章**：仅包含标记为"排除"的文献
             
             **使用步骤：**
-            1. **上传Excel文件**（左侧边栏）
+            1. **上传Excel文件**（左侧边栏；也可直接上传RIS、BibTeX、PubMed NBIB、WoS制表符分隔或CSV题录文件）
             2. **配置列映射**（系统会自动检测，您也可以手动调整）
             3. **配置自定义列**（选择要显示的额外列，并设置显示名称、位置和折叠状态）
             4. **调整字体大小**（在左侧边栏的"字体大小设置"中）
@@ -927,6 +2306,11 @@ def main():
             '备注': ['重要参考文献', '方法新颖', '综述文章']
         }
         st.dataframe(pd.DataFrame(example_data), use_container_width=True)
+    
+    timer.mark('metrics_panel')
+    with st.sidebar:
+        create_metrics_panel()
+    finish_run_timer(timer)
 
 # ====================== 运行应用 ======================
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""性能基准测试：合成语料生成和关键路径计时"""
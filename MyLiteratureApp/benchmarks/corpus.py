@@ -0,0 +1,118 @@
+"""基准测试：合成双语文献语料生成器"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from screening.export import new_workbook
+
+# ====================== 合成语料 ======================
+# 生成的语料缓存目录，相同行数和随机种子只生成一次
+CORPUS_DIR = os.environ.get(
+    'LRT_BENCH_CORPUS_DIR', os.path.join(tempfile.gettempdir(), 'literature_review_bench'))
+
+CORPUS_COLUMNS = ['序号', '标题', '标题翻译', '摘要', '摘要翻译', '作者', '年份', '期刊', '关键词', 'DOI']
+
+_ENGLISH_WORDS = (
+    "analysis approach association background clinical cohort comparison control data design "
+    "development disease effect efficacy evaluation evidence factor follow group health impact "
+    "improvement incidence increase intervention learning level machine management measure method "
+    "model mortality network outcome patient performance population prediction prevalence "
+    "primary quality randomized rate reduction regression relationship review risk sample score "
+    "screening significant study support survey system therapy treatment trial validation "
+    "variable adult child older younger women men hospital community national regional global "
+    "acute chronic severe mild early late long short term annual baseline secondary novel "
+    "deep neural graph signal image text language retrieval classification clustering feature"
+).split()
+
+_CHINESE_CHARS = (
+    "研究方法结果分析数据模型患者治疗临床试验随机对照组显著影响因素评价系统网络学习预测"
+    "风险人群健康管理干预效果质量水平发生率相关性回归样本调查筛选疾病医院社区国家区域全球"
+    "急性慢性严重早期晚期长期短期年度基线新型深度神经图像文本语言检索分类聚类特征方案策略"
+)
+
+_SURNAMES = "Wang Li Zhang Liu Chen Yang Huang Zhao Wu Zhou Xu Sun Ma Zhu Hu Guo He Lin Luo Gao".split()
+_JOURNALS = [f"Journal of {topic}" for topic in (
+    "Clinical Research", "Medical Informatics", "Public Health", "Epidemiology", "Data Science",
+    "Computer Science", "Health Policy", "Nursing", "Pharmacology", "Biostatistics")] + [
+    "计算机学报", "中华医学杂志", "软件学报", "中国公共卫生", "情报学报"]
+
+# 文本由预先生成的句子池拼接而成，避免逐词生成百万篇摘要
+_SENTENCE_POOL = 2000
+
+def _english_sentences(rng, count, min_words, max_words):
+    lengths = rng.integers(min_words, max_words + 1, count)
+    words = np.array(_ENGLISH_WORDS, dtype=object)
+    sentences = []
+    for length in lengths:
+        sentence = ' '.join(words[rng.integers(0, len(words), length)])
+        sentences.append(sentence[:1].upper() + sentence[1:] + '.')
+    return np.array(sentences, dtype=object)
+
+def _chinese_sentences(rng, count, min_chars, max_chars):
+    chars = np.array(list(_CHINESE_CHARS), dtype=object)
+    lengths = rng.integers(min_chars, max_chars + 1, count)
+    return np.array([''.join(chars[rng.integers(0, len(chars), length)]) + '。' for length in lengths],
+                    dtype=object)
+
+def _join_sentences(rng, pool, n, min_sentences, max_sentences, sep):
+    counts = rng.integers(min_sentences, max_sentences + 1, n)
+    picks = rng.integers(0, len(pool), counts.sum())
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    parts = pool[picks].tolist()
+    return [sep.join(parts[offsets[i]:offsets[i + 1]]) for i in range(n)]
+
+def generate_corpus(n_rows, seed=0):
+    """生成双语文献表：英文标题/摘要（约150-300词）及中文翻译，外加作者、年份、期刊等列"""
+    rng = np.random.default_rng(seed)
+    title_pool = _english_sentences(rng, _SENTENCE_POOL, 6, 14)
+    title_cn_pool = _chinese_sentences(rng, _SENTENCE_POOL, 10, 24)
+    abstract_pool = _english_sentences(rng, _SENTENCE_POOL, 15, 30)
+    abstract_cn_pool = _chinese_sentences(rng, _SENTENCE_POOL, 25, 50)
+    
+    numbers = np.arange(1, n_rows + 1)
+    titles = title_pool[rng.integers(0, _SENTENCE_POOL, n_rows)]
+    surnames = np.array(_SURNAMES, dtype=object)
+    author_counts = rng.integers(1, 7, n_rows)
+    author_picks = surnames[rng.integers(0, len(surnames), author_counts.sum())].tolist()
+    author_offsets = np.concatenate([[0], np.cumsum(author_counts)])
+    keywords = np.array(_ENGLISH_WORDS, dtype=object)
+    keyword_counts = rng.integers(3, 7, n_rows)
+    keyword_picks = keywords[rng.integers(0, len(keywords), keyword_counts.sum())].tolist()
+    keyword_offsets = np.concatenate([[0], np.cumsum(keyword_counts)])
+    
+    return pd.DataFrame({
+        '序号': numbers,
+        # 标题末尾带编号，保证各篇标题不同
+        '标题': [f"{title[:-1]} ({i})" for title, i in zip(titles.tolist(), numbers.tolist())],
+        '标题翻译': title_cn_pool[rng.integers(0, _SENTENCE_POOL, n_rows)],
+        '摘要': _join_sentences(rng, abstract_pool, n_rows, 7, 12, ' '),
+        '摘要翻译': _join_sentences(rng, abstract_cn_pool, n_rows, 6, 12, ''),
+        '作者': [', '.join(author_picks[author_offsets[i]:author_offsets[i + 1]]) for i in range(n_rows)],
+        '年份': rng.integers(1990, 2025, n_rows),
+        '期刊': np.array(_JOURNALS, dtype=object)[rng.integers(0, len(_JOURNALS), n_rows)],
+        '关键词': ['; '.join(keyword_picks[keyword_offsets[i]:keyword_offsets[i + 1]]) for i in range(n_rows)],
+        'DOI': [f"10.{1000 + i % 9000}/bench.{i}" for i in numbers.tolist()],
+    }, columns=CORPUS_COLUMNS)
+
+def write_corpus(df, path):
+    """写出为单个工作表的xlsx文件"""
+    wb = new_workbook()
+    ws = wb.create_sheet('Sheet1')
+    ws.append(df.columns.tolist())
+    for start in range(0, len(df), 10000):
+        chunk = df.iloc[start:start + 10000]
+        for row in chunk.astype(object).where(chunk.notna(), None).values.tolist():
+            ws.append(row)
+    wb.save(path)
+
+def corpus_path(n_rows, seed=0):
+    """返回合成语料文件路径，不存在时生成"""
+    path = os.path.join(CORPUS_DIR, f"corpus_{n_rows}_{seed}.xlsx")
+    if not os.path.exists(path):
+        os.makedirs(CORPUS_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        write_corpus(generate_corpus(n_rows, seed), tmp_path)
+        os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,236 @@
+"""基准测试：读取（以pd.read_excel为参照）、列识别、逐篇分类的重新运行延迟、统计和导出
+
+在MyLiteratureApp目录下运行（完全离线）：
+    python -m benchmarks.run --sizes 1000 10000                 # 运行并打印结果
+    python -m benchmarks.run --sizes 1000 10000 --save-baseline  # 在本机写入基线
+    python -m benchmarks.run --compare                          # 与基线比较，变慢超过容差时返回1
+
+基线与机器相关，不纳入版本库；比较时基线文件不存在则把本次结果写为基线。
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from screening.decisions import DecisionStore
+from screening.ingest import detect_column_candidates, prepare_frame
+from screening.reader import read_workbook_frame
+from screening.review import ReviewBoard
+
+from .corpus import corpus_path
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# 默认规模；1M行的语料生成和导出需要数分钟
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# 比较基线时允许的变慢比例
+DEFAULT_TOLERANCE = 0.25
+
+# 耗时低于该值（秒）的指标不参与回归判断，避免计时噪声
+MIN_COMPARABLE_SECONDS = 0.005
+
+COLUMN_MAPPING = {'title': '标题', 'title_translation': '标题翻译',
+                  'abstract': '摘要', 'abstract_translation': '摘要翻译'}
+
+def timed(func, repeat=1):
+    """返回(最短耗时秒数, 最后一次的返回值)"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def wait_for_idle(interval=0.5, busy_ratio=0.05, timeout=600):
+    """等待进程内的后台线程空闲（CPU时间在一个间隔内几乎不增长）
+    
+    AppTest运行的应用会在后台线程构建检索索引等，之后的计时要等这些任务结束，否则会争用GIL。
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        cpu = time.process_time()
+        time.sleep(interval)
+        if time.process_time() - cpu < interval * busy_ratio:
+            return
+
+def start_app(df, decisions):
+    """通过AppTest启动应用，并把文献表和决策设为会话数据（相当于已上传并确认映射）"""
+    from streamlit.testing.v1 import AppTest
+    from app import CorpusHandle
+    
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.run()
+    at.session_state['corpus'] = CorpusHandle(('bench', None), {'df': df, 'derived': {}})
+    at.session_state['df'] = df
+    at.session_state['df_complete'] = True
+    at.session_state['column_mapping'] = COLUMN_MAPPING
+    at.session_state['mapping_confirmed'] = True
+    at.session_state['file_processed'] = True
+    at.session_state['current_filename'] = 'bench.xlsx'
+    at.session_state['decisions'] = decisions
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"应用运行出错: {at.exception}")
+    return at
+
+def bench_rerun_latency(df, clicks):
+    """通过AppTest逐篇点击“纳入”，返回每次点击后重新运行耗时的中位数和P95"""
+    at = start_app(df, DecisionStore(len(df)))
+    latencies = []
+    for _ in range(clicks):
+        button = at.button(key='include_btn')
+        start = time.perf_counter()
+        button.click().run()
+        latencies.append(time.perf_counter() - start)
+        if at.exception:
+            raise RuntimeError(f"应用运行出错: {at.exception}")
+    wait_for_idle()
+    return float(np.median(latencies)), float(np.percentile(latencies, 95))
+
+def bench_export(df, decisions, repeat):
+    """通过AppTest点击“保存进度并导出”，返回从点击到后台导出任务完成的最短耗时"""
+    at = start_app(df, decisions)
+    wait_for_idle()
+    
+    def export():
+        [button for button in at.button if button.label == "保存进度并导出"][0].click().run()
+        if at.exception:
+            raise RuntimeError(f"应用运行出错: {at.exception}")
+        path = at.session_state['export_job']['future'].result()
+        at.run()
+        return path
+    
+    best, path = timed(export, repeat)
+    if not os.path.getsize(path):
+        raise RuntimeError("导出文件为空")
+    return best
+
+def bench_statistics(n_rows, repeat=200):
+    """进度统计（已处理数和各分类计数）以及两位审阅人的一致性统计，返回单次耗时"""
+    rng = np.random.default_rng(1)
+    decisions = DecisionStore(n_rows)
+    board = ReviewBoard(n_rows)
+    for name in ('A', 'B'):
+        status = np.zeros(n_rows, dtype=np.int8)
+        screened = rng.random(n_rows) < 0.5
+        status[screened] = rng.integers(1, 4, screened.sum())
+        board.add_reviewer(name, status)
+    decisions.set_many(np.flatnonzero(board.columns['A'] == 1), '纳入')
+    
+    def progress():
+        return decisions.processed, [decisions.count(label) for label in ('纳入', '排除', '待定')]
+    
+    progress_time, _ = timed(lambda: [progress() for _ in range(repeat)])
+    agreement_time, _ = timed(lambda: [board.agreement() for _ in range(repeat // 10)])
+    set_time, _ = timed(lambda: [board.set('A', [i], '排除') for i in range(repeat)])
+    return progress_time / repeat, agreement_time / (repeat // 10), set_time / repeat
+
+def run_size(n_rows, clicks, pandas_reference, apptest):
+    """运行一个规模下的全部基准，返回{指标: 秒}"""
+    results = {}
+    generated, path = timed(lambda: corpus_path(n_rows))
+    print(f"  语料: {path}（{generated:.2f}s）", file=sys.stderr)
+    
+    repeat = 3 if n_rows <= 10000 else 1
+    results['ingest'], df = timed(lambda: read_workbook_frame(path), repeat)
+    if pandas_reference:
+        results['ingest_pandas'], _ = timed(lambda: pd.read_excel(path), repeat)
+    df = prepare_frame(df)
+    
+    results['detect_columns'], _ = timed(lambda: detect_column_candidates(df), 5)
+    
+    if apptest:
+        results['decision_rerun_median'], results['decision_rerun_p95'] = bench_rerun_latency(df, clicks)
+    
+    (results['statistics_progress'], results['statistics_agreement'],
+     results['statistics_review_update']) = bench_statistics(n_rows)
+    
+    if apptest:
+        decisions = DecisionStore(n_rows)
+        rng = np.random.default_rng(2)
+        for label in ('纳入', '排除', '待定'):
+            decisions.set_many(np.flatnonzero(rng.random(n_rows) < 0.2), label)
+        results['export'] = bench_export(df, decisions, repeat)
+    return results
+
+def compare(current, baseline, tolerance):
+    """返回变慢超过容差的指标列表[(规模, 指标, 基线, 当前)]"""
+    regressions = []
+    for size, metrics in current['results'].items():
+        for name, value in metrics.items():
+            base = baseline.get('results', {}).get(size, {}).get(name)
+            if base is None or max(base, value) < MIN_COMPARABLE_SECONDS:
+                continue
+            if value > base * (1 + tolerance):
+                regressions.append((size, name, base, value))
+    return regressions
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="文献筛选工具基准测试")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="语料行数")
+    parser.add_argument('--clicks', type=int, default=20, help="测量重新运行延迟时的点击次数")
+    parser.add_argument('--skip-pandas-reference', action='store_true', help="跳过作为参照的pd.read_excel测量")
+    parser.add_argument('--skip-apptest', action='store_true', help="跳过通过AppTest运行应用的测量（重新运行延迟和导出）")
+    parser.add_argument('--output', help="结果JSON文件")
+    parser.add_argument('--save-baseline', action='store_true', help=f"把结果写入基线（{BASELINE_PATH}）")
+    parser.add_argument('--compare', nargs='?', const=BASELINE_PATH, help="与基线JSON比较")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="允许的变慢比例")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    
+    report = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+        },
+        'results': {},
+    }
+    for n_rows in args.sizes:
+        print(f"== {n_rows} 行", file=sys.stderr)
+        results = run_size(n_rows, args.clicks, not args.skip_pandas_reference, not args.skip_apptest)
+        report['results'][str(n_rows)] = results
+        for name, value in results.items():
+            print(f"  {name:28s} {value * 1000:12.2f} ms", file=sys.stderr)
+    
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            f.write(text)
+    if not args.output and not args.save_baseline:
+        print(text)
+    
+    if args.compare:
+        if not os.path.exists(args.compare):
+            with open(args.compare, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"没有找到基线，已把本次结果写为基线: {args.compare}", file=sys.stderr)
+            return 0
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for size, name, base, value in regressions:
+            print(f"变慢: {size} 行 {name}: {base * 1000:.2f} ms -> {value * 1000:.2f} ms "
+                  f"({value / base - 1:+.0%})", file=sys.stderr)
+        if regressions:
+            return 1
+        print("与基线相比没有超过容差的变慢", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# cli.py
+"""文献筛选命令行工具：读取Excel、题录或项目文件，应用决策表、自动保存记录或规则集，批量导出四个工作表的结果
+
+示例：
+    python cli.py 文献.xlsx -o 结果.xlsx --rules 规则.json
+    python cli.py 文献.xlsx -o 结果.xlsx --decisions 决策.csv --title 标题 --abstract 摘要
+    python cli.py 文献.xlsx -o 结果.xlsx --journal --reviewer 张三
+    python cli.py 文献.xlsx --save-project 项目.feather --rules 规则.json
+    python cli.py 项目.feather -o 结果.xlsx
+    python cli.py pubmed.nbib -o 结果.xlsx --rules 规则.json
+    python cli.py scopus.csv wos.txt pubmed.nbib -o 结果.xlsx   # 合并并去除重复
+    python cli.py 文献筛选结果_20240101_120000.xlsx -o 结果.xlsx --rules 规则.json   # 在导出结果上继续
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+from screening.decisions import STATUS_LABELS, DecisionStore, apply_decision_table
+from screening.ingest import (
+    detect_column_candidates, file_content_hash, load_cached_frame, load_workbook, prepare_frame, store_cached_frame,
+)
+from screening.reader import read_workbook_frame
+from screening.journal import JOURNAL_PATH, DecisionJournal, restore_decisions
+from screening.rules import apply_rules, evaluate_rules
+from screening.export import write_results_workbook
+from screening.project import is_project_file, load_project, save_project
+from screening.merge import merge_frames, merged_file_hash
+from screening.resume import is_results_workbook, load_results_workbook
+
+MAPPING_KEYS = ['title', 'title_translation', 'abstract', 'abstract_translation']
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="文献筛选批处理：读取、应用决策/规则并导出结果")
+    parser.add_argument('input', nargs='+',
+                        help="包含文献信息的Excel文件、题录文件（RIS、BibTeX、NBIB、WoS制表符分隔、CSV），"
+                             "项目文件（.feather，包含已有的决策和列映射）或导出的结果文件；给出多个文件时合并并去除重复")
+    parser.add_argument('-o', '--output', help="导出的结果文件（.xlsx）")
+    parser.add_argument('--save-project', help="同时保存为项目文件（.feather），可在网页应用中上传继续筛选")
+    parser.add_argument('--title', help="标题列（默认自动识别）")
+    parser.add_argument('--title-translation', help="标题翻译列")
+    parser.add_argument('--abstract', help="摘要列（默认自动识别）")
+    parser.add_argument('--abstract-translation', help="摘要翻译列")
+    parser.add_argument('--decisions', action='append', default=[],
+                        help="决策表（CSV或Excel，包含序号、分类列，可选备注列），可重复指定")
+    parser.add_argument('--journal', nargs='?', const=JOURNAL_PATH,
+                        help="从网页应用的自动保存记录恢复决策（可指定日志路径）")
+    parser.add_argument('--reviewer', default='', help="与--journal一起使用：恢复该审阅人的决策")
+    parser.add_argument('--rules', action='append', default=[],
+                        help="规则集JSON文件（格式同网页中的规则预筛选），按顺序应用，可重复指定")
+    parser.add_argument('--no-cache', action='store_true', help="不使用导入缓存")
+    return parser
+
+def resolve_mapping(df, args, saved=None):
+    """命令行指定的列优先，其次是项目中保存的映射；标题和摘要未指定时使用自动识别的第一个候选"""
+    candidates = detect_column_candidates(df)
+    saved = saved or {}
+    mapping = {}
+    for key in MAPPING_KEYS:
+        col = getattr(args, key)
+        if col is None:
+            col = saved.get(key)
+        if col is None and key in ('title', 'abstract') and candidates[key]:
+            col = candidates[key][0]
+        if col is not None and col not in df.columns:
+            raise ValueError(f"列不存在: {col}")
+        mapping[key] = col
+    return mapping
+
+def read_decision_table(path):
+    if os.path.splitext(path)[1].lower() in ('.xlsx', '.xls', '.xlsm'):
+        table = read_workbook_frame(path)
+    else:
+        table = pd.read_csv(path)
+    missing = {'序号', '分类'} - set(table.columns)
+    if missing:
+        raise ValueError(f"{path} 缺少列: {', '.join(sorted(missing))}")
+    return table
+
+def load_merged(paths, use_cache=True):
+    """读取并合并多个文件，返回(df, 合并结果的哈希, 去除的重复篇数)；哈希与网页应用一致"""
+    frames, hashes = [], []
+    for path in paths:
+        if is_project_file(path):
+            raise ValueError("项目文件不能与其他文件合并")
+        with open(path, 'rb') as f:
+            file_hash = file_content_hash(f.read())
+        frame = load_cached_frame(file_hash) if use_cache else None
+        if frame is None:
+            frame = read_workbook_frame(path)
+            if use_cache:
+                store_cached_frame(file_hash, frame)
+        frames.append(frame)
+        hashes.append(file_hash)
+    
+    df, n_duplicates = merge_frames(frames, [os.path.basename(path) for path in paths])
+    return prepare_frame(df), merged_file_hash(hashes), n_duplicates
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.output and not args.save_project:
+        parser.error("请至少指定 -o/--output 或 --save-project")
+    started = time.perf_counter()
+    
+    def report(message):
+        print(f"[{time.perf_counter() - started:7.2f}s] {message}", file=sys.stderr)
+    
+    try:
+        project = None
+        if len(args.input) > 1:
+            df, file_hash, n_duplicates = load_merged(args.input, use_cache=not args.no_cache)
+            decisions = DecisionStore(len(df))
+            report(f"已合并 {len(args.input)} 个文件：{len(df)} 篇文献，去除重复 {n_duplicates} 篇")
+        elif is_project_file(args.input[0]) or is_results_workbook(args.input[0]):
+            project = load_project(args.input[0]) if is_project_file(args.input[0]) \
+                else load_results_workbook(args.input[0])
+            df, file_hash, decisions = project.df, project.file_hash, project.decisions
+            if file_hash is None:
+                # 与网页应用一致，没有记录原始文件哈希时按上传文件本身的内容哈希关联自动保存记录
+                with open(args.input[0], 'rb') as f:
+                    file_hash = file_content_hash(f.read())
+            report(f"已打开项目 {len(df)} 篇文献，{len(df.columns)} 列，已筛选 {decisions.processed} 篇")
+            if project.unmatched_rows:
+                report(f"警告：结果文件中有 {project.unmatched_rows} 行分类记录的序号未找到对应文献，已忽略")
+        else:
+            df, file_hash = load_workbook(args.input[0], use_cache=not args.no_cache)
+            decisions = DecisionStore(len(df))
+            report(f"已读取 {len(df)} 篇文献，{len(df.columns)} 列")
+        
+        mapping = resolve_mapping(df, args, project.column_mapping if project is not None else None)
+        
+        if args.journal:
+            restored = restore_decisions(DecisionJournal(args.journal), file_hash, decisions, args.reviewer)
+            report(f"已从自动保存记录恢复 {restored} 条决策")
+        
+        for path in args.decisions:
+            applied, unmatched = apply_decision_table(decisions, df['序号'].to_numpy(), read_decision_table(path))
+            report(f"已应用决策表 {path}：{applied} 条" + (f"，{unmatched} 行的序号未找到对应文献" if unmatched else ""))
+        
+        for path in args.rules:
+            with open(path, encoding='utf-8') as f:
+                rules = json.load(f)
+            results = evaluate_rules(df, mapping, rules, decisions.status)
+            apply_rules(decisions, results)
+            summary = results.groupby('label').size()
+            report(f"已应用规则 {path}：" + ("，".join(f"{label} {count} 篇" for label, count in summary.items())
+                                            or "没有文献命中规则"))
+        
+        if args.save_project:
+            save_project(args.save_project, df, decisions, file_hash, mapping,
+                         project.extra_columns if project is not None else None,
+                         project.current_index if project is not None else 0)
+            report(f"已保存项目 {args.save_project}")
+        
+        if args.output:
+            write_results_workbook(args.output, df, decisions, file_hash=file_hash)
+            report(f"已导出 {args.output}：" + "，".join(
+                f"{label} {decisions.count(label)} 篇" for label in STATUS_LABELS[1:]) +
+                f"，未处理 {len(df) - decisions.processed} 篇")
+    except (OSError, ValueError, KeyError, re.error) as e:
+        print(f"处理失败: {str(e)}", file=sys.stderr)
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
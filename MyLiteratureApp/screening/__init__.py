@@ -0,0 +1,15 @@
+"""文献筛选核心库：读取、决策、规则、检索和导出，不依赖Streamlit，供网页应用和命令行共用"""
+from .decisions import STATUS_CODES, STATUS_LABELS, DecisionStore, apply_decision_table
+from .ingest import detect_column_candidates, load_workbook, prepare_frame
+from .reader import read_workbook_frame, read_workbook_header
+from .citations import read_citation_frame
+from .journal import DecisionJournal, restore_decisions
+from .rules import apply_rules, evaluate_rules
+from .dedup import find_duplicate_groups
+from .search import SearchIndex
+from .export import write_changes_workbook, write_results_workbook
+from .metrics import MetricsRegistry, RunTimer
+from .project import is_project_file, load_project, save_project
+from .queues import ColumnValueIndex, ScreeningQueue
+from .merge import merge_frames
+from .resume import is_results_workbook, load_results_workbook
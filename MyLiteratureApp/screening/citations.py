@@ -0,0 +1,385 @@
+"""文献筛选核心：数据库导出格式（RIS、BibTeX、PubMed NBIB、WoS制表符分隔和CSV）的流式读取"""
+import itertools
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# ====================== 题录格式 ======================
+# 带标签的题录格式统一转换为以下列，标题和摘要列名可被列名识别直接选中
+CITATION_COLUMNS = ['Title', 'Abstract', 'Authors', 'Year', 'Journal', 'DOI', 'Keywords']
+
+# 多值字段（作者、关键词）合并时的分隔符
+MULTI_VALUE_SEP = '; '
+
+CITATION_SUFFIXES = ('.ris', '.nbib', '.bib', '.txt', '.csv', '.tsv')
+
+# 每读取这么多条记录回调一次进度
+CITATION_CHUNK_ROWS = 10000
+
+# 各格式的标签：列 -> 按优先级排列的标签；作者和关键词合并所有取值，其余取第一个
+RIS_FIELDS = {
+    'Title': ('TI', 'T1', 'CT', 'BT'),
+    'Abstract': ('AB', 'N2'),
+    'Authors': ('AU', 'A1'),
+    'Year': ('PY', 'Y1', 'DA'),
+    'Journal': ('T2', 'JF', 'JO', 'JA', 'J2'),
+    'DOI': ('DO',),
+    'Keywords': ('KW',),
+}
+
+NBIB_FIELDS = {
+    'Title': ('TI', 'BTI'),
+    'Abstract': ('AB',),
+    'Authors': ('FAU', 'AU'),
+    'Year': ('DP',),
+    'Journal': ('JT', 'TA'),
+    'DOI': (),
+    'Keywords': ('OT', 'MH'),
+}
+
+WOS_FIELDS = {
+    'Title': ('TI',),
+    'Abstract': ('AB',),
+    'Authors': ('AF', 'AU'),
+    'Year': ('PY',),
+    'Journal': ('SO',),
+    'DOI': ('DI',),
+    'Keywords': ('DE', 'ID'),
+}
+
+BIBTEX_FIELDS = {
+    'Title': ('title',),
+    'Abstract': ('abstract',),
+    'Authors': ('author', 'editor'),
+    'Year': ('year', 'date'),
+    'Journal': ('journal', 'journaltitle', 'booktitle'),
+    'DOI': ('doi',),
+    'Keywords': ('keywords',),
+}
+
+_MULTI_VALUE_COLUMNS = {'Authors', 'Keywords'}
+
+_RIS_LINE_RE = re.compile(r'^([A-Z][A-Z0-9])  -(?: (.*))?$')
+_NBIB_LINE_RE = re.compile(r'^([A-Z][A-Z0-9]{1,3}) *- (.*)$')
+_YEAR_RE = re.compile(r'\b(1[5-9]\d\d|20\d\d)\b')
+_BIBTEX_ENTRY_RE = re.compile(r'^\s*@\s*(\w+)\s*[{(]')
+
+def is_citation_file(path):
+    return os.path.splitext(str(path))[1].lower() in CITATION_SUFFIXES
+
+def _open_text(path):
+    # 数据库导出基本都是UTF-8（可能带BOM）；个别无法解码的字节替换掉，不中断读取
+    return open(path, encoding='utf-8-sig', errors='replace', newline='')
+
+def detect_citation_format(path):
+    """按扩展名和首个非空行判断格式：ris、nbib、bibtex、wos、csv"""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == '.bib':
+        return 'bibtex'
+    if suffix in ('.csv', '.tsv'):
+        return 'csv'
+    
+    with _open_text(path) as f:
+        first = next((line.strip('\r\n') for line in f if line.strip()), '')
+    if first.startswith('PT\t') or first.startswith('FN\t'):
+        return 'wos'
+    if _RIS_LINE_RE.match(first):
+        return 'ris'
+    if _NBIB_LINE_RE.match(first):
+        return 'nbib'
+    if _BIBTEX_ENTRY_RE.match(first):
+        return 'bibtex'
+    if suffix in ('.ris', '.nbib'):
+        return suffix[1:]
+    raise ValueError("无法识别的题录格式，请使用RIS、BibTeX、PubMed（NBIB）、WoS制表符分隔或CSV文件")
+
+def _first_year(value):
+    match = _YEAR_RE.search(value)
+    return int(match.group(1)) if match else None
+
+def _build_row(tags, fields):
+    """由{标签: [取值]}生成一行（按CITATION_COLUMNS顺序）"""
+    row = []
+    for column in CITATION_COLUMNS:
+        values = []
+        for tag in fields[column]:
+            values = [value for value in tags.get(tag, ()) if value]
+            if values:
+                break
+        if not values:
+            row.append(None)
+        elif column in _MULTI_VALUE_COLUMNS:
+            row.append(MULTI_VALUE_SEP.join(values))
+        elif column == 'Year':
+            row.append(_first_year(values[0]))
+        else:
+            row.append(values[0])
+    return row
+
+def _iter_tagged_records(lines, line_re, end_tag=None):
+    """逐条生成{标签: [取值]}；标签行之外的非空行续接到上一个取值
+    
+    end_tag为记录结束标签（RIS的ER）；为None时以空行或重复出现的首个标签分隔记录（NBIB）。
+    """
+    tags, last, first_tag = {}, None, None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        match = line_re.match(line)
+        if match:
+            tag, value = match.group(1), (match.group(2) or '').strip()
+            if tag == end_tag:
+                if tags:
+                    yield tags
+                tags, last, first_tag = {}, None, None
+                continue
+            if end_tag is None and tag == first_tag and tags:
+                yield tags
+                tags = {}
+            if first_tag is None or not tags:
+                first_tag = tag
+            last = tags.setdefault(tag, [])
+            last.append(value)
+        elif line.strip():
+            if last:
+                last[-1] = f"{last[-1]} {line.strip()}" if last[-1] else line.strip()
+        elif end_tag is None and tags:
+            yield tags
+            tags, last, first_tag = {}, None, None
+    if tags:
+        yield tags
+
+def _iter_ris_rows(f):
+    for tags in _iter_tagged_records(f, _RIS_LINE_RE, end_tag='ER'):
+        yield _build_row(tags, RIS_FIELDS)
+
+def _iter_nbib_rows(f):
+    for tags in _iter_tagged_records(f, _NBIB_LINE_RE):
+        # DOI在LID/AID中，以“[doi]”结尾
+        dois = [value[:-len('[doi]')].strip() for value in tags.get('LID', []) + tags.get('AID', [])
+                if value.endswith('[doi]')]
+        row = _build_row(tags, NBIB_FIELDS)
+        row[CITATION_COLUMNS.index('DOI')] = dois[0] if dois else None
+        yield row
+
+def _iter_wos_rows(f):
+    # 制表符分隔且不使用引号，直接按行切分；不用csv模块，因为摘要可能超过其128KB的字段上限，
+    # 而调整上限会修改进程全局的设置
+    lines = (line.rstrip('\r\n') for line in f)
+    header = [tag.strip() for tag in next(lines, '').split('\t')]
+    for line in lines:
+        values = line.split('\t')
+        if not any(values):
+            continue
+        # 作者和关键词在WoS中已是分号分隔的单个取值
+        yield _build_row({tag: [value.strip()] for tag, value in zip(header, values)}, WOS_FIELDS)
+
+# ---------------------- BibTeX ----------------------
+_LATEX_ESCAPE_RE = re.compile(r'\\([&%$#_])')
+_LATEX_ACCENT_RE = re.compile(r'\\[\'"`^~=.]')
+_LATEX_COMMAND_RE = re.compile(r'\\[a-zA-Z]+\s*')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def _clean_bibtex_value(value):
+    """去掉花括号和常见LaTeX命令（重音、\\emph等），保留转义的符号"""
+    value = _LATEX_ESCAPE_RE.sub(r'\1', value)
+    value = _LATEX_ACCENT_RE.sub('', value)
+    value = _LATEX_COMMAND_RE.sub('', value)
+    value = value.replace('{', '').replace('}', '')
+    return _WHITESPACE_RE.sub(' ', value).strip()
+
+def _read_bibtex_value(text, i, strings):
+    """从位置i读取一个取值（可用#拼接），返回(取值, 结束位置)"""
+    parts = []
+    n = len(text)
+    while i < n:
+        while i < n and text[i].isspace():
+            i += 1
+        if i >= n:
+            break
+        ch = text[i]
+        if ch in '{"':
+            close = '}' if ch == '{' else '"'
+            depth, j = 0, i + 1
+            while j < n:
+                c = text[j]
+                if c == '\\':
+                    j += 2
+                    continue
+                if c == '{':
+                    depth += 1
+                elif c == '}' and depth:
+                    depth -= 1
+                elif c == close and not depth:
+                    break
+                j += 1
+            parts.append(text[i + 1:j])
+            i = j + 1
+        else:
+            j = i
+            while j < n and text[j] not in ',#}) \t\r\n':
+                j += 1
+            word = text[i:j]
+            parts.append(strings.get(word.lower(), word))
+            i = j
+        while i < n and text[i].isspace():
+            i += 1
+        if i < n and text[i] == '#':
+            i += 1
+            continue
+        break
+    return ''.join(parts), i
+
+def _parse_bibtex_fields(body, strings):
+    """解析条目正文（引用键之后的部分），返回{字段名: 取值}"""
+    fields = {}
+    i, n = 0, len(body)
+    while i < n:
+        eq = body.find('=', i)
+        if eq < 0:
+            break
+        name = body[i:eq].strip().strip(',').strip().lower()
+        value, i = _read_bibtex_value(body, eq + 1, strings)
+        if name:
+            fields[name] = value
+        comma = body.find(',', i)
+        if comma < 0:
+            break
+        i = comma + 1
+    return fields
+
+def _iter_bibtex_entries(f):
+    """逐个生成(条目类型, 条目正文)；按花括号深度和引号判断条目结束，不需要读入整个文件"""
+    buffer, depth, quoted, kind, close = [], 0, False, None, None
+    for line in f:
+        if kind is None:
+            match = _BIBTEX_ENTRY_RE.match(line)
+            if not match:
+                continue
+            kind = match.group(1).lower()
+            close = '}' if line[match.end() - 1] == '{' else ')'
+            line = line[match.end():]
+            buffer, depth, quoted = [], 0, False
+        
+        end = None
+        j = 0
+        while j < len(line):
+            c = line[j]
+            if c == '\\':
+                j += 2
+                continue
+            if depth == 0 and c == '"':
+                quoted = not quoted
+            elif c == close and depth == 0 and not quoted:
+                end = j
+                break
+            elif c == '{':
+                depth += 1
+            elif c == '}':
+                depth -= 1
+            j += 1
+        
+        if end is None:
+            buffer.append(line)
+            continue
+        buffer.append(line[:end])
+        yield kind, ''.join(buffer)
+        kind = None
+
+def _iter_bibtex_rows(f):
+    strings = {}
+    for kind, text in _iter_bibtex_entries(f):
+        if kind in ('comment', 'preamble'):
+            continue
+        if kind == 'string':
+            strings.update((name, _clean_bibtex_value(value))
+                           for name, value in _parse_bibtex_fields(text, strings).items())
+            continue
+        
+        comma = text.find(',')
+        fields = _parse_bibtex_fields(text[comma + 1:] if comma >= 0 else '', strings)
+        tags = {}
+        for name, value in fields.items():
+            value = _clean_bibtex_value(value)
+            if name in ('author', 'editor'):
+                tags[name] = [author.strip() for author in re.split(r'\s+and\s+', value) if author.strip()]
+            else:
+                tags[name] = [value]
+        yield _build_row(tags, BIBTEX_FIELDS)
+
+_TAGGED_READERS = {
+    'ris': _iter_ris_rows,
+    'nbib': _iter_nbib_rows,
+    'wos': _iter_wos_rows,
+    'bibtex': _iter_bibtex_rows,
+}
+
+# ---------------------- CSV ----------------------
+def _csv_options(path):
+    sep = '\t' if path.lower().endswith('.tsv') else ','
+    # 中文数据库（如知网）导出的CSV常为GBK编码
+    with open(path, 'rb') as f:
+        head = f.read(1 << 20)
+    try:
+        head.decode('utf-8')
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError as e:
+        # 截断处恰好落在多字节字符中间时仍按UTF-8处理
+        encoding = 'utf-8-sig' if e.start >= len(head) - 3 else 'gb18030'
+    return {'sep': sep, 'encoding': encoding}
+
+def _finalize_year(values):
+    series = pd.Series(values, dtype=object)
+    numbers = pd.to_numeric(series, errors='coerce')
+    if len(numbers) and numbers.notna().all():
+        return numbers.astype(np.int64)
+    return numbers
+
+# ====================== 读取接口 ======================
+def read_citation_header(path, sample_rows=0):
+    """只读取列名和前若干条记录，返回值与read_workbook_header相同（总行数未知时为None）"""
+    fmt = detect_citation_format(path)
+    if fmt == 'csv':
+        sample_df = pd.read_csv(path, nrows=sample_rows, **_csv_options(path))
+        return sample_df.columns.tolist(), sample_df.values.tolist(), None
+    
+    with _open_text(path) as f:
+        sample = list(itertools.islice(_TAGGED_READERS[fmt](f), sample_rows))
+    return list(CITATION_COLUMNS), sample, None
+
+def read_citation_frame(path, columns=None, progress=None):
+    """流式读取题录文件，逐条解析并按列累积，可只保留指定列；progress(已读条数)"""
+    fmt = detect_citation_format(path)
+    if fmt == 'csv':
+        chunks = []
+        n_rows = 0
+        reader = pd.read_csv(path, usecols=columns, chunksize=CITATION_CHUNK_ROWS, **_csv_options(path))
+        for chunk in reader:
+            chunks.append(chunk)
+            n_rows += len(chunk)
+            if progress is not None:
+                progress(n_rows)
+        if not chunks:
+            return pd.read_csv(path, usecols=columns, nrows=0, **_csv_options(path))
+        return pd.concat(chunks, ignore_index=True)
+    
+    indices = [CITATION_COLUMNS.index(col) for col in columns] if columns is not None \
+        else list(range(len(CITATION_COLUMNS)))
+    data = [[] for _ in indices]
+    n_rows = 0
+    with _open_text(path) as f:
+        for row in _TAGGED_READERS[fmt](f):
+            for values, col_idx in zip(data, indices):
+                values.append(row[col_idx])
+            n_rows += 1
+            if progress is not None and n_rows % CITATION_CHUNK_ROWS == 0:
+                progress(n_rows)
+    if progress is not None:
+        progress(n_rows)
+    
+    frame = {}
+    for values, col_idx in zip(data, indices):
+        column = CITATION_COLUMNS[col_idx]
+        frame[column] = _finalize_year(values) if column == 'Year' else pd.Series(values, dtype=object)
+    return pd.DataFrame(frame)
@@ -0,0 +1,153 @@
+"""文献筛选核心：按位置保存的分类决策和备注"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# ====================== 决策存储 ======================
+# 分类状态编码（int8），0 表示尚未处理
+STATUS_LABELS = ['未处理', '纳入', '待定', '排除']
+STATUS_CODES = {label: code for code, label in enumerate(STATUS_LABELS)}
+
+class DecisionStore:
+    """按文献位置保存分类状态（int8数组）和稀疏备注"""
+    
+    def __init__(self, size):
+        self.status = np.zeros(size, dtype=np.int8)
+        self.counts = np.zeros(len(STATUS_LABELS), dtype=np.int64)
+        self.counts[0] = size
+        self.notes = {}
+    
+    @classmethod
+    def from_arrays(cls, status, notes=None):
+        """由状态编码数组和备注字典创建（用于读取保存的项目）"""
+        status = np.asarray(status, dtype=np.int8)
+        if len(status) and (status.min() < 0 or status.max() >= len(STATUS_LABELS)):
+            raise ValueError("分类状态编码无效")
+        store = cls(0)
+        store.status = status
+        store.counts = np.bincount(status, minlength=len(STATUS_LABELS)).astype(np.int64)
+        store.notes = dict(notes or {})
+        return store
+    
+    def __len__(self):
+        return len(self.status)
+    
+    def snapshot(self):
+        """复制当前的分类和备注，之后的修改不影响副本（用于后台导出）"""
+        return DecisionStore.from_arrays(self.status.copy(), self.notes)
+    
+    def changed_positions(self, baseline):
+        """与baseline（之前的快照）相比分类或备注不同的位置（升序）"""
+        changed = self.status != baseline.status
+        for pos in self.notes.keys() | baseline.notes.keys():
+            if not changed[pos] and self.notes.get(pos) != baseline.notes.get(pos):
+                changed[pos] = True
+        return np.flatnonzero(changed)
+    
+    @property
+    def processed(self):
+        """已分类的文献数"""
+        return int(len(self.status) - self.counts[0])
+    
+    def count(self, label):
+        return int(self.counts[STATUS_CODES[label]])
+    
+    def get(self, pos):
+        """返回分类标签，未处理时返回None"""
+        code = self.status[pos]
+        return STATUS_LABELS[code] if code else None
+    
+    def set(self, pos, label):
+        code = STATUS_CODES[label]
+        self.counts[self.status[pos]] -= 1
+        self.counts[code] += 1
+        self.status[pos] = code
+    
+    def set_many(self, positions, label):
+        """批量设置分类"""
+        positions = np.asarray(positions, dtype=np.int64)
+        code = STATUS_CODES[label]
+        self.counts -= np.bincount(self.status[positions], minlength=len(STATUS_LABELS))
+        self.status[positions] = code
+        self.counts[code] += len(positions)
+    
+    def mask(self, label):
+        return self.status == STATUS_CODES[label]
+    
+    def positions(self, label):
+        return np.flatnonzero(self.mask(label))
+    
+    def get_note(self, pos, default=None):
+        return self.notes.get(pos, default)
+    
+    def set_note(self, pos, note):
+        self.notes[int(pos)] = note
+
+def serial_keys(values):
+    """序号转为可比较的文本键：整数值（包括1.0和文本"12"）写成整数，其余去掉首尾空白；空值为缺失值"""
+    values = pd.Series(values, dtype=object).reset_index(drop=True)
+    numbers = pd.to_numeric(values, errors='coerce')
+    integral = (numbers.notna() & (numbers == np.floor(numbers))).to_numpy()
+    keys = values.map(lambda value: None if pd.isna(value) else str(value).strip())
+    keys = keys.where(keys != '', None)
+    keys[integral] = numbers[integral].astype(np.int64).astype(str)
+    return keys
+
+def serial_digest(serials):
+    """序号序列（按文献顺序）的摘要，用于确认导出后文献顺序没有改变"""
+    text = '\x1f'.join(serial_keys(serials).fillna('').tolist())
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _match_serials(serials, keys):
+    """按序号键查找文献位置，未找到的为-1
+    
+    文献表中重复的序号按出现顺序依次对应：keys中第k次出现的序号对应文献表中第k篇带该序号的文献。
+    """
+    lookup = pd.Series(np.arange(len(serials)), index=pd.MultiIndex.from_arrays([
+        serials.fillna(''), serials.groupby(serials.fillna('')).cumcount()]))
+    lookup = lookup[serials.notna().to_numpy()]
+    ranks = keys.groupby(keys.fillna('')).cumcount()
+    positions = lookup.reindex(pd.MultiIndex.from_arrays([keys.fillna(''), ranks])).to_numpy()
+    return np.where(np.isnan(positions), -1, positions).astype(np.int64)
+
+def apply_decision_table(decisions, serials, table):
+    """按序号把决策表（序号、分类，可选备注）写入决策存储，返回(写入的篇数, 未匹配的行数)
+    
+    serials为文献表的序号列，按原值匹配（文本序号如“A-12”也可以）；分类无效的行被忽略。
+    文献表中唯一的序号以决策表中最后一行为准；文献表中重复的序号按出现顺序依次对应。
+    """
+    table = table[table['分类'].isin(STATUS_LABELS[1:]).to_numpy()].reset_index(drop=True)
+    keys = serial_keys(table['序号'])
+    serials = serial_keys(serials)
+    repeated = serials[serials.duplicated()].dropna().unique()
+    superseded = keys.duplicated(keep='last') & keys.notna() & ~keys.isin(repeated)
+    table, keys = table[~superseded.to_numpy()], keys[~superseded]
+    
+    positions = _match_serials(serials, keys)
+    valid = positions >= 0
+    positions = positions[valid]
+    labels = table['分类'].to_numpy()[valid]
+    
+    for label in STATUS_LABELS[1:]:
+        selected = positions[labels == label]
+        if len(selected):
+            decisions.set_many(selected, label)
+    
+    if '备注' in table.columns:
+        notes = table['备注'].to_numpy()[valid]
+        has_note = pd.notna(notes)
+        decisions.notes.update(zip(positions[has_note].tolist(), notes[has_note].tolist()))
+    
+    return len(positions), int((~valid).sum())
+
+def get_record_note(df, decisions, pos):
+    """读取备注：优先使用筛选时填写的备注，否则使用原表的备注列"""
+    note = decisions.get_note(pos)
+    if note is not None:
+        return note
+    if '备注' in df.columns:
+        existing_note = df['备注'].iat[pos]
+        if pd.notna(existing_note):
+            return existing_note
+    return ''
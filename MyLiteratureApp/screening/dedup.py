@@ -0,0 +1,134 @@
+"""文献筛选核心：基于MinHash/LSH的近似重复检测"""
+import re
+import unicodedata
+
+import numpy as np
+
+# ====================== 重复检测 ======================
+# MinHash签名长度与LSH分段：16段×4行，估计相似度约0.5以上的文献对会落入同一桶
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16
+DEDUP_SHINGLE = 4
+DEDUP_THRESHOLD = 0.8
+# 每篇文献参与比较的最大字符数（标题+摘要开头）
+DEDUP_MAX_CHARS = 800
+DEDUP_CHUNK_DOCS = 2000
+
+_PUNCT_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+def normalize_text(value):
+    """统一全半角、大小写，标点替换为空格"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    text = unicodedata.normalize('NFKC', str(value)).lower()
+    return _PUNCT_RE.sub(' ', text).strip()
+
+def shingle_hashes(texts, k=DEDUP_SHINGLE):
+    """批量计算字符k-gram的32位哈希（中英文通用）
+    
+    返回(有文本的文献下标, 去重后的哈希值, 每篇文献在哈希数组中的起始位置)
+    """
+    lengths = np.array([len(text) for text in texts], dtype=np.int64)
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32)
+    empty = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int64)
+    n_windows = len(codes) - k + 1
+    if n_windows <= 0:
+        return empty
+    
+    hashes = np.zeros(n_windows, dtype=np.uint32)
+    for offset in range(k):
+        hashes = hashes * np.uint32(0x01000193) ^ codes[offset:offset + n_windows]
+    
+    # 丢弃跨越两篇文献边界的窗口
+    doc_of = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+    valid = doc_of[:n_windows] == doc_of[k - 1:]
+    keyed = np.sort((doc_of[:n_windows][valid].astype(np.uint64) << np.uint64(32)) | hashes[valid])
+    if not len(keyed):
+        # 每篇文献都短于k个字符
+        return empty
+    keyed = keyed[np.r_[True, keyed[1:] != keyed[:-1]]]
+    
+    docs = (keyed >> np.uint64(32)).astype(np.int64)
+    values = (keyed & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    offsets = np.flatnonzero(np.r_[True, docs[1:] != docs[:-1]])
+    return docs[offsets], values, offsets
+
+def minhash_signatures(texts, num_perm=DEDUP_NUM_PERM):
+    """分块计算MinHash签名；没有文本的文献签名全为最大值"""
+    rng = np.random.default_rng(20240101)
+    a = rng.integers(1, 2**32, num_perm, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+    b = rng.integers(0, 2**32, num_perm, dtype=np.uint64).astype(np.uint32)
+    
+    max_hash = np.iinfo(np.uint32).max
+    signatures = np.full((len(texts), num_perm), max_hash, dtype=np.uint32)
+    
+    for start in range(0, len(texts), DEDUP_CHUNK_DOCS):
+        docs, values, offsets = shingle_hashes(texts[start:start + DEDUP_CHUNK_DOCS])
+        if not len(docs):
+            continue
+        rows = docs + start
+        for p in range(num_perm):
+            permuted = values * a[p] + b[p]
+            signatures[rows, p] = np.minimum.reduceat(permuted, offsets)
+    
+    return signatures
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def find_duplicate_groups(texts, threshold=DEDUP_THRESHOLD, bands=DEDUP_BANDS):
+    """MinHash+LSH查找近似重复，返回每篇文献的重复簇编号（-1表示无重复）"""
+    n = len(texts)
+    signatures = minhash_signatures(texts)
+    has_text = (signatures != np.iinfo(np.uint32).max).any(axis=1)
+    rows_per_band = signatures.shape[1] // bands
+    
+    parent = list(range(n))
+    candidates = np.flatnonzero(has_text)
+    for band in range(bands):
+        block = signatures[candidates, band * rows_per_band:(band + 1) * rows_per_band]
+        # 每段的若干行合成一个64位桶键
+        keys = np.zeros(len(candidates), dtype=np.uint64)
+        for col in range(block.shape[1]):
+            keys = keys * np.uint64(0x100000001B3) ^ block[:, col].astype(np.uint64)
+        
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        group_first = np.repeat(order[starts], sizes)
+        
+        # 桶内每篇只与桶内第一篇比较，避免大桶的平方级比较
+        members = candidates[order]
+        reps = candidates[group_first]
+        linked = members != reps
+        if not linked.any():
+            continue
+        similarity = (signatures[members[linked]] == signatures[reps[linked]]).mean(axis=1)
+        for i, j in zip(members[linked][similarity >= threshold].tolist(),
+                        reps[linked][similarity >= threshold].tolist()):
+            root_i, root_j = _find(parent, i), _find(parent, j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+    
+    roots = np.array([_find(parent, i) for i in range(n)], dtype=np.int64)
+    counts = np.bincount(roots, minlength=n)
+    return np.where(counts[roots] > 1, roots, -1)
+
+def dedup_texts(df, column_mapping):
+    """拼接映射的标题和摘要列作为查重文本"""
+    parts = []
+    for key in ('title', 'abstract'):
+        col = column_mapping.get(key)
+        if col and col in df.columns:
+            parts.append(df[col].map(normalize_text))
+    if not parts:
+        return [''] * len(df)
+    
+    combined = parts[0]
+    for part in parts[1:]:
+        combined = combined + ' ' + part
+    return [text.strip()[:DEDUP_MAX_CHARS] for text in combined.tolist()]
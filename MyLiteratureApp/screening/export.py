@@ -0,0 +1,202 @@
+"""文献筛选核心：四工作表结果导出"""
+import datetime
+import math
+
+import numpy as np
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.packaging.custom import StringProperty
+from openpyxl.styles import PatternFill
+
+from .decisions import STATUS_LABELS, serial_digest
+
+# ====================== 导出引擎 ======================
+# Excel单个工作表的行数上限（含表头行）
+EXCEL_MAX_ROWS = 1048576
+
+# 每次从DataFrame取出并转换的行数，决定导出时的峰值内存
+EXPORT_CHUNK_ROWS = 5000
+
+# "所有文献"工作表序号列的颜色标记（ARGB）
+ALL_SHEET_FILLS = {
+    '纳入': 'FF90EE90',
+    '待定': 'FFFFFF00',
+    '排除': 'FFFF0000',
+}
+
+# 分类工作表：(工作表名, 分类, 序号列颜色)
+CATEGORY_SHEETS = [
+    ('纳入文章', '纳入', 'FF90EE90'),
+    ('待定文章', '待定', 'FFFFE0B2'),
+    ('排除文章', '排除', 'FFFFCCCC'),
+]
+
+# 变更导出的工作表名
+CHANGES_SHEET = '变更文献'
+
+# 结果文件的自定义文档属性：原始文件哈希和序号顺序摘要，恢复时据此关联自动保存日志
+SOURCE_HASH_PROPERTY = 'LiteratureReviewFileHash'
+SERIAL_DIGEST_PROPERTY = 'LiteratureReviewSerialDigest'
+
+def iter_export_rows(df, positions, notes, chunk_size=EXPORT_CHUNK_ROWS):
+    """按块生成导出行（最后一列为备注），空值转换为None"""
+    has_note_col = '备注' in df.columns
+    note_col_idx = df.columns.get_loc('备注') if has_note_col else None
+    
+    for start in range(0, len(positions), chunk_size):
+        chunk_positions = np.asarray(positions[start:start + chunk_size])
+        chunk = df.iloc[chunk_positions]
+        rows = chunk.astype(object).where(chunk.notna(), None).values.tolist()
+        
+        for pos, row in zip(chunk_positions.tolist(), rows):
+            note = notes.get(pos)
+            if has_note_col:
+                if note is not None:
+                    row[note_col_idx] = note
+            else:
+                row.append(note if note is not None else '')
+            yield pos, row
+
+# ====================== xlsx写出 ======================
+# 使用openpyxl只写模式：行在追加时即写入临时文件，内存中不保留单元格对象
+_PATTERN_FILLS = {}
+
+def _pattern_fill(argb):
+    """按颜色缓存的纯色填充，所有单元格共用同一个样式"""
+    fill = _PATTERN_FILLS.get(argb)
+    if fill is None:
+        fill = _PATTERN_FILLS[argb] = PatternFill(start_color=argb, end_color=argb, fill_type='solid')
+    return fill
+
+def _cell_value(value):
+    """openpyxl不能写入的值：去掉XML不允许的控制字符和时区，非有限浮点数写为文本"""
+    kind = type(value)
+    if kind is str:
+        return ILLEGAL_CHARACTERS_RE.sub('', value) if ILLEGAL_CHARACTERS_RE.search(value) else value
+    if kind is float:
+        return value if math.isfinite(value) else str(value)
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+def new_workbook(properties=None):
+    """只写模式的工作簿；properties为自定义文档属性{名称: 文本}"""
+    wb = openpyxl.Workbook(write_only=True)
+    for name, value in (properties or {}).items():
+        wb.custom_doc_props.append(StringProperty(name=name, value=str(value)))
+    return wb
+
+class SplitSheetWriter:
+    """流式写入工作表，超过Excel行数上限时自动续写到新工作表"""
+    
+    def __init__(self, wb, base_name, header, max_rows=EXCEL_MAX_ROWS):
+        self.wb = wb
+        self.base_name = base_name
+        self.header = header
+        self.max_rows = max_rows
+        self.part = 0
+        self.ws = None
+        self.rows_in_sheet = 0
+        self._new_sheet()
+    
+    def _new_sheet(self):
+        self.part += 1
+        title = self.base_name if self.part == 1 else f"{self.base_name}_{self.part}"
+        self.ws = self.wb.create_sheet(title=title)
+        self.ws.append(self.header)
+        self.rows_in_sheet = 1
+    
+    def append(self, row, fill=None):
+        """追加一行；fill为首个单元格（序号列）的填充色（ARGB）"""
+        if self.rows_in_sheet >= self.max_rows:
+            self._new_sheet()
+        
+        row = [_cell_value(value) for value in row]
+        if fill is not None and row:
+            first = WriteOnlyCell(self.ws, value=row[0])
+            first.fill = _pattern_fill(fill)
+            row[0] = first
+        
+        self.ws.append(row)
+        self.rows_in_sheet += 1
+
+def write_results_workbook(path, df, decisions, on_stage=None, progress=None, file_hash=None):
+    """单次流式写出四个工作表，写入行的同时设置分类颜色
+    
+    on_stage(名称)在开始写每个工作表和最终打包保存（'保存'）前调用，可用于分阶段计时；
+    progress(工作表, 已写行数, 总行数)在开始时对每个工作表调用一次，之后每写完一块调用一次。
+    file_hash为原始文件的内容哈希，与序号顺序摘要一起写入文档属性，从结果文件恢复时用于关联自动保存日志。
+    """
+    if on_stage is None:
+        on_stage = lambda name: None
+    if progress is None:
+        progress = lambda sheet, done, total: None
+    
+    header = df.columns.tolist()
+    if '备注' not in df.columns:
+        header.append('备注')
+    
+    categories = [(sheet_name, decisions.positions(selection), fill)
+                  for sheet_name, selection, fill in CATEGORY_SHEETS]
+    progress('所有文献', 0, len(df))
+    for sheet_name, positions, _ in categories:
+        progress(sheet_name, 0, len(positions))
+    
+    properties = {}
+    if file_hash and '序号' in df.columns:
+        properties = {SOURCE_HASH_PROPERTY: file_hash, SERIAL_DIGEST_PROPERTY: serial_digest(df['序号'])}
+    wb = new_workbook(properties)
+    
+    # 所有文献（序号列按分类着色）
+    on_stage('所有文献')
+    writer = SplitSheetWriter(wb, '所有文献', header)
+    fills = [None] + [ALL_SHEET_FILLS[label] for label in STATUS_LABELS[1:]]
+    status = decisions.status
+    for done, (pos, row) in enumerate(iter_export_rows(df, np.arange(len(df)), decisions.notes), start=1):
+        writer.append(row, fills[status[pos]])
+        if done % EXPORT_CHUNK_ROWS == 0:
+            progress('所有文献', done, len(df))
+    progress('所有文献', len(df), len(df))
+    
+    # 分类工作表（按布尔掩码划分）
+    for sheet_name, positions, fill in categories:
+        on_stage(sheet_name)
+        writer = SplitSheetWriter(wb, sheet_name, header)
+        for done, (_, row) in enumerate(iter_export_rows(df, positions, decisions.notes), start=1):
+            writer.append(row, fill)
+            if done % EXPORT_CHUNK_ROWS == 0:
+                progress(sheet_name, done, len(positions))
+        progress(sheet_name, len(positions), len(positions))
+    
+    on_stage('保存')
+    wb.save(path)
+
+def write_changes_workbook(path, df, decisions, baseline, progress=None):
+    """只写出与baseline相比分类或备注有变化的文献，返回写出的篇数
+    
+    单个工作表，末尾两列为原分类和当前分类，序号列按当前分类着色；
+    耗时只与变化的篇数成正比，适合在完整导出之后频繁导出增量。
+    """
+    if progress is None:
+        progress = lambda sheet, done, total: None
+    
+    positions = decisions.changed_positions(baseline)
+    header = df.columns.tolist()
+    if '备注' not in df.columns:
+        header.append('备注')
+    header += ['原分类', '分类']
+    progress(CHANGES_SHEET, 0, len(positions))
+    
+    wb = new_workbook()
+    writer = SplitSheetWriter(wb, CHANGES_SHEET, header)
+    fills = [None] + [ALL_SHEET_FILLS[label] for label in STATUS_LABELS[1:]]
+    for done, (pos, row) in enumerate(iter_export_rows(df, positions, decisions.notes), start=1):
+        old, new = baseline.status[pos], decisions.status[pos]
+        writer.append(row + [STATUS_LABELS[old], STATUS_LABELS[new]], fills[new])
+        if done % EXPORT_CHUNK_ROWS == 0:
+            progress(CHANGES_SHEET, done, len(positions))
+    progress(CHANGES_SHEET, len(positions), len(positions))
+    
+    wb.save(path)
+    return len(positions)
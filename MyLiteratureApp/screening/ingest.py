@@ -0,0 +1,174 @@
+"""文献筛选核心：导入缓存、表格预处理和列名识别"""
+import hashlib
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from .reader import read_workbook_frame
+
+# ====================== 导入缓存 ======================
+# 解析结果以Parquet格式缓存在本地磁盘，按文件内容哈希索引
+INGEST_CACHE_DIR = os.environ.get(
+    'LRT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'literature_review_cache'))
+INGEST_CACHE_MAX_BYTES = int(os.environ.get('LRT_INGEST_CACHE_MB', '2048')) * 1024 * 1024
+
+# 上传的原始文件单独存放，不参与缓存的容量淘汰（会话随时可能按需读取其余列），
+# 超过保留时间未再使用的才清理
+UPLOAD_SOURCE_RETENTION_SECONDS = 7 * 24 * 3600
+
+def file_content_hash(data):
+    """计算文件内容的SHA-256哈希"""
+    return hashlib.sha256(data).hexdigest()
+
+def ingest_cache_path(file_hash):
+    return os.path.join(INGEST_CACHE_DIR, 'ingest', f"{file_hash}.parquet")
+
+def load_cached_frame(file_hash):
+    """从缓存读取已解析的DataFrame，未命中时返回None"""
+    path = ingest_cache_path(file_hash)
+    if not os.path.exists(path):
+        return None
+    
+    try:
+        df = pd.read_parquet(path, memory_map=True)
+    except Exception:
+        return None
+    
+    # 更新修改时间，作为LRU淘汰依据
+    os.utime(path)
+    return df
+
+def evict_ingest_cache(max_bytes=INGEST_CACHE_MAX_BYTES):
+    """按最近使用时间淘汰缓存文件，直到总大小不超过上限"""
+    cache_dir = os.path.dirname(ingest_cache_path(''))
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and not entry.name.endswith('.tmp'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+        except OSError:
+            pass
+
+def store_cached_frame(file_hash, df):
+    """将解析结果写入缓存；无法用Parquet表示的表格（如混合类型列）不缓存"""
+    if not all(isinstance(col, str) for col in df.columns):
+        return False
+    
+    path = ingest_cache_path(file_hash)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        return False
+    
+    evict_ingest_cache()
+    return True
+
+def upload_source_path(file_hash, suffix):
+    return os.path.join(INGEST_CACHE_DIR, 'sources', f"{file_hash}{suffix}")
+
+def prune_upload_sources(retention=UPLOAD_SOURCE_RETENTION_SECONDS):
+    """删除超过保留时间未再使用的原始文件"""
+    source_dir = os.path.dirname(upload_source_path('', ''))
+    if not os.path.isdir(source_dir):
+        return
+    deadline = time.time() - retention
+    for entry in os.scandir(source_dir):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < deadline:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
+def store_upload_source(data, file_hash, suffix):
+    """将上传的原始文件保存到原始文件目录，供按需读取其余列"""
+    path = upload_source_path(file_hash, suffix)
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+    
+    prune_upload_sources()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+def prepare_frame(df):
+    """补充序号列"""
+    if '序号' not in df.columns:
+        df.insert(0, '序号', range(1, len(df) + 1))
+    return df
+
+def load_workbook(path, use_cache=True):
+    """读取完整表格并补充序号列，返回(df, file_hash)；use_cache时按文件内容哈希使用导入缓存"""
+    with open(path, 'rb') as f:
+        file_hash = file_content_hash(f.read())
+    
+    df = load_cached_frame(file_hash) if use_cache else None
+    if df is None:
+        df = read_workbook_frame(path)
+        if use_cache:
+            store_cached_frame(file_hash, df)
+    return prepare_frame(df), file_hash
+
+def screening_columns(source_columns, column_mapping, extra_columns):
+    """筛选界面需要的列：映射列、额外显示列以及序号/备注"""
+    wanted = {'序号', '备注'} | set(extra_columns)
+    wanted.update(col for col in column_mapping.values() if col)
+    return [col for col in source_columns if col in wanted]
+
+# ====================== 列名识别 ======================
+def detect_column_candidates(df):
+    """检测可能的列名候选"""
+    columns = df.columns.tolist()
+    candidates = {
+        'title': [],
+        'title_translation': [],
+        'abstract': [],
+        'abstract_translation': []
+    }
+    
+    # 常见列名关键词
+    title_keywords = ['标题', 'title', '题名', '篇名', '文章标题', '题目', 'ti']
+    translation_keywords = ['翻译', 'translation', '英文', 'english', 'en']
+    abstract_keywords = ['摘要', 'abstract', '概要', '内容简介', '文章摘要', 'ab']
+    
+    for col in columns:
+        col_lower = str(col).lower()
+        
+        # 检查标题
+        if any(keyword in col_lower for keyword in title_keywords):
+            if any(keyword in col_lower for keyword in translation_keywords):
+                candidates['title_translation'].append(col)
+            else:
+                candidates['title'].append(col)
+        
+        # 检查摘要
+        elif any(keyword in col_lower for keyword in abstract_keywords):
+            if any(keyword in col_lower for keyword in translation_keywords):
+                candidates['abstract_translation'].append(col)
+            else:
+                candidates['abstract'].append(col)
+    
+    # 列名与关键词完全相同的候选排在前面（如Title优先于Citation、Affiliations等包含'ti'的列）
+    keywords = set(title_keywords) | set(abstract_keywords)
+    for key, cols in candidates.items():
+        candidates[key] = sorted(cols, key=lambda col: str(col).lower() not in keywords)
+    
+    return candidates
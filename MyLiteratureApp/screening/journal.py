@@ -0,0 +1,189 @@
+"""文献筛选核心：SQLite自动保存日志"""
+import atexit
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from .decisions import STATUS_LABELS
+
+# ====================== 自动保存日志 ======================
+def _user_data_dir():
+    """当前用户的持久数据目录：Windows为%APPDATA%，macOS为~/Library/Application Support，
+    其余系统为$XDG_DATA_HOME（默认~/.local/share）"""
+    if os.name == 'nt':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return os.path.join(base, 'literature_review')
+
+# 每次分类和备注修改都追加写入本地SQLite日志（WAL模式），按文件哈希和审阅人恢复；
+# 日志要在重启后仍然可用，默认放在用户数据目录而不是系统临时目录
+JOURNAL_PATH = os.environ.get('LRT_JOURNAL_PATH', os.path.join(_user_data_dir(), 'journal.sqlite3'))
+
+# 日志批量提交的间隔（秒）；多人同时筛选时合并为少量事务
+JOURNAL_FLUSH_INTERVAL = 0.2
+
+_INSERT_LOG = 'INSERT INTO decision_log (file_hash, reviewer, pos, kind, value, ts) VALUES (?, ?, ?, ?, ?, ?)'
+
+class DecisionJournal:
+    """追加写入的筛选日志，进程内共享一个连接；写入先进入缓冲区，由后台线程批量提交"""
+    
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.pending = []
+        self.pending_lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        # WAL模式下NORMAL同步级别不会在每次提交时fsync，写入开销为微秒级
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS decision_log (
+                id INTEGER PRIMARY KEY,
+                file_hash TEXT NOT NULL,
+                pos INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                value TEXT,
+                ts REAL NOT NULL,
+                reviewer TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        # 旧版本的日志没有审阅人列，单人筛选的记录审阅人为空字符串
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(decision_log)')]
+        if 'reviewer' not in columns:
+            self.conn.execute("ALTER TABLE decision_log ADD COLUMN reviewer TEXT NOT NULL DEFAULT ''")
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_decision_log_file ON decision_log (file_hash, id)')
+        self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_decision_log_reviewer ON decision_log (file_hash, reviewer, id)')
+        
+        threading.Thread(target=self._flush_loop, name='journal-flush', daemon=True).start()
+        atexit.register(self.flush)
+    
+    def _flush_loop(self):
+        while True:
+            time.sleep(JOURNAL_FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # 缓冲区中的记录已放回，下一轮重试
+                pass
+    
+    def flush(self):
+        """将缓冲区中的记录在单个事务中写入；持有连接锁，保证提交顺序与追加顺序一致"""
+        with self.lock:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        with self.pending_lock:
+            rows, self.pending = self.pending, []
+        if not rows:
+            return
+        try:
+            self.conn.execute('BEGIN')
+            self.conn.executemany(_INSERT_LOG, rows)
+            self.conn.execute('COMMIT')
+        except sqlite3.Error:
+            if self.conn.in_transaction:
+                self.conn.execute('ROLLBACK')
+            with self.pending_lock:
+                self.pending[:0] = rows
+            raise
+    
+    def append(self, file_hash, pos, kind, value, reviewer=''):
+        """追加一条记录，kind为'status'或'note'"""
+        with self.pending_lock:
+            self.pending.append((file_hash, reviewer, int(pos), kind, value, time.time()))
+    
+    def append_many(self, file_hash, positions, kind, values, reviewer=''):
+        """批量追加，立即在单个事务中提交"""
+        now = time.time()
+        rows = [(file_hash, reviewer, int(pos), kind, value, now) for pos, value in zip(positions, values)]
+        with self.pending_lock:
+            self.pending.extend(rows)
+        self.flush()
+    
+    def latest(self, file_hash, reviewer=''):
+        """读取每个位置最新的分类和备注，返回DataFrame(pos, kind, value)"""
+        self.flush()
+        with self.lock:
+            log = pd.read_sql_query(
+                'SELECT pos, kind, value FROM decision_log WHERE file_hash = ? AND reviewer = ? ORDER BY id',
+                self.conn, params=(file_hash, reviewer)
+            )
+        return log.drop_duplicates(['pos', 'kind'], keep='last')
+    
+    def reviewers(self, file_hash):
+        """该文件有记录的审阅人（不含单人模式）"""
+        self.flush()
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT reviewer FROM decision_log WHERE file_hash = ? AND reviewer != ''",
+                (file_hash,)).fetchall()
+        return sorted(row[0] for row in rows)
+    
+    def size(self, file_hash, reviewer=''):
+        self.flush()
+        with self.lock:
+            return self.conn.execute(
+                'SELECT COUNT(*) FROM decision_log WHERE file_hash = ? AND reviewer = ?',
+                (file_hash, reviewer)).fetchone()[0]
+    
+    def compact(self, file_hash, reviewer=''):
+        """用每个位置的最新记录替换历史记录，返回这些最新记录（同latest）
+        
+        写入缓冲区、读取和删除在同一把锁和同一个写事务中完成：只删除参与计算的记录（id不超过读取时的最大值），
+        同一文件的其他会话（如同一文件的多个标签页）在此期间提交的记录不会丢失。
+        """
+        with self.lock:
+            self._flush_locked()
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                max_id = self.conn.execute(
+                    'SELECT MAX(id) FROM decision_log WHERE file_hash = ? AND reviewer = ?',
+                    (file_hash, reviewer)).fetchone()[0] or 0
+                log = pd.read_sql_query(
+                    'SELECT pos, kind, value FROM decision_log '
+                    'WHERE file_hash = ? AND reviewer = ? AND id <= ? ORDER BY id',
+                    self.conn, params=(file_hash, reviewer, max_id)
+                )
+                latest = log.drop_duplicates(['pos', 'kind'], keep='last')
+                now = time.time()
+                rows = [(file_hash, reviewer, int(pos), kind, value, now)
+                        for pos, kind, value in latest.itertuples(index=False, name=None)]
+                self.conn.execute('DELETE FROM decision_log WHERE file_hash = ? AND reviewer = ? AND id <= ?',
+                                  (file_hash, reviewer, max_id))
+                self.conn.executemany(_INSERT_LOG, rows)
+                self.conn.execute('COMMIT')
+            except BaseException:
+                if self.conn.in_transaction:
+                    self.conn.execute('ROLLBACK')
+                raise
+        return latest
+
+def restore_decisions(journal, file_hash, decisions, reviewer=''):
+    """按日志恢复分类和备注，返回恢复的分类数"""
+    latest = journal.latest(file_hash, reviewer)
+    if journal.size(file_hash, reviewer) > 2 * len(latest):
+        latest = journal.compact(file_hash, reviewer)
+    
+    latest = latest[latest['pos'] < len(decisions)]
+    if latest.empty:
+        return 0
+    
+    # 表格模式可以把文献改回“未处理”，这类记录同样要重放，否则恢复到已有决策上时旧分类会回来
+    statuses = latest[latest['kind'] == 'status']
+    for label in STATUS_LABELS:
+        positions = statuses.loc[statuses['value'] == label, 'pos'].to_numpy()
+        if len(positions):
+            decisions.set_many(positions, label)
+    
+    notes = latest[latest['kind'] == 'note']
+    decisions.notes.update(zip(notes['pos'].tolist(), notes['value'].tolist()))
+    
+    return len(statuses)
@@ -0,0 +1,135 @@
+"""文献筛选核心：多个导出文件合并为一个文献表，按DOI和规范化标题去除重复"""
+import numpy as np
+import pandas as pd
+
+from .ingest import detect_column_candidates, file_content_hash
+
+# ====================== 多文件合并 ======================
+# 记录来源文件的列；重复文献合并后列出所有来源
+PROVENANCE_COLUMN = '来源文件'
+PROVENANCE_SEP = '; '
+
+# 规范化后短于该长度的标题不参与去重（如“Editorial”“Reply”）
+MIN_TITLE_KEY_CHARS = 12
+
+# 来源按位记录在int64掩码中，一次合并的文件数不能超过该值
+MAX_MERGE_FILES = 62
+
+# 各文件的序号列在合并后改名保留，合并后的表格重新编号
+SOURCE_SERIAL_COLUMN = '原序号'
+
+_DOI_PREFIX_RE = r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)'
+
+def normalize_doi(series):
+    """DOI规范化：小写，去掉doi.org链接和“doi:”前缀；空值为''"""
+    values = series.astype(object).where(series.notna(), '').astype(str).str.strip().str.lower()
+    return values.str.replace(_DOI_PREFIX_RE, '', regex=True)
+
+def normalize_title(series):
+    """标题规范化：小写，去掉空白和标点，只保留字母、数字和汉字；空值为''"""
+    values = series.astype(object).where(series.notna(), '').astype(str).str.lower()
+    return values.str.replace(r'[\W_]+', '', regex=True)
+
+def merged_file_hash(hashes):
+    """一组文件（按上传顺序）合并结果的哈希，用于导入缓存和自动保存日志"""
+    return file_content_hash('+'.join(hashes).encode('utf-8'))
+
+def _doi_column(columns):
+    lowered = {str(col).lower(): col for col in columns}
+    for name in ('doi', 'di', 'do'):
+        if name in lowered:
+            return lowered[name]
+    return next((col for col in columns if 'doi' in str(col).lower()), None)
+
+def column_roles(df):
+    """识别标题、摘要（及其翻译）和DOI列，返回{角色: 列名}"""
+    roles = {role: cols[0] for role, cols in detect_column_candidates(df).items() if cols}
+    doi = _doi_column(df.columns)
+    if doi is not None:
+        roles['doi'] = doi
+    return roles
+
+def align_frames(frames):
+    """对齐各文件的列：标题、摘要、翻译和DOI列改用最先出现该角色的文件中的列名，其余列按名称合并"""
+    names = {}
+    aligned = []
+    for df in frames:
+        roles = column_roles(df)
+        rename = {}
+        for role, col in roles.items():
+            target = names.setdefault(role, col)
+            if col != target and target not in df.columns:
+                rename[col] = target
+        if '序号' in df.columns:
+            rename['序号'] = SOURCE_SERIAL_COLUMN
+        aligned.append(df.rename(columns=rename) if rename else df)
+    return aligned, names
+
+def _link(labels, codes):
+    """每组（codes相同且不为-1）内的标签取组内最小值，返回是否有变化"""
+    valid = codes >= 0
+    if not valid.any():
+        return False
+    group_min = np.full(codes.max() + 1, len(labels), dtype=labels.dtype)
+    np.minimum.at(group_min, codes[valid], labels[valid])
+    new = group_min[codes[valid]]
+    changed = bool((new != labels[valid]).any())
+    labels[valid] = new
+    return changed
+
+def duplicate_labels(doi_keys, title_keys):
+    """按DOI或规范化标题相同连通的文献取相同标签（连通分量中最小的位置）
+    
+    标题相同但DOI不同的文献不合并：这类标题组不参与连通。每轮对两种键各做一次组内取最小，
+    迭代到不再变化为止，每轮都是线性的。
+    """
+    n = len(doi_keys)
+    doi_codes, _ = pd.factorize(doi_keys)
+    doi_codes[doi_keys == ''] = -1
+    title_codes, _ = pd.factorize(title_keys)
+    title_codes[np.char.str_len(title_keys.astype(str)) < MIN_TITLE_KEY_CHARS] = -1
+    
+    has_doi = doi_codes >= 0
+    if has_doi.any():
+        pairs = pd.DataFrame({'title': title_codes[has_doi], 'doi': doi_codes[has_doi]})
+        pairs = pairs[pairs['title'] >= 0]
+        conflicting = pairs.groupby('title')['doi'].nunique()
+        conflicting = conflicting.index[conflicting > 1].to_numpy()
+        title_codes[np.isin(title_codes, conflicting)] = -1
+    
+    labels = np.arange(n, dtype=np.int64)
+    while _link(labels, doi_codes) | _link(labels, title_codes):
+        pass
+    return labels
+
+def merge_frames(frames, names):
+    """合并多个文献表，返回(合并后的表格, 去除的重复篇数)
+    
+    重复文献保留最先出现的一条，其空白单元格由后面重复的文献补全，来源文件列列出所有来源。
+    """
+    if len(frames) > MAX_MERGE_FILES:
+        raise ValueError(f"一次最多合并 {MAX_MERGE_FILES} 个文件")
+    
+    frames, roles = align_frames(frames)
+    df = pd.concat(frames, ignore_index=True)
+    file_index = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+    
+    doi_keys = normalize_doi(df[roles['doi']]).to_numpy(dtype=str) if 'doi' in roles \
+        else np.full(len(df), '', dtype=str)
+    title_keys = normalize_title(df[roles['title']]).to_numpy(dtype=str) if 'title' in roles \
+        else np.full(len(df), '', dtype=str)
+    labels = duplicate_labels(doi_keys, title_keys)
+    
+    kept = np.flatnonzero(labels == np.arange(len(df)))
+    n_duplicates = len(df) - len(kept)
+    
+    # 每组的来源文件集合记为位掩码，不同的掩码只有少数几种，各自只拼接一次文本
+    masks = np.zeros(len(df), dtype=np.int64)
+    np.bitwise_or.at(masks, labels, np.left_shift(1, file_index))
+    unique_masks, mask_codes = np.unique(masks[kept], return_inverse=True)
+    texts = np.array([PROVENANCE_SEP.join(name for i, name in enumerate(names) if int(mask) >> i & 1)
+                      for mask in unique_masks], dtype=object)
+    
+    merged = df.groupby(labels, sort=True).first().reset_index(drop=True) if n_duplicates else df
+    merged[PROVENANCE_COLUMN] = texts[mask_codes]
+    return merged, n_duplicates
@@ -0,0 +1,158 @@
+"""文献筛选核心：分阶段耗时和内存指标，输出为JSON行日志和Prometheus文本格式"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .ingest import INGEST_CACHE_DIR
+
+# ====================== 性能指标 ======================
+# 默认关闭；环境变量LRT_METRICS=1时所有会话默认开启
+METRICS_ENABLED = os.environ.get('LRT_METRICS', '0') not in ('', '0')
+
+# 指标输出目录：metrics.jsonl每次运行追加一行；metrics.prom每次运行后整体重写，
+# 可由Prometheus node_exporter的textfile收集器抓取
+METRICS_DIR = os.environ.get('LRT_METRICS_DIR', os.path.join(INGEST_CACHE_DIR, 'metrics'))
+
+# metrics.jsonl超过该大小时轮转为metrics.jsonl.1（只保留一份旧日志）
+METRICS_JSONL_MAX_BYTES = int(os.environ.get('LRT_METRICS_JSONL_MB', '32')) * 1024 * 1024
+
+# 每个阶段保留的最近样本数，用于计算中位数和P95
+METRICS_WINDOW = 500
+
+# 超过该时间（秒）没有更新的会话不再出现在内存指标中
+SESSION_GAUGE_TTL = 3600
+
+class RunTimer:
+    """一次运行中各阶段的耗时；mark()结束上一阶段并开始下一阶段，registry为None时只计时不记录"""
+    
+    def __init__(self, registry, kind, session=''):
+        self.registry = registry
+        self.kind = kind
+        self.session = session
+        self.phases = {}
+        self.current = None
+        self.started = self.phase_started = time.perf_counter()
+        self.finished = False
+    
+    def mark(self, name=None):
+        now = time.perf_counter()
+        if self.current is not None:
+            self.phases[self.current] = self.phases.get(self.current, 0.0) + now - self.phase_started
+        self.current = name
+        self.phase_started = now
+    
+    def stage_clock(self, prefix):
+        """返回按阶段名调用的回调（如导出的各工作表），阶段名前加上前缀"""
+        return lambda name: self.mark(f"{prefix}.{name}")
+    
+    def finish(self, memory=None):
+        """结束计时并提交记录；memory为{项目: 字节数}"""
+        self.mark(None)
+        self.finished = True
+        if self.registry is not None:
+            self.registry.record(self, memory or {})
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class MetricsRegistry:
+    """进程内共享的指标汇总：各阶段累计次数和总耗时、最近样本窗口以及各会话的内存占用"""
+    
+    def __init__(self, directory=METRICS_DIR, window=METRICS_WINDOW, jsonl_max_bytes=METRICS_JSONL_MAX_BYTES):
+        self.directory = directory
+        self.jsonl_path = os.path.join(directory, 'metrics.jsonl')
+        self.jsonl_max_bytes = jsonl_max_bytes
+        self.prom_path = os.path.join(directory, 'metrics.prom')
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.counts = {}
+        self.sums = {}
+        self.window = window
+        # 会话 -> (更新时间, {项目: 字节数})
+        self.memory = {}
+    
+    def record(self, timer, memory):
+        phases = dict(timer.phases, total=time.perf_counter() - timer.started)
+        line = json.dumps({
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'kind': timer.kind,
+            'session': timer.session,
+            'phases_ms': {name: round(seconds * 1000, 3) for name, seconds in phases.items()},
+            'memory_bytes': memory,
+        }, ensure_ascii=False)
+        
+        with self.lock:
+            for name, seconds in phases.items():
+                key = (timer.kind, name)
+                if key not in self.samples:
+                    self.samples[key] = deque(maxlen=self.window)
+                    self.counts[key] = 0
+                    self.sums[key] = 0.0
+                self.samples[key].append(seconds)
+                self.counts[key] += 1
+                self.sums[key] += seconds
+            
+            now = time.time()
+            if memory:
+                self.memory[timer.session] = (now, memory)
+            for session in [s for s, (updated, _) in self.memory.items() if now - updated > SESSION_GAUGE_TTL]:
+                del self.memory[session]
+            
+            # 写入失败（如目录只读）不影响筛选
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                if os.path.exists(self.jsonl_path) and os.path.getsize(self.jsonl_path) >= self.jsonl_max_bytes:
+                    os.replace(self.jsonl_path, f"{self.jsonl_path}.1")
+                with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+                tmp_path = f"{self.prom_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(self._prometheus_text())
+                os.replace(tmp_path, self.prom_path)
+            except OSError:
+                pass
+    
+    def summary(self):
+        """各阶段的次数、最近一次、中位数、P95和累计耗时"""
+        with self.lock:
+            items = [(key, np.array(samples), self.counts[key], self.sums[key])
+                     for key, samples in self.samples.items()]
+        rows = [{
+            '运行': kind,
+            '阶段': name,
+            '次数': count,
+            '最近(ms)': round(samples[-1] * 1000, 1),
+            '中位数(ms)': round(float(np.median(samples)) * 1000, 1),
+            'P95(ms)': round(float(np.percentile(samples, 95)) * 1000, 1),
+            '累计(s)': round(total, 2),
+        } for (kind, name), samples, count, total in items]
+        return pd.DataFrame(rows, columns=['运行', '阶段', '次数', '最近(ms)', '中位数(ms)', 'P95(ms)', '累计(s)'])
+    
+    def _prometheus_text(self):
+        lines = [
+            '# HELP lrt_phase_seconds 文献筛选工具各阶段耗时（最近样本的分位数）',
+            '# TYPE lrt_phase_seconds summary',
+        ]
+        for (kind, name), samples in sorted(self.samples.items()):
+            labels = f'kind="{_label(kind)}",phase="{_label(name)}"'
+            values = np.array(samples)
+            for quantile in (0.5, 0.95):
+                lines.append(f'lrt_phase_seconds{{{labels},quantile="{quantile}"}} '
+                             f'{float(np.quantile(values, quantile)):.6f}')
+            lines.append(f'lrt_phase_seconds_sum{{{labels}}} {self.sums[(kind, name)]:.6f}')
+            lines.append(f'lrt_phase_seconds_count{{{labels}}} {self.counts[(kind, name)]}')
+        
+        lines += [
+            '# HELP lrt_session_memory_bytes 各会话数据的内存占用',
+            '# TYPE lrt_session_memory_bytes gauge',
+        ]
+        for session, (_, memory) in sorted(self.memory.items()):
+            for item, nbytes in memory.items():
+                lines.append(f'lrt_session_memory_bytes{{session="{_label(session)}",item="{_label(item)}"}} {nbytes}')
+        return '\n'.join(lines) + '\n'
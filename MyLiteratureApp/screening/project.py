@@ -0,0 +1,106 @@
+"""文献筛选核心：Arrow项目文件，保存文献表、列映射、显示列配置、决策和备注"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .decisions import DecisionStore
+
+# ====================== 项目文件 ======================
+# 项目文件是不压缩的Arrow IPC文件（Feather v2），可以直接内存映射：打开时只读取元数据，
+# 文献内容在访问时才由操作系统按页载入，决策和备注作为两个附加列保存
+PROJECT_SUFFIXES = ('.feather', '.arrow')
+PROJECT_FORMAT_VERSION = 1
+
+# 每个记录批次的行数
+PROJECT_BATCH_ROWS = 65536
+
+_METADATA_KEY = b'literature_review_project'
+_STATUS_COLUMN = '__status__'
+_NOTE_COLUMN = '__note__'
+
+class Project:
+    """打开的项目：文献表（内存映射）、决策存储以及列映射等配置"""
+    
+    def __init__(self, df, decisions, file_hash=None, column_mapping=None, extra_columns=None, current_index=0):
+        self.df = df
+        self.decisions = decisions
+        self.file_hash = file_hash
+        self.column_mapping = column_mapping or {}
+        self.extra_columns = extra_columns or {}
+        self.current_index = current_index
+        # 从导出结果恢复时未能按序号对应到文献的分类行数
+        self.unmatched_rows = 0
+
+def is_project_file(name):
+    return os.path.splitext(name)[1].lower() in PROJECT_SUFFIXES
+
+def _arrow_table(df):
+    """DataFrame转为Arrow表；Excel中混合类型的列（如数字和文本混排）转为文本"""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed'):
+            df[col] = df[col].map(lambda value: value if pd.isna(value) else str(value))
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+def save_project(path, df, decisions, file_hash=None, column_mapping=None, extra_columns=None, current_index=0):
+    """写出项目文件；file_hash为原始文件的内容哈希，打开项目后据此关联自动保存日志和多人筛选"""
+    table = _arrow_table(df)
+    
+    notes = np.full(len(df), None, dtype=object)
+    if decisions.notes:
+        notes[list(decisions.notes)] = [str(note) for note in decisions.notes.values()]
+    table = table.append_column(_STATUS_COLUMN, pa.array(decisions.status, type=pa.int8()))
+    table = table.append_column(_NOTE_COLUMN, pa.array(notes, type=pa.large_string()))
+    
+    metadata = dict(table.schema.metadata or {})
+    metadata[_METADATA_KEY] = json.dumps({
+        'version': PROJECT_FORMAT_VERSION,
+        'file_hash': file_hash,
+        'column_mapping': column_mapping or {},
+        'extra_columns': extra_columns or {},
+        'current_index': int(current_index),
+    }, ensure_ascii=False).encode('utf-8')
+    table = table.replace_schema_metadata(metadata)
+    
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=PROJECT_BATCH_ROWS)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def load_project(path):
+    """内存映射打开项目文件；文本列直接引用映射的Arrow缓冲区，不复制内容
+    
+    依赖pandas 3默认的Arrow字符串类型（requirements.txt中要求pandas>=3.0），
+    更早的版本会把文本列转换为Python对象。
+    """
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    raw = (table.schema.metadata or {}).get(_METADATA_KEY)
+    if raw is None:
+        raise ValueError("不是文献筛选项目文件")
+    info = json.loads(raw)
+    if info.get('version', 0) > PROJECT_FORMAT_VERSION:
+        raise ValueError("项目文件由更新版本的工具创建，请升级后再打开")
+    
+    status = np.array(table.column(_STATUS_COLUMN).to_numpy(), dtype=np.int8)
+    note_column = table.column(_NOTE_COLUMN)
+    note_positions = np.flatnonzero(note_column.is_valid().to_numpy(zero_copy_only=False))
+    notes = dict(zip(note_positions.tolist(), note_column.take(note_positions).to_pylist()))
+    decisions = DecisionStore.from_arrays(status, notes)
+    
+    df = table.drop_columns([_STATUS_COLUMN, _NOTE_COLUMN]).to_pandas(split_blocks=True)
+    current_index = min(max(int(info.get('current_index', 0)), 0), max(len(df) - 1, 0))
+    return Project(df, decisions, info.get('file_hash'), info.get('column_mapping'),
+                   info.get('extra_columns'), current_index)
@@ -0,0 +1,129 @@
+"""文献筛选核心：按分类状态、备注和列取值过滤的筛选视图"""
+import numpy as np
+import pandas as pd
+
+from .decisions import STATUS_CODES
+
+# ====================== 筛选视图 ======================
+# 取值多选框中最多列出的取值个数（按出现次数排序）
+QUEUE_MAX_OPTIONS = 200
+
+def note_presence(df):
+    """原表备注列是否非空；筛选时填写的备注由视图另行覆盖"""
+    if '备注' not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    notes = df['备注']
+    return (notes.notna() & (notes.astype(str).str.strip() != '')).to_numpy()
+
+class ColumnValueIndex:
+    """列取值索引：数值列保存浮点数组用于范围过滤，其余列编码为整数，按取值过滤时不再比较文本"""
+    
+    def __init__(self, series):
+        self.numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        if self.numeric:
+            self.values = series.to_numpy(dtype=float, na_value=np.nan)
+            return
+        
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        self.codes = codes
+        self.labels = [str(value) for value in uniques]
+        self.lookup = {label: code for code, label in enumerate(self.labels)}
+        self.counts = np.bincount(codes[codes >= 0], minlength=len(self.labels))
+    
+    def bounds(self):
+        """数值列的(最小值, 最大值)，全为整数时返回int；没有数值时返回None"""
+        values = self.values[~np.isnan(self.values)]
+        if not len(values):
+            return None
+        low, high = values.min(), values.max()
+        if np.all(values == np.round(values)):
+            return int(low), int(high)
+        return float(low), float(high)
+    
+    def options(self, limit=QUEUE_MAX_OPTIONS):
+        """出现次数最多的取值"""
+        order = np.argsort(-self.counts, kind='stable')[:limit]
+        return [self.labels[code] for code in order.tolist()]
+    
+    def range_mask(self, low, high):
+        return (self.values >= low) & (self.values <= high)
+    
+    def value_mask(self, labels):
+        codes = [self.lookup[label] for label in labels if label in self.lookup]
+        return np.isin(self.codes, codes)
+
+class ScreeningQueue:
+    """满足条件的文献位置（升序数组）和成员掩码；分类或备注变化时只重新判断受影响的位置
+    
+    statuses为分类标签列表（空表示不限），note为True/False/None（有备注/无备注/不限），
+    static_mask为按列取值预先计算的掩码（取值不随筛选变化）。
+    """
+    
+    def __init__(self, decisions, base_notes, statuses=None, note=None, static_mask=None):
+        self.decisions = decisions
+        self.base_notes = base_notes
+        self.codes = np.array([STATUS_CODES[label] for label in statuses], dtype=np.int8) if statuses else None
+        self.note = note
+        self.static_mask = static_mask
+        self.member = self._matches(np.arange(len(decisions)))
+        self.positions = np.flatnonzero(self.member)
+    
+    def __len__(self):
+        return len(self.positions)
+    
+    def _has_note(self, positions):
+        has_note = self.base_notes[positions]
+        notes = self.decisions.notes
+        if notes:
+            for i, pos in enumerate(positions.tolist()):
+                note = notes.get(pos)
+                if note is not None:
+                    has_note[i] = bool(str(note).strip())
+        return has_note
+    
+    def _matches(self, positions):
+        match = np.ones(len(positions), dtype=bool)
+        if self.static_mask is not None:
+            match &= self.static_mask[positions]
+        if self.codes is not None:
+            match &= np.isin(self.decisions.status[positions], self.codes)
+        if self.note is not None:
+            match &= self._has_note(positions) == self.note
+        return match
+    
+    def update(self, positions):
+        """决策或备注变化后更新成员：离开视图的位置从有序数组删除，新进入的按序插入"""
+        positions = np.unique(np.asarray(positions, dtype=np.int64))
+        if not len(positions):
+            return
+        
+        match = self._matches(positions)
+        was_member = self.member[positions]
+        removed = positions[was_member & ~match]
+        added = positions[~was_member & match]
+        if len(removed):
+            self.positions = np.delete(self.positions, np.searchsorted(self.positions, removed))
+        if len(added):
+            self.positions = np.insert(self.positions, np.searchsorted(self.positions, added), added)
+        self.member[positions] = match
+    
+    def next_after(self, pos):
+        """视图中位于pos之后的第一篇，没有时返回None"""
+        i = np.searchsorted(self.positions, pos, side='right')
+        return int(self.positions[i]) if i < len(self.positions) else None
+    
+    def prev_before(self, pos):
+        """视图中位于pos之前的最后一篇，没有时返回None"""
+        i = np.searchsorted(self.positions, pos, side='left')
+        return int(self.positions[i - 1]) if i > 0 else None
+    
+    def first_from(self, pos):
+        """pos本身或之后的第一篇；都没有时取视图最后一篇，视图为空时返回None"""
+        if not len(self.positions):
+            return None
+        i = np.searchsorted(self.positions, pos, side='left')
+        return int(self.positions[min(i, len(self.positions) - 1)])
+    
+    def rank(self, pos):
+        """视图中位于pos之前的篇数"""
+        return int(np.searchsorted(self.positions, pos, side='left'))
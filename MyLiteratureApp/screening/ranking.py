@@ -0,0 +1,71 @@
+"""文献筛选核心：主动学习优先级排序模型"""
+import numpy as np
+
+from .search import token_hashes
+
+# ====================== 优先级排序 ======================
+# 哈希特征维度、重新训练间隔（新增纳入/排除决策数）与训练参数
+RANK_FEATURE_BITS = 18
+RANK_RETRAIN_EVERY = 10
+RANK_ITERATIONS = 100
+RANK_LEARNING_RATE = 2.0
+RANK_L2 = 1e-4
+RANK_CHUNK_DOCS = 8192
+
+def build_feature_matrix(texts):
+    """构建哈希TF-IDF特征（按文献排序的稀疏矩阵，行已做L2归一化）"""
+    n = len(texts)
+    dim = 1 << RANK_FEATURE_BITS
+    keys = []
+    for start in range(0, n, RANK_CHUNK_DOCS):
+        docs, hashes = token_hashes(texts[start:start + RANK_CHUNK_DOCS])
+        # 哈希已经过mix64打散，直接取低位分桶；未打散时中文两字词的低位只取决于第二个字
+        cols = (hashes & np.uint64(dim - 1)).astype(np.int64)
+        keys.append(np.sort((docs + start) * dim + cols))
+    keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+    
+    # 排序后相同(文献, 特征)连续出现，游程长度即词频
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else keys
+    tf = np.diff(np.r_[starts, len(keys)])
+    keys = keys[starts]
+    rows = (keys // dim).astype(np.int32)
+    cols = (keys % dim).astype(np.int32)
+    
+    doc_freq = np.bincount(cols, minlength=dim)
+    idf = np.log((1 + n) / (1 + doc_freq)) + 1
+    vals = (1 + np.log(tf)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=vals ** 2, minlength=n))
+    vals = (vals / np.where(norms > 0, norms, 1)[rows]).astype(np.float32)
+    
+    indptr = np.searchsorted(rows, np.arange(n + 1))
+    return {'n': n, 'dim': dim, 'rows': rows, 'cols': cols, 'vals': vals, 'indptr': indptr}
+
+def train_ranker(features, positions, labels):
+    """在已标注文献上训练L2正则的逻辑回归（批量梯度下降），返回全部文献的相关概率"""
+    indptr, cols, vals = features['indptr'], features['cols'], features['vals']
+    labels = np.asarray(labels, dtype=np.float64)
+    
+    # 取出已标注文献的特征行
+    lengths = indptr[positions + 1] - indptr[positions]
+    nnz = np.concatenate([np.arange(indptr[p], indptr[p + 1]) for p in positions]) if len(positions) else positions
+    local_rows = np.repeat(np.arange(len(positions)), lengths)
+    x_cols, x_vals = cols[nnz], vals[nnz].astype(np.float64)
+    
+    # 类别平衡的样本权重
+    n_pos = labels.sum()
+    n_neg = len(labels) - n_pos
+    sample_weight = np.where(labels > 0, len(labels) / (2 * n_pos), len(labels) / (2 * n_neg))
+    
+    weights = np.zeros(features['dim'])
+    bias = 0.0
+    for _ in range(RANK_ITERATIONS):
+        z = np.bincount(local_rows, weights=weights[x_cols] * x_vals, minlength=len(positions)) + bias
+        error = (1 / (1 + np.exp(-z)) - labels) * sample_weight
+        grad = np.bincount(x_cols, weights=x_vals * error[local_rows], minlength=features['dim'])
+        weights -= RANK_LEARNING_RATE * (grad / len(positions) + RANK_L2 * weights)
+        bias -= RANK_LEARNING_RATE * error.mean()
+    
+    # 类别平衡相当于假设先验为0.5，按标注样本的实际比例修正截距后再输出概率
+    z = np.bincount(features['rows'], weights=weights[cols] * vals, minlength=features['n'])
+    z += bias + np.log(n_pos / n_neg)
+    return 1 / (1 + np.exp(-z))
@@ -0,0 +1,145 @@
+"""文献筛选核心：Excel快速读取引擎"""
+import itertools
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from .citations import is_citation_file, read_citation_frame, read_citation_header
+
+try:
+    import python_calamine
+except ImportError:  # 未安装时退回openpyxl只读模式
+    python_calamine = None
+
+# ====================== 快速读取引擎 ======================
+# 每处理这么多行回调一次进度
+READ_CHUNK_ROWS = 10000
+
+def _is_blank(value):
+    return value is None or value == ''
+
+def _iter_sheet_rows(path, sheet=None):
+    """逐行读取工作表（sheet为工作表名，默认第一个）：优先使用calamine，否则使用openpyxl只读模式"""
+    if python_calamine is not None:
+        wb = python_calamine.CalamineWorkbook.from_path(path)
+        try:
+            ws = wb.get_sheet_by_index(0) if sheet is None else wb.get_sheet_by_name(sheet)
+            yield from ws.iter_rows()
+        finally:
+            wb.close()
+        return
+    
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0] if sheet is None else wb[sheet]
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+def _normalize_header(raw_header):
+    """按pandas的规则生成列名：空列名为Unnamed: i，重复列名追加.1、.2"""
+    header = []
+    seen = {}
+    for i, value in enumerate(raw_header):
+        if _is_blank(value):
+            name = f"Unnamed: {i}"
+        elif isinstance(value, float) and value.is_integer():
+            name = int(value)
+        else:
+            name = value
+        
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        header.append(name)
+    return header
+
+def _finalize_column(values):
+    """把单元格值列表转换为Series，整数值的浮点列还原为整数"""
+    series = pd.Series([None if value == '' else value for value in values])
+    if series.dtype == np.float64 and len(series) and series.notna().all():
+        if (series % 1 == 0).all():
+            series = series.astype(np.int64)
+    return series
+
+def read_workbook_header(path, sample_rows=0):
+    """只读取表头、前若干行和估计的总行数（未知时为None）"""
+    if is_citation_file(path):
+        return read_citation_header(path, sample_rows)
+    
+    if path.endswith('.xlsx'):
+        # calamine会一次性载入整个工作表，嗅探表头时使用openpyxl只读模式
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            total_rows = ws.max_row - 1 if ws.max_row else None
+            rows = ws.iter_rows(values_only=True)
+            header = _normalize_header(next(rows, ()))
+            sample = list(itertools.islice(rows, sample_rows))
+        finally:
+            wb.close()
+        return header, sample, total_rows
+    
+    if python_calamine is None:
+        sample_df = pd.read_excel(path, nrows=sample_rows)
+        return sample_df.columns.tolist(), sample_df.values.tolist(), None
+    
+    rows = _iter_sheet_rows(path)
+    header = _normalize_header(next(rows, ()))
+    sample = list(itertools.islice(rows, sample_rows))
+    rows.close()
+    return header, sample, None
+
+def sample_frame(header, sample):
+    """由表头和样本行构造预览用的DataFrame"""
+    width = len(header)
+    rows = [list(row[:width]) + [None] * (width - len(row)) for row in sample]
+    return pd.DataFrame(rows, columns=header)
+
+def read_workbook_frame(path, columns=None, progress=None, sheet=None):
+    """流式读取工作表（默认第一个），可只保留指定列；与pandas一样去掉末尾的空行
+    
+    RIS、BibTeX、NBIB、WoS和CSV等题录文件交给题录读取器处理。
+    """
+    if is_citation_file(path):
+        return read_citation_frame(path, columns, progress)
+    
+    if python_calamine is None and not path.endswith('.xlsx'):
+        return pd.read_excel(path, usecols=columns, sheet_name=sheet or 0)
+    
+    rows = _iter_sheet_rows(path, sheet)
+    header = _normalize_header(next(rows, ()))
+    if columns is None:
+        indices = list(range(len(header)))
+    else:
+        indices = [header.index(col) for col in columns]
+    
+    data = [[] for _ in indices]
+    n_rows = 0
+    pending_blank = 0
+    for row in rows:
+        # 空行判断基于整行，保证投影读取和完整读取的行位置一致
+        if all(_is_blank(value) for value in row):
+            pending_blank += 1
+            continue
+        
+        for values in data:
+            values.extend([None] * pending_blank)
+        n_rows += pending_blank
+        pending_blank = 0
+        
+        width = len(row)
+        for values, col_idx in zip(data, indices):
+            values.append(row[col_idx] if col_idx < width else None)
+        n_rows += 1
+        if progress is not None and n_rows % READ_CHUNK_ROWS == 0:
+            progress(n_rows)
+    
+    if progress is not None:
+        progress(n_rows)
+    
+    return pd.DataFrame({header[col_idx]: _finalize_column(values)
+                         for values, col_idx in zip(data, indices)})
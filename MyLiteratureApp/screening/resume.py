@@ -0,0 +1,99 @@
+"""文献筛选核心：从导出的四工作表结果文件恢复文献表、分类和备注"""
+import re
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+
+from .decisions import DecisionStore, apply_decision_table, serial_digest
+from .export import CATEGORY_SHEETS, SERIAL_DIGEST_PROPERTY, SOURCE_HASH_PROPERTY
+from .project import Project
+from .reader import read_workbook_frame
+
+# ====================== 恢复导出结果 ======================
+# 导出结果的总表；超过Excel行数上限时续写为“所有文献_2”等
+RESULTS_SHEET = '所有文献'
+
+_SPREADSHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_CUSTOM_PROPS_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/custom-properties}'
+
+def workbook_sheet_names(source):
+    """xlsx文件中的工作表名（按顺序），只读取workbook.xml；source为路径或文件对象，不是xlsx时返回[]"""
+    try:
+        with zipfile.ZipFile(source) as zf:
+            root = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        return []
+    return [sheet.get('name') for sheet in root.iter(f'{_SPREADSHEET_NS}sheet')]
+
+def workbook_properties(source):
+    """xlsx文件的自定义文档属性{名称: 文本}，没有时返回{}"""
+    try:
+        with zipfile.ZipFile(source) as zf:
+            root = ElementTree.fromstring(zf.read('docProps/custom.xml'))
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        return {}
+    return {prop.get('name'): ''.join(prop.itertext()) for prop in root.iter(f'{_CUSTOM_PROPS_NS}property')}
+
+def _sheet_parts(names, base):
+    """base及其续写工作表（base_2、base_3……），按顺序"""
+    parts = {1: base} if base in names else {}
+    pattern = re.compile(re.escape(base) + r'_(\d+)')
+    for name in names:
+        match = pattern.fullmatch(name)
+        if match:
+            parts[int(match.group(1))] = name
+    return [parts[i] for i in sorted(parts)]
+
+def _is_results_layout(names):
+    return RESULTS_SHEET in names and all(sheet in names for sheet, _, _ in CATEGORY_SHEETS)
+
+def is_results_workbook(source):
+    """是否为本工具导出的结果文件（包含所有文献和三个分类工作表）"""
+    return _is_results_layout(workbook_sheet_names(source))
+
+def load_results_workbook(path):
+    """读取导出的结果文件，返回Project
+    
+    文献表取自“所有文献”，其中的备注载入决策存储（备注列保留在文献表中），分类按序号在各分类工作表中的
+    归属批量恢复，只读取分类工作表的序号列；序号重复时按行顺序依次对应，对应不上的行数记在
+    unmatched_rows中。当前位置为第一篇未处理的文献。
+    
+    结果文件记录了原始文件哈希且文献顺序未变（序号顺序摘要一致）时，Project.file_hash为原始文件哈希，
+    可以继续使用原来的自动保存日志；文献顺序被改动过（如在Excel中排序）时不关联。
+    """
+    names = workbook_sheet_names(path)
+    if not _is_results_layout(names):
+        raise ValueError("不是导出的筛选结果文件（需要包含所有文献、纳入文章、待定文章、排除文章工作表）")
+    
+    frames = [read_workbook_frame(path, sheet=name) for name in _sheet_parts(names, RESULTS_SHEET)]
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    if '序号' not in df.columns:
+        raise ValueError("结果文件的所有文献工作表缺少序号列")
+    
+    tables = []
+    for sheet, label, _ in CATEGORY_SHEETS:
+        for name in _sheet_parts(names, sheet):
+            serials = read_workbook_frame(path, columns=['序号'], sheet=name)['序号']
+            tables.append(pd.DataFrame({'序号': serials, '分类': label}))
+    
+    decisions = DecisionStore(len(df))
+    if '备注' in df.columns:
+        notes = df['备注']
+        positions = np.flatnonzero((notes.notna() & (notes.astype(str).str.strip() != '')).to_numpy())
+        decisions.notes.update(zip(positions.tolist(), notes.iloc[positions].astype(str).tolist()))
+    unmatched = 0
+    if tables:
+        _, unmatched = apply_decision_table(decisions, df['序号'].to_numpy(), pd.concat(tables, ignore_index=True))
+    
+    unscreened = np.flatnonzero(decisions.status == 0)
+    current_index = int(unscreened[0]) if len(unscreened) else 0
+    properties = workbook_properties(path)
+    file_hash = properties.get(SOURCE_HASH_PROPERTY) or None
+    if file_hash and properties.get(SERIAL_DIGEST_PROPERTY) != serial_digest(df['序号']):
+        file_hash = None
+    
+    project = Project(df, decisions, file_hash=file_hash, current_index=current_index)
+    project.unmatched_rows = unmatched
+    return project
@@ -0,0 +1,108 @@
+"""文献筛选核心：多人筛选对照表和一致性统计"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .decisions import STATUS_CODES, STATUS_LABELS
+
+# ====================== 多人筛选 ======================
+class ReviewBoard:
+    """每位审阅人一列决策；按审阅人两两维护分类混淆矩阵，并标记存在分歧的文献"""
+    
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.columns = {}
+        # (审阅人A, 审阅人B) -> 4x4混淆矩阵，行为A的分类代码，列为B的分类代码（0行/列不计数）
+        self.pairs = {}
+        self.conflict = np.zeros(size, dtype=bool)
+        self.n_conflicts = 0
+    
+    def _pair(self, a, b):
+        """返回(矩阵, 是否需要转置)"""
+        return (self.pairs[(a, b)], False) if (a, b) in self.pairs else (self.pairs[(b, a)], True)
+    
+    def _update_conflicts(self, positions):
+        stacked = np.stack([column[positions] for column in self.columns.values()])
+        screened = np.where(stacked > 0, stacked, np.int8(127))
+        conflict = (screened.min(axis=0) != stacked.max(axis=0)) & (stacked > 0).any(axis=0)
+        self.n_conflicts += int(conflict.sum()) - int(self.conflict[positions].sum())
+        self.conflict[positions] = conflict
+    
+    def add_reviewer(self, name, status):
+        """加入一位审阅人及其已有的决策；已加入时忽略"""
+        with self.lock:
+            if name in self.columns:
+                return
+            column = np.array(status, dtype=np.int8)
+            for other, other_column in self.columns.items():
+                matrix = np.zeros((len(STATUS_LABELS), len(STATUS_LABELS)), dtype=np.int64)
+                both = (column > 0) & (other_column > 0)
+                np.add.at(matrix, (column[both], other_column[both]), 1)
+                self.pairs[(name, other)] = matrix
+            self.columns[name] = column
+            self._update_conflicts(np.flatnonzero(column > 0))
+    
+    def set(self, name, positions, label):
+        """更新审阅人的决策，只调整受影响文献对应的计数"""
+        positions = np.unique(np.asarray(positions, dtype=np.int64))
+        code = STATUS_CODES[label]
+        with self.lock:
+            column = self.columns[name]
+            old = column[positions]
+            for other, other_column in self.columns.items():
+                if other == name:
+                    continue
+                matrix, transposed = self._pair(name, other)
+                peer = other_column[positions]
+                removed = (old > 0) & (peer > 0)
+                added = peer > 0
+                old_index = (old[removed], peer[removed])
+                new_index = (np.full(int(added.sum()), code, dtype=np.int8), peer[added])
+                if transposed:
+                    old_index, new_index = old_index[::-1], new_index[::-1]
+                np.subtract.at(matrix, old_index, 1)
+                np.add.at(matrix, new_index, 1)
+            column[positions] = code
+            self._update_conflicts(positions)
+    
+    def decisions_at(self, pos):
+        """某篇文献各审阅人的分类标签（未处理的不列出）"""
+        with self.lock:
+            return {name: STATUS_LABELS[column[pos]] for name, column in self.columns.items() if column[pos]}
+    
+    def next_conflict(self, current):
+        """当前位置之后的下一处分歧，没有时从头查找；不存在时返回None"""
+        with self.lock:
+            positions = np.flatnonzero(self.conflict)
+        if not len(positions):
+            return None
+        later = positions[positions > current]
+        return int(later[0] if len(later) else positions[0])
+    
+    def agreement(self):
+        """两两一致性统计：共同筛选数、一致率和Cohen's kappa"""
+        rows = []
+        with self.lock:
+            for (a, b), matrix in self.pairs.items():
+                observed = matrix[1:, 1:]
+                n = int(observed.sum())
+                if not n:
+                    rows.append({'审阅人A': a, '审阅人B': b, '共同筛选': 0, '一致率': None, 'Kappa': None})
+                    continue
+                p_observed = np.trace(observed) / n
+                p_expected = float(observed.sum(axis=1) @ observed.sum(axis=0)) / n ** 2
+                kappa = 1.0 if p_expected >= 1 else (p_observed - p_expected) / (1 - p_expected)
+                rows.append({'审阅人A': a, '审阅人B': b, '共同筛选': n,
+                             '一致率': round(float(p_observed), 3), 'Kappa': round(float(kappa), 3)})
+        return pd.DataFrame(rows, columns=['审阅人A', '审阅人B', '共同筛选', '一致率', 'Kappa'])
+    
+    def frame(self, serials):
+        """各审阅人的决策对照表，每位审阅人一列"""
+        with self.lock:
+            data = {'序号': serials}
+            for name, column in self.columns.items():
+                data[name] = np.array([''] + STATUS_LABELS[1:], dtype=object)[column]
+            data['存在分歧'] = np.where(self.conflict, '是', '')
+        return pd.DataFrame(data)
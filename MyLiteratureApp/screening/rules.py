@@ -0,0 +1,140 @@
+"""文献筛选核心：基于关键词和条件的规则预筛选"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# ====================== 规则预筛选 ======================
+# 规则集示例：
+# {
+#     'exclude_keywords': ['review', '综述'],
+#     'include_keywords': ['randomized'],
+#     'include_label': '待定',
+#     'use_regex': False,
+#     'fields': ['title', 'abstract'],
+#     'conditions': [
+#         {'column': '年份', 'op': 'between', 'value': [2015, 2024]},
+#         {'column': '期刊', 'op': 'in', 'value': ['计算机学报']},
+#     ],
+#     'only_unscreened': True,
+# }
+# 不满足附加条件的文献和命中排除关键词的文献标记为排除，其余命中纳入关键词的文献按include_label标记
+RULE_FIELDS = {
+    'title': '标题',
+    'title_translation': '标题翻译',
+    'abstract': '摘要',
+    'abstract_translation': '摘要翻译',
+}
+
+def _keyword_pattern(keywords, use_regex):
+    """把关键词列表编译为一个多选正则，匹配结果即命中的关键词"""
+    keywords = [kw.strip() for kw in keywords if kw and kw.strip()]
+    if not keywords:
+        return None
+    parts = keywords if use_regex else [re.escape(kw) for kw in keywords]
+    return re.compile('(' + '|'.join(f'(?:{part})' for part in parts) + ')', re.IGNORECASE)
+
+def _match_keywords(text, keywords, use_regex):
+    """返回每篇文献命中的第一个关键词（未命中为NaN）
+    
+    正则关键词自身可能带有分组，只取最外层的整体分组。
+    """
+    pattern = _keyword_pattern(keywords, use_regex)
+    if pattern is None:
+        return pd.Series(np.nan, index=text.index, dtype=object)
+    return text.str.extract(pattern, expand=True).iloc[:, 0]
+
+def _value_key(value):
+    """取值的比较形式；整数值的浮点数（含缺失值的年份列会读成2020.0）按整数比较"""
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+def _condition_mask(df, condition):
+    """返回不满足条件的文献（缺失值不视为违反）"""
+    column, op, value = condition['column'], condition['op'], condition['value']
+    if column not in df.columns:
+        raise KeyError(f"条件列不存在: {column}")
+    values = df[column]
+    
+    if op == 'between':
+        low, high = value
+        numbers = pd.to_numeric(values, errors='coerce')
+        violated = pd.Series(False, index=df.index)
+        if low is not None:
+            violated |= numbers < low
+        if high is not None:
+            violated |= numbers > high
+        return violated.to_numpy()
+    
+    present = values.notna().to_numpy()
+    allowed = values.map(_value_key).isin([_value_key(v) for v in value]).to_numpy()
+    if op == 'in':
+        return present & ~allowed
+    if op == 'not_in':
+        return present & allowed
+    raise ValueError(f"未知的条件类型: {op}")
+
+def _describe_condition(condition):
+    column, op, value = condition['column'], condition['op'], condition['value']
+    if op == 'between':
+        low, high = value
+        if low is None:
+            return f"{column}大于{high}"
+        if high is None:
+            return f"{column}小于{low}"
+        return f"{column}不在{low}–{high}范围内"
+    if op == 'in':
+        return f"{column}不在指定取值中"
+    return f"{column}属于排除取值"
+
+def evaluate_rules(df, column_mapping, rules, status=None):
+    """对整个表格向量化地评估规则集，返回DataFrame(pos, label, note)
+    
+    status为当前分类状态数组，only_unscreened时只处理未分类的文献。
+    """
+    n = len(df)
+    labels = np.full(n, None, dtype=object)
+    notes = np.full(n, None, dtype=object)
+    
+    # 附加条件：按顺序记录第一个不满足的条件
+    for condition in rules.get('conditions', []):
+        violated = _condition_mask(df, condition) & (labels == None)  # noqa: E711
+        labels[violated] = '排除'
+        notes[violated] = f"规则排除：{_describe_condition(condition)}"
+    
+    fields = [column_mapping.get(field) for field in rules.get('fields', ['title', 'abstract'])]
+    fields = [col for col in fields if col and col in df.columns]
+    if fields:
+        text = df[fields[0]].astype(object).where(df[fields[0]].notna(), '').astype(str)
+        for col in fields[1:]:
+            text = text + '\n' + df[col].astype(object).where(df[col].notna(), '').astype(str)
+        
+        use_regex = rules.get('use_regex', False)
+        open_rows = labels == None  # noqa: E711
+        excluded = _match_keywords(text, rules.get('exclude_keywords', []), use_regex).to_numpy()
+        hit = open_rows & pd.notna(excluded)
+        labels[hit] = '排除'
+        notes[hit] = [f"规则排除：命中关键词“{kw}”" for kw in excluded[hit]]
+        
+        open_rows = labels == None  # noqa: E711
+        included = _match_keywords(text, rules.get('include_keywords', []), use_regex).to_numpy()
+        hit = open_rows & pd.notna(included)
+        include_label = rules.get('include_label', '待定')
+        labels[hit] = include_label
+        notes[hit] = [f"规则{include_label}：命中关键词“{kw}”" for kw in included[hit]]
+    
+    matched = labels != None  # noqa: E711
+    if rules.get('only_unscreened', True) and status is not None:
+        matched &= status == 0
+    
+    positions = np.flatnonzero(matched)
+    return pd.DataFrame({'pos': positions, 'label': labels[positions], 'note': notes[positions]})
+
+def apply_rules(decisions, results):
+    """把规则评估结果写入决策存储（不写自动保存日志），返回写入的篇数"""
+    for (label, note), group in results.groupby(['label', 'note'], sort=False):
+        positions = group['pos'].to_numpy()
+        decisions.set_many(positions, label)
+        decisions.notes.update(dict.fromkeys(positions.tolist(), note))
+    return len(results)
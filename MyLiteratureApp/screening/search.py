@@ -0,0 +1,119 @@
+"""文献筛选核心：倒排索引全文检索"""
+import numpy as np
+import pandas as pd
+
+from .dedup import normalize_text
+
+# ====================== 全文检索 ======================
+SEARCH_MAX_RESULTS = 20
+
+# 英文词项哈希的位置权重（超过32个字符的词只取前32位权重循环使用）
+_TOKEN_WEIGHTS = np.random.default_rng(7).integers(1, 2**63, 32, dtype=np.uint64) | np.uint64(1)
+
+def mix64(values):
+    """splitmix64终混：把词项哈希的各位充分打散，低位也能直接用于分桶"""
+    z = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def _char_ranges(codes, ranges):
+    mask = np.zeros(len(codes), dtype=bool)
+    for low, high in ranges:
+        mask |= (codes >= low) & (codes <= high)
+    return mask
+
+def token_hashes(texts):
+    """对已规范化的文本切分词项并哈希：英文和数字按词，中文按相邻两字（单字词保留单字）
+    
+    返回(文献下标, 64位词项哈希)，同一文献中的重复词项未去重；哈希经过mix64打散，各位均可用
+    """
+    lengths = np.array([len(text) + 1 for text in texts], dtype=np.int64)
+    codes = np.frombuffer(('\x00'.join(texts) + '\x00').encode('utf-32-le'), dtype=np.uint32)
+    codes = codes.astype(np.uint64)
+    doc_of = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+    
+    # 英文/数字：按连续片段聚合，位置加权求和作为词哈希
+    is_word = _char_ranges(codes, [(ord('a'), ord('z')), (ord('0'), ord('9')), (0x00C0, 0x024F)])
+    word_idx = np.flatnonzero(is_word)
+    word_start = is_word & ~np.r_[False, is_word[:-1]]
+    run_of = np.cumsum(word_start)[word_idx] - 1
+    run_first = word_idx[np.r_[True, run_of[1:] != run_of[:-1]]] if len(word_idx) else word_idx
+    offset_in_run = word_idx - run_first[run_of]
+    weighted = codes[word_idx] * _TOKEN_WEIGHTS[offset_in_run % len(_TOKEN_WEIGHTS)]
+    run_bounds = np.flatnonzero(np.r_[True, run_of[1:] != run_of[:-1]]) if len(word_idx) else word_idx
+    word_hashes = np.add.reduceat(weighted, run_bounds) if len(word_idx) else weighted
+    word_docs = doc_of[word_idx[run_bounds]] if len(word_idx) else word_idx
+    
+    # 中文：相邻两字组成词项，前后都不是汉字的单字作为单字词项
+    is_cjk = _char_ranges(codes, [(0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF)])
+    next_cjk = np.r_[is_cjk[1:], False]
+    prev_cjk = np.r_[False, is_cjk[:-1]]
+    bigram_idx = np.flatnonzero(is_cjk & next_cjk)
+    bigram_hashes = (codes[bigram_idx] << np.uint64(21)) | codes[bigram_idx + 1]
+    single_idx = np.flatnonzero(is_cjk & ~next_cjk & ~prev_cjk)
+    
+    docs = np.concatenate([word_docs, doc_of[bigram_idx], doc_of[single_idx]])
+    hashes = np.concatenate([word_hashes, bigram_hashes, codes[single_idx]])
+    return docs, mix64(hashes)
+
+class SearchIndex:
+    """倒排索引，按文献分段构建；每段保存按哈希排序的词表和对应的文献位置"""
+    
+    # 每段的文献数
+    SEGMENT_DOCS = 1 << 13
+    
+    def __init__(self, texts):
+        self.size = len(texts)
+        self.segments = []
+        for start in range(0, len(texts), self.SEGMENT_DOCS):
+            docs, hashes = token_hashes(texts[start:start + self.SEGMENT_DOCS])
+            # 按(词项, 文献)排序后去重；词项哈希完整保留，不与文献下标共用位
+            order = np.lexsort((docs, hashes))
+            hashes, docs = hashes[order], docs[order]
+            new_term = np.r_[True, hashes[1:] != hashes[:-1]] if len(hashes) else np.zeros(0, dtype=bool)
+            keep = new_term | np.r_[True, docs[1:] != docs[:-1]] if len(hashes) else new_term
+            hashes, docs, new_term = hashes[keep], docs[keep], new_term[keep]
+            starts = np.flatnonzero(new_term)
+            self.segments.append((
+                start,
+                hashes[starts],
+                np.r_[starts, len(hashes)].astype(np.int64),
+                docs.astype(np.int32),
+            ))
+    
+    def search(self, query, limit=SEARCH_MAX_RESULTS):
+        """按匹配词项的idf之和排序，返回[(位置, 得分)]"""
+        _, query_hashes = token_hashes([normalize_text(query)])
+        query_hashes = np.unique(query_hashes)
+        if not len(query_hashes):
+            return []
+        
+        # 先收集各段的命中，再按全局文档频率计算idf
+        postings = [[] for _ in query_hashes]
+        for start, vocab, offsets, docs in self.segments:
+            found = np.searchsorted(vocab, query_hashes)
+            for i, term in enumerate(found.tolist()):
+                if term < len(vocab) and vocab[term] == query_hashes[i]:
+                    postings[i].append(docs[offsets[term]:offsets[term + 1]] + start)
+        
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term_postings in postings:
+            if term_postings:
+                positions = np.concatenate(term_postings)
+                scores[positions] += np.log1p(self.size / len(positions))
+        
+        hits = np.flatnonzero(scores)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+        hits = hits[np.lexsort((hits, -scores[hits]))]
+        return [(int(pos), float(scores[pos])) for pos in hits]
+
+def search_texts(df, column_mapping):
+    """拼接映射的标题、摘要及其翻译列作为检索文本"""
+    combined = pd.Series([''] * len(df), index=df.index)
+    for key in ('title', 'title_translation', 'abstract', 'abstract_translation'):
+        col = column_mapping.get(key)
+        if col and col in df.columns:
+            combined = combined + ' ' + df[col].map(normalize_text)
+    return combined.tolist()
@@ -0,0 +1,121 @@
+"""题录文件：RIS、NBIB、BibTeX、WoS和CSV的解析"""
+import csv
+
+import pytest
+
+from screening.citations import (CITATION_COLUMNS, detect_citation_format, read_citation_frame,
+                                 read_citation_header)
+
+RIS = """TY  - JOUR
+AU  - Smith, John
+AU  - Doe, Jane
+TI  - Deep learning for
+  literature screening
+AB  - We study screening.
+PY  - 2020///
+T2  - Journal of Reviews
+DO  - 10.1000/xyz1
+KW  - screening
+KW  - ML
+ER  - 
+
+TY  - JOUR
+TI  - Second paper
+Y1  - 2018/05/01
+ER  - 
+"""
+
+NBIB = """PMID- 123
+TI  - A PubMed title that wraps
+      onto the next line.
+FAU - Smith, John
+AU  - Smith J
+FAU - Li, Wei
+DP  - 2021 Jan 5
+JT  - The Lancet
+LID - 10.1016/abc [doi]
+OT  - cancer
+
+PMID- 456
+TI  - Second
+DP  - 1999
+AID - S0140 [pii]
+"""
+
+BIBTEX = """@string{nat = "Nature"}
+@article{key1,
+  title = {The {Deep} Learning \\& Screening},
+  author = {M{\\"u}ller, Hans and Doe, Jane},
+  journal = nat,
+  year = 2019,
+  doi = {10.1/abc}
+}
+@comment{ignored}
+@book(key2, title = "A (parenthesised) book", year = {2001})
+"""
+
+def _write(tmp_path, name, text, encoding='utf-8'):
+    path = tmp_path / name
+    path.write_text(text, encoding=encoding)
+    return str(path)
+
+def test_detect_format(tmp_path):
+    assert detect_citation_format(_write(tmp_path, 'a.ris', RIS)) == 'ris'
+    assert detect_citation_format(_write(tmp_path, 'b.txt', NBIB)) == 'nbib'
+    assert detect_citation_format(_write(tmp_path, 'c.bib', BIBTEX)) == 'bibtex'
+    assert detect_citation_format(_write(tmp_path, 'd.txt', 'PT\tTI\nJ\tx\n')) == 'wos'
+    assert detect_citation_format(_write(tmp_path, 'e.csv', 'Title\nx\n')) == 'csv'
+
+def test_ris(tmp_path):
+    df = read_citation_frame(_write(tmp_path, 'a.ris', RIS))
+    assert df.columns.tolist() == CITATION_COLUMNS
+    first = df.iloc[0]
+    assert first['Title'] == 'Deep learning for literature screening'
+    assert first['Authors'] == 'Smith, John; Doe, Jane'
+    assert first['Keywords'] == 'screening; ML'
+    assert first['DOI'] == '10.1000/xyz1'
+    assert df['Year'].tolist() == [2020, 2018]
+
+def test_nbib(tmp_path):
+    df = read_citation_frame(_write(tmp_path, 'b.nbib', NBIB))
+    assert df['Title'].tolist() == ['A PubMed title that wraps onto the next line.', 'Second']
+    assert df['Authors'].tolist()[0] == 'Smith, John; Li, Wei'
+    assert df['DOI'].tolist()[0] == '10.1016/abc'
+    assert df['DOI'].isna().tolist()[1]
+    assert df['Year'].tolist() == [2021, 1999]
+
+def test_bibtex(tmp_path):
+    df = read_citation_frame(_write(tmp_path, 'c.bib', BIBTEX))
+    assert df['Title'].tolist() == ['The Deep Learning & Screening', 'A (parenthesised) book']
+    assert df['Authors'].tolist()[0] == 'Muller, Hans; Doe, Jane'
+    assert df['Journal'].tolist()[0] == 'Nature'
+    assert df['Year'].tolist() == [2019, 2001]
+
+def test_wos_long_fields_leave_csv_limit_alone(tmp_path):
+    abstract = 'x' * (200 * 1024)
+    text = ('PT\tAU\tAF\tTI\tSO\tAB\tPY\tDI\n'
+            f'J\tSmith, J\tSmith, John\tWoS "title\tNATURE\t{abstract}\t2017\t10.1038/x\n\n')
+    limit = csv.field_size_limit()
+    df = read_citation_frame(_write(tmp_path, 'd.txt', text))
+    assert csv.field_size_limit() == limit
+    assert df['Title'].tolist() == ['WoS "title']
+    assert len(df['Abstract'].iat[0]) == len(abstract)
+    assert df['Authors'].tolist() == ['Smith, John']
+
+def test_csv_gb18030_and_header(tmp_path):
+    path = _write(tmp_path, 'e.csv', '题名,摘要\n肺癌筛查,研究\n胃癌,内镜\n', encoding='gb18030')
+    columns, sample, total = read_citation_header(path, 1)
+    assert (columns, sample, total) == (['题名', '摘要'], [['肺癌筛查', '研究']], None)
+    assert read_citation_frame(path, columns=['题名'])['题名'].tolist() == ['肺癌筛查', '胃癌']
+
+def test_progress_and_column_subset(tmp_path):
+    calls = []
+    df = read_citation_frame(_write(tmp_path, 'a.ris', RIS), columns=['Title', 'Year'], progress=calls.append)
+    assert df.columns.tolist() == ['Title', 'Year']
+    assert calls[-1] == 2
+
+@pytest.mark.parametrize('name', ['a.ris', 'b.nbib'])
+def test_header_sample(tmp_path, name):
+    columns, sample, total = read_citation_header(_write(tmp_path, name, RIS if name.endswith('ris') else NBIB), 1)
+    assert columns == CITATION_COLUMNS
+    assert len(sample) == 1 and total is None
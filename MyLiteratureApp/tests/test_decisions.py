@@ -0,0 +1,61 @@
+"""决策存储与决策表"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from screening.decisions import DecisionStore, apply_decision_table, get_record_note
+
+def test_counts_follow_updates():
+    decisions = DecisionStore(5)
+    decisions.set(0, '纳入')
+    decisions.set_many([1, 2, 0], '排除')
+    decisions.set(2, '待定')
+    assert decisions.processed == 3
+    assert [decisions.count(label) for label in ('纳入', '待定', '排除')] == [0, 1, 2]
+    assert decisions.positions('排除').tolist() == [0, 1]
+    assert decisions.get(3) is None
+
+def test_from_arrays_rejects_invalid_codes():
+    with pytest.raises(ValueError):
+        DecisionStore.from_arrays([0, 4])
+
+def test_snapshot_and_changed_positions():
+    decisions = DecisionStore(4)
+    decisions.set(0, '纳入')
+    decisions.set_note(1, '待复核')
+    baseline = decisions.snapshot()
+    decisions.set(0, '排除')
+    decisions.set(3, '待定')
+    decisions.set_note(1, '已复核')
+    assert baseline.get(0) == '纳入'
+    assert decisions.changed_positions(baseline).tolist() == [0, 1, 3]
+
+def test_apply_table_last_row_wins_and_notes():
+    decisions = DecisionStore(3)
+    table = pd.DataFrame({'序号': [1, 2, 2, 9, 3], '分类': ['纳入', '纳入', '排除', '纳入', '无效'],
+                          '备注': ['好', None, '重复', None, None]})
+    applied, unmatched = apply_decision_table(decisions, np.array([1, 2, 3]), table)
+    assert (applied, unmatched) == (2, 1)
+    assert decisions.status.tolist() == [1, 3, 0]
+    assert decisions.notes == {0: '好', 1: '重复'}
+
+def test_apply_table_matches_text_serials():
+    decisions = DecisionStore(3)
+    table = pd.DataFrame({'序号': ['A-12', ' 7 ', 3.0], '分类': ['排除', '纳入', '待定']})
+    assert apply_decision_table(decisions, np.array(['A-11', 'A-12', 7], dtype=object), table) == (2, 1)
+    assert decisions.status.tolist() == [0, 3, 1]
+
+def test_apply_table_duplicate_serials_follow_row_order():
+    decisions = DecisionStore(5)
+    table = pd.DataFrame({'序号': [5, 5, 1, 5], '分类': ['纳入', '排除', '待定', '纳入']})
+    applied, unmatched = apply_decision_table(decisions, np.array([5, 1, 5, 2, 1]), table)
+    assert (applied, unmatched) == (3, 1)
+    assert decisions.status.tolist() == [1, 2, 3, 0, 0]
+
+def test_record_note_prefers_screening_note():
+    df = pd.DataFrame({'备注': ['原备注', None]})
+    decisions = DecisionStore(2)
+    assert get_record_note(df, decisions, 0) == '原备注'
+    assert get_record_note(df, decisions, 1) == ''
+    decisions.set_note(0, '新备注')
+    assert get_record_note(df, decisions, 0) == '新备注'
@@ -0,0 +1,32 @@
+"""近似重复检测"""
+import numpy as np
+import pandas as pd
+
+from screening.dedup import dedup_texts, find_duplicate_groups, normalize_text, shingle_hashes
+
+def test_normalize_text():
+    assert normalize_text('Ｄｅｅｐ  Learning: A-Review!') == 'deep learning a review'
+    assert normalize_text(None) == ''
+    assert normalize_text(float('nan')) == ''
+
+def test_shingles_do_not_cross_documents():
+    docs, values, offsets = shingle_hashes(['abcd', '', 'abcd'])
+    assert docs.tolist() == [0, 2]
+    assert offsets.tolist() == [0, 1]
+    assert len(values) == 2
+    docs, _, _ = shingle_hashes(['ab', 'cd'])
+    assert len(docs) == 0
+
+def test_groups_near_duplicates():
+    base = 'randomised controlled trial of exercise therapy for chronic low back pain in adults'
+    texts = [base, 'an unrelated study of soil bacteria in alpine meadows over ten years',
+             base + ' a', '', '深度学习在医学影像诊断中的应用研究综述与展望', '深度学习在医学影像诊断中的应用研究综述与展望。']
+    groups = find_duplicate_groups([normalize_text(text) for text in texts])
+    assert groups[0] == groups[2] == 0
+    assert groups[4] == groups[5] == 4
+    assert groups[[1, 3]].tolist() == [-1, -1]
+
+def test_dedup_texts_joins_mapped_columns():
+    df = pd.DataFrame({'Title': ['A Study', None], 'Abstract': ['Some text.', 'Only abstract']})
+    assert dedup_texts(df, {'title': 'Title', 'abstract': 'Abstract'}) == ['a study some text', 'only abstract']
+    assert dedup_texts(df, {'title': 'Missing'}) == ['', '']
@@ -0,0 +1,106 @@
+"""结果导出：用openpyxl读回只写模式写出的xlsx"""
+import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from screening.decisions import DecisionStore, serial_digest
+from screening.export import (ALL_SHEET_FILLS, CATEGORY_SHEETS, CHANGES_SHEET, SERIAL_DIGEST_PROPERTY,
+                              SOURCE_HASH_PROPERTY, SplitSheetWriter, new_workbook, write_changes_workbook,
+                              write_results_workbook)
+from screening.resume import workbook_properties
+
+def _values(ws):
+    return [list(row) for row in ws.iter_rows(values_only=True)]
+
+def _frame():
+    return pd.DataFrame({
+        '序号': [1, 2, 3, 4],
+        '标题': ['A & B <i>x</i> "q"', '  前后空白  ', 'bad\x01\x0bchar', None],
+        '得分': [1.5, np.nan, 0.1, -2.0],
+        '日期': [datetime.datetime(2024, 1, 2, 3, 4, 5), None, None, None],
+    })
+
+def _decisions():
+    decisions = DecisionStore(4)
+    decisions.set(0, '纳入')
+    decisions.set(1, '待定')
+    decisions.set(2, '排除')
+    decisions.set_note(0, '符合 <标准>')
+    return decisions
+
+def test_results_workbook_round_trip(tmp_path):
+    path = tmp_path / 'results.xlsx'
+    write_results_workbook(str(path), _frame(), _decisions())
+    wb = load_workbook(path)
+    assert wb.sheetnames == ['所有文献'] + [sheet for sheet, _, _ in CATEGORY_SHEETS]
+    
+    rows = _values(wb['所有文献'])
+    assert rows[0] == ['序号', '标题', '得分', '日期', '备注']
+    assert rows[1] == [1, 'A & B <i>x</i> "q"', 1.5, datetime.datetime(2024, 1, 2, 3, 4, 5), '符合 <标准>']
+    # 没有备注时写出空字符串，openpyxl读回为None
+    assert rows[2] == [2, '  前后空白  ', None, None, None]
+    assert rows[3] == [3, 'badchar', 0.1, None, None]
+    assert rows[4] == [4, None, -2.0, None, None]
+    
+    assert [[row[0] for row in _values(wb[sheet])[1:]] for sheet, _, _ in CATEGORY_SHEETS] == [[1], [2], [3]]
+
+def test_results_workbook_fills(tmp_path):
+    path = tmp_path / 'results.xlsx'
+    write_results_workbook(str(path), _frame(), _decisions())
+    wb = load_workbook(path)
+    ws = wb['所有文献']
+    assert [ws.cell(row, 1).fill.fgColor.rgb for row in (2, 3, 4)] == \
+        [ALL_SHEET_FILLS['纳入'], ALL_SHEET_FILLS['待定'], ALL_SHEET_FILLS['排除']]
+    assert ws.cell(5, 1).fill.fill_type is None
+    assert ws.cell(2, 2).fill.fill_type is None
+    for sheet, _, fill in CATEGORY_SHEETS:
+        assert wb[sheet].cell(2, 1).fill.fgColor.rgb == fill
+
+def test_existing_note_column_is_overwritten(tmp_path):
+    df = pd.DataFrame({'序号': [1, 2], '备注': ['原备注', '保留']})
+    decisions = DecisionStore(2)
+    decisions.set_note(0, '新备注')
+    path = tmp_path / 'results.xlsx'
+    write_results_workbook(str(path), df, decisions)
+    assert _values(load_workbook(path)['所有文献']) == [['序号', '备注'], [1, '新备注'], [2, '保留']]
+
+def test_sheets_split_at_row_limit(tmp_path):
+    path = tmp_path / 'split.xlsx'
+    wb = new_workbook()
+    writer = SplitSheetWriter(wb, '所有文献', ['序号'], max_rows=3)
+    for i in range(5):
+        writer.append([i], 'FF90EE90')
+    wb.save(path)
+    
+    wb = load_workbook(path)
+    assert wb.sheetnames == ['所有文献', '所有文献_2', '所有文献_3']
+    assert [_values(wb[name]) for name in wb.sheetnames] == [
+        [['序号'], [0], [1]], [['序号'], [2], [3]], [['序号'], [4]]]
+    assert wb['所有文献_3'].cell(2, 1).fill.fgColor.rgb == 'FF90EE90'
+
+def test_changes_workbook(tmp_path):
+    decisions = _decisions()
+    baseline = decisions.snapshot()
+    decisions.set(1, '纳入')
+    decisions.set_note(3, '补充')
+    path = tmp_path / 'changes.xlsx'
+    assert write_changes_workbook(str(path), _frame(), decisions, baseline) == 2
+    
+    wb = load_workbook(path)
+    assert wb.sheetnames == [CHANGES_SHEET]
+    rows = _values(wb[CHANGES_SHEET])
+    assert rows[0][-3:] == ['备注', '原分类', '分类']
+    assert [(row[0], row[-3], row[-2], row[-1]) for row in rows[1:]] == [
+        (2, None, '待定', '纳入'), (4, '补充', '未处理', '未处理')]
+    assert wb[CHANGES_SHEET].cell(2, 1).fill.fgColor.rgb == ALL_SHEET_FILLS['纳入']
+
+def test_values_openpyxl_rejects_and_properties(tmp_path):
+    df = pd.DataFrame({'序号': [1], '时间': [pd.Timestamp('2024-01-02 03:04', tz='UTC')], '得分': [np.inf]})
+    path = tmp_path / 'results.xlsx'
+    write_results_workbook(str(path), df, DecisionStore(1), file_hash='abc')
+    assert _values(load_workbook(path)['所有文献'])[1][:3] == [1, datetime.datetime(2024, 1, 2, 3, 4), 'inf']
+    properties = workbook_properties(str(path))
+    assert properties[SOURCE_HASH_PROPERTY] == 'abc'
+    assert properties[SERIAL_DIGEST_PROPERTY] == serial_digest(df['序号'])
@@ -0,0 +1,75 @@
+"""导入缓存、表格预处理和列名识别"""
+import os
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from screening import ingest
+from screening.ingest import (detect_column_candidates, evict_ingest_cache, ingest_cache_path, load_cached_frame,
+                              load_workbook, prepare_frame, prune_upload_sources, screening_columns,
+                              store_cached_frame, store_upload_source)
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, 'INGEST_CACHE_DIR', str(tmp_path / 'cache'))
+    return tmp_path / 'cache'
+
+def test_cache_round_trip():
+    df = pd.DataFrame({'标题': ['a', 'b'], '年份': [2020, 2021]})
+    assert load_cached_frame('h1') is None
+    assert store_cached_frame('h1', df)
+    pd.testing.assert_frame_equal(load_cached_frame('h1'), df, check_dtype=False)
+    # 列名不全是文本的表格不缓存
+    assert not store_cached_frame('h2', pd.DataFrame({2020: [1]}))
+    assert load_cached_frame('h2') is None
+
+def test_eviction_drops_least_recently_used():
+    df = pd.DataFrame({'标题': ['x' * 1000] * 10})
+    for key in ('old', 'new'):
+        store_cached_frame(key, df)
+    os.utime(ingest_cache_path('old'), (0, 0))
+    evict_ingest_cache(max_bytes=os.path.getsize(ingest_cache_path('new')))
+    assert not os.path.exists(ingest_cache_path('old'))
+    assert os.path.exists(ingest_cache_path('new'))
+
+def test_upload_sources_survive_cache_eviction():
+    source = store_upload_source(b'x' * 1000, 'src', '.xlsx')
+    store_cached_frame('frame', pd.DataFrame({'标题': ['x' * 1000] * 10}))
+    os.utime(source, (0, 0))
+    evict_ingest_cache(max_bytes=0)
+    assert not os.path.exists(ingest_cache_path('frame'))
+    assert os.path.exists(source)
+    # 原始文件只在超过保留时间未使用时清理
+    prune_upload_sources()
+    assert not os.path.exists(source)
+
+def test_load_workbook_uses_cache(tmp_path):
+    wb = openpyxl.Workbook()
+    wb.active.append(['Title', 'Abstract'])
+    wb.active.append(['A', 'B'])
+    path = str(tmp_path / 'input.xlsx')
+    wb.save(path)
+    
+    df, file_hash = load_workbook(path)
+    assert df.columns.tolist() == ['序号', 'Title', 'Abstract']
+    assert os.path.exists(ingest_cache_path(file_hash))
+    cached, cached_hash = load_workbook(path)
+    assert cached_hash == file_hash
+    assert cached['序号'].tolist() == [1]
+
+def test_prepare_frame_keeps_existing_serials():
+    df = pd.DataFrame({'序号': [5, 9], '标题': ['a', 'b']})
+    assert prepare_frame(df)['序号'].tolist() == [5, 9]
+
+def test_detect_column_candidates():
+    df = pd.DataFrame(columns=['Citation', 'Title', '标题翻译', 'Abstract', 'English Abstract', 'Year'])
+    candidates = detect_column_candidates(df)
+    assert candidates['title'] == ['Title', 'Citation']
+    assert candidates['title_translation'] == ['标题翻译']
+    assert candidates['abstract'] == ['Abstract']
+    assert candidates['abstract_translation'] == ['English Abstract']
+
+def test_screening_columns_keep_source_order():
+    columns = ['序号', 'Year', 'Title', 'Abstract', 'Notes']
+    assert screening_columns(columns, {'title': 'Title', 'abstract': None}, ['Year']) == ['序号', 'Year', 'Title']
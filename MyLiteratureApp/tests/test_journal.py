@@ -0,0 +1,69 @@
+"""自动保存日志：写入、恢复与压缩"""
+import pytest
+
+from screening.decisions import DecisionStore
+from screening.journal import DecisionJournal, restore_decisions
+
+@pytest.fixture
+def journal(tmp_path):
+    return DecisionJournal(str(tmp_path / 'journal.sqlite3'))
+
+def test_latest_entry_per_position_wins(journal):
+    journal.append('f', 0, 'status', '纳入')
+    journal.append('f', 0, 'status', '排除')
+    journal.append('f', 1, 'note', '待复核')
+    journal.append('other', 2, 'status', '纳入')
+    latest = journal.latest('f')
+    assert sorted(latest.itertuples(index=False, name=None)) == [(0, 'status', '排除'), (1, 'note', '待复核')]
+
+def test_reviewers_are_kept_apart(journal):
+    journal.append_many('f', [0, 1], 'status', ['纳入', '排除'], reviewer='甲')
+    journal.append('f', 0, 'status', '待定')
+    assert journal.reviewers('f') == ['甲']
+    decisions = DecisionStore(2)
+    assert restore_decisions(journal, 'f', decisions, '甲') == 2
+    assert decisions.status.tolist() == [1, 3]
+
+def test_restore_replays_over_existing_decisions(journal):
+    # 打开项目文件后，日志中保存之后的决策覆盖文件中的决策，其余保持不变
+    decisions = DecisionStore(4)
+    decisions.set_many([0, 1], '纳入')
+    journal.append('f', 1, 'status', '排除')
+    journal.append('f', 2, 'status', '待定')
+    journal.append('f', 2, 'note', '需全文')
+    journal.append('f', 9, 'status', '纳入')
+    assert restore_decisions(journal, 'f', decisions) == 2
+    assert decisions.status.tolist() == [1, 3, 2, 0]
+    assert decisions.notes == {2: '需全文'}
+
+def test_restore_compacts_history(journal):
+    for label in ['纳入', '排除', '待定', '纳入', '排除']:
+        journal.append('f', 0, 'status', label)
+    assert journal.size('f') == 5
+    restore_decisions(journal, 'f', DecisionStore(1))
+    assert journal.size('f') == 1
+
+def test_compact_keeps_rows_written_after_reading(journal):
+    # 另一个标签页在本会话读取最新记录之后写入的决策不能被压缩删除
+    for label in ['纳入', '排除', '待定']:
+        journal.append('f', 0, 'status', label)
+    stale = journal.latest('f')
+    journal.append('f', 1, 'status', '排除')
+    latest = journal.compact('f')
+    assert len(stale) == 1
+    assert sorted(latest.itertuples(index=False, name=None)) == [(0, 'status', '待定'), (1, 'status', '排除')]
+    assert journal.size('f') == 2
+    journal.append('f', 0, 'status', '纳入')
+    assert sorted(journal.latest('f').itertuples(index=False, name=None)) == [
+        (0, 'status', '纳入'), (1, 'status', '排除')]
+
+def test_restore_replays_resets(journal):
+    # 先分类再改回未处理（表格模式），恢复到项目文件中已有的分类上时以重置为准
+    decisions = DecisionStore(2)
+    decisions.set_many([0, 1], '纳入')
+    journal.append('f', 0, 'status', '排除')
+    journal.append('f', 0, 'status', '未处理')
+    journal.append('f', 1, 'status', '待定')
+    restore_decisions(journal, 'f', decisions)
+    assert decisions.status.tolist() == [0, 2]
+    assert decisions.processed == 1
@@ -0,0 +1,40 @@
+"""多文件合并去重"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from screening.merge import (MAX_MERGE_FILES, PROVENANCE_COLUMN, SOURCE_SERIAL_COLUMN, duplicate_labels,
+                             merge_frames, normalize_doi, normalize_title)
+
+def test_normalize_keys():
+    dois = pd.Series(['https://doi.org/10.1/ABC', 'doi: 10.1/abc', None, ' 10.2/x '])
+    assert normalize_doi(dois).tolist() == ['10.1/abc', '10.1/abc', '', '10.2/x']
+    assert normalize_title(pd.Series(['Deep-Learning: A Review!', None])).tolist() == ['deeplearningareview', '']
+
+def test_same_title_different_doi_not_linked():
+    doi = np.array(['10.1/a', '10.1/b', '', '10.1/a'])
+    title = np.array(['a long shared title'] * 3 + ['another long title'])
+    assert duplicate_labels(doi, title).tolist() == [0, 1, 2, 0]
+
+def test_links_through_doi_and_title():
+    doi = np.array(['', '10.1/a', '10.1/a', ''])
+    title = np.array(['a long shared title', 'a long shared title', 'something else here', 'short'])
+    assert duplicate_labels(doi, title).tolist() == [0, 0, 0, 3]
+
+def test_merge_frames_fills_blanks_and_records_sources():
+    wos = pd.DataFrame({'序号': [1, 2], 'TI': ['Deep learning for screening', 'Unique paper title'],
+                        'DI': ['10.1/x', None], 'AB': [None, 'abstract two']})
+    scopus = pd.DataFrame({'Title': ['Deep Learning for Screening.', 'Another unique title'],
+                           'DOI': ['https://doi.org/10.1/X', None], 'Abstract': ['abstract one', None]})
+    merged, n_duplicates = merge_frames([wos, scopus], ['wos.txt', 'scopus.csv'])
+    
+    assert n_duplicates == 1
+    assert merged['TI'].tolist() == ['Deep learning for screening', 'Unique paper title', 'Another unique title']
+    assert merged['AB'].tolist()[:2] == ['abstract one', 'abstract two']
+    assert merged[SOURCE_SERIAL_COLUMN].tolist()[:2] == [1, 2]
+    assert merged[PROVENANCE_COLUMN].tolist() == ['wos.txt; scopus.csv', 'wos.txt', 'scopus.csv']
+
+def test_merge_limit():
+    frames = [pd.DataFrame({'Title': ['x']})] * (MAX_MERGE_FILES + 1)
+    with pytest.raises(ValueError):
+        merge_frames(frames, [str(i) for i in range(len(frames))])
@@ -0,0 +1,50 @@
+"""分阶段耗时和内存指标"""
+import json
+
+from screening.metrics import MetricsRegistry, RunTimer
+
+def test_timer_records_phases_and_outputs(tmp_path):
+    registry = MetricsRegistry(directory=str(tmp_path), window=2)
+    for _ in range(3):
+        timer = RunTimer(registry, 'export', session='s"1')
+        timer.mark('prepare')
+        timer.stage_clock('sheet')('所有文献')
+        timer.finish({'df': 1024})
+    
+    summary = registry.summary()
+    assert set(summary['阶段']) == {'prepare', 'sheet.所有文献', 'total'}
+    assert summary['次数'].tolist() == [3, 3, 3]
+    assert all(len(samples) == 2 for samples in registry.samples.values())
+    
+    lines = (tmp_path / 'metrics.jsonl').read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 3
+    record = json.loads(lines[-1])
+    assert record['kind'] == 'export'
+    assert set(record['phases_ms']) == {'prepare', 'sheet.所有文献', 'total'}
+    
+    prom = (tmp_path / 'metrics.prom').read_text(encoding='utf-8')
+    assert 'lrt_phase_seconds_count{kind="export",phase="prepare"} 3' in prom
+    assert 'lrt_session_memory_bytes{session="s\\"1",item="df"} 1024' in prom
+
+def test_jsonl_rotates_when_full(tmp_path):
+    registry = MetricsRegistry(directory=str(tmp_path), jsonl_max_bytes=1)
+    for _ in range(3):
+        RunTimer(registry, 'rerun').finish()
+    # 每次追加前发现已超过上限，轮转后只保留一份旧日志
+    assert len((tmp_path / 'metrics.jsonl').read_text(encoding='utf-8').splitlines()) == 1
+    assert len((tmp_path / 'metrics.jsonl.1').read_text(encoding='utf-8').splitlines()) == 1
+    assert registry.counts[('rerun', 'total')] == 3
+
+def test_timer_without_registry():
+    timer = RunTimer(None, 'rerun')
+    timer.mark('render')
+    timer.finish()
+    assert timer.finished
+    assert set(timer.phases) == {'render'}
+
+def test_unwritable_directory_is_ignored(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    registry = MetricsRegistry(directory=str(blocker / 'metrics'))
+    RunTimer(registry, 'rerun').finish()
+    assert registry.counts[('rerun', 'total')] == 1
@@ -0,0 +1,44 @@
+"""Arrow项目文件"""
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from screening.decisions import DecisionStore
+from screening.project import is_project_file, load_project, save_project
+
+def test_round_trip(tmp_path):
+    df = pd.DataFrame({'序号': [1, 2, 3], '标题': ['a', 'b', 'c'], '混合': [1, 'x', None]})
+    decisions = DecisionStore(3)
+    decisions.set(0, '纳入')
+    decisions.set(2, '排除')
+    decisions.set_note(1, '稍后再看')
+    path = str(tmp_path / 'review.feather')
+    save_project(path, df, decisions, file_hash='abc', column_mapping={'title': '标题'},
+                 extra_columns={'序号': True}, current_index=7)
+    
+    project = load_project(path)
+    assert project.df.columns.tolist() == ['序号', '标题', '混合']
+    assert project.df['标题'].tolist() == ['a', 'b', 'c']
+    # 文本列保持Arrow存储，不转换为Python对象
+    assert project.df['标题'].dtype == pd.StringDtype('pyarrow', na_value=float('nan'))
+    assert project.df['混合'].tolist()[:2] == ['1', 'x']
+    assert project.decisions.status.tolist() == [1, 0, 3]
+    assert project.decisions.notes == {1: '稍后再看'}
+    assert project.file_hash == 'abc'
+    assert project.column_mapping == {'title': '标题'}
+    assert project.extra_columns == {'序号': True}
+    # 超出范围的当前位置截到最后一篇
+    assert project.current_index == 2
+
+def test_rejects_plain_arrow_file(tmp_path):
+    path = str(tmp_path / 'plain.arrow')
+    table = pa.table({'a': [1]})
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    with pytest.raises(ValueError):
+        load_project(path)
+
+def test_is_project_file():
+    assert is_project_file('review.FEATHER')
+    assert is_project_file('review.arrow')
+    assert not is_project_file('review.xlsx')
@@ -0,0 +1,46 @@
+"""筛选视图"""
+import numpy as np
+import pandas as pd
+
+from screening.decisions import DecisionStore
+from screening.queues import ColumnValueIndex, ScreeningQueue, note_presence
+
+def test_incremental_update_matches_rebuild():
+    decisions = DecisionStore(8)
+    base_notes = note_presence(pd.DataFrame({'备注': [None, '旧备注', ' ', None, None, None, None, None]}))
+    assert base_notes.tolist() == [False, True, False, False, False, False, False, False]
+    
+    queue = ScreeningQueue(decisions, base_notes, statuses=['待定', '纳入'], note=False)
+    assert len(queue) == 0
+    decisions.set_many([0, 1, 4, 6], '待定')
+    queue.update([0, 1, 4, 6])
+    decisions.set(4, '排除')
+    decisions.set_note(6, '有疑问')
+    decisions.set_note(1, '')
+    queue.update([4, 6, 1])
+    
+    rebuilt = ScreeningQueue(decisions, base_notes, statuses=['待定', '纳入'], note=False)
+    assert queue.positions.tolist() == rebuilt.positions.tolist() == [0, 1]
+    assert np.array_equal(queue.member, rebuilt.member)
+
+def test_navigation():
+    decisions = DecisionStore(10)
+    queue = ScreeningQueue(decisions, np.zeros(10, dtype=bool), static_mask=np.isin(np.arange(10), [2, 5, 7]))
+    assert queue.next_after(5) == 7
+    assert queue.next_after(7) is None
+    assert queue.prev_before(5) == 2
+    assert queue.prev_before(2) is None
+    assert queue.first_from(3) == 5
+    assert queue.first_from(9) == 7
+    assert queue.rank(7) == 2
+
+def test_column_value_index():
+    years = ColumnValueIndex(pd.Series([2019, 2021, None, 2020]))
+    assert years.numeric
+    assert years.bounds() == (2019, 2021)
+    assert years.range_mask(2020, 2021).tolist() == [False, True, False, True]
+    
+    journals = ColumnValueIndex(pd.Series(['B', 'A', 'B', None]))
+    assert not journals.numeric
+    assert journals.options() == ['B', 'A']
+    assert journals.value_mask(['A', '不存在']).tolist() == [False, True, False, False]
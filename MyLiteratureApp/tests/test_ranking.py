@@ -0,0 +1,28 @@
+"""优先级排序：哈希特征与逻辑回归"""
+import numpy as np
+
+from screening.dedup import normalize_text
+from screening.ranking import build_feature_matrix, train_ranker
+
+def _features(texts):
+    return build_feature_matrix([normalize_text(text) for text in texts])
+
+def test_bigrams_sharing_second_char_get_distinct_features():
+    # 肺癌与胃癌第二个字相同，分桶时不能落到同一特征
+    features = _features(['肺癌', '胃癌'])
+    assert features['cols'][0] != features['cols'][1]
+
+def test_rows_are_l2_normalised():
+    features = _features(['lung cancer screening', 'cancer cancer therapy', ''])
+    assert features['n'] == 3
+    assert features['indptr'].tolist()[-1] == len(features['vals'])
+    norms = np.bincount(features['rows'], weights=features['vals'].astype(np.float64) ** 2, minlength=3)
+    assert np.allclose(norms, [1, 1, 0])
+
+def test_ranker_separates_chinese_topics():
+    texts = ['肺癌靶向治疗研究'] * 5 + ['胃癌内镜筛查'] * 5 + ['肺癌免疫治疗', '胃癌内镜随访']
+    features = _features(texts)
+    positions = np.arange(10)
+    labels = np.r_[np.ones(5), np.zeros(5)]
+    probs = train_ranker(features, positions, labels)
+    assert probs[10] > 0.5 > probs[11]
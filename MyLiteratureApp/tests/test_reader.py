@@ -0,0 +1,57 @@
+"""Excel快速读取引擎"""
+import openpyxl
+import pytest
+
+from screening import reader
+from screening.reader import read_workbook_frame, read_workbook_header, sample_frame
+
+@pytest.fixture
+def workbook(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['Title', None, 'Title', 2020.0])
+    ws.append(['A', 'x', 'B', 1.0])
+    ws.append([None, None, None, None])
+    ws.append(['C', None, None, 3.0])
+    ws.append([None, None, None, None])
+    other = wb.create_sheet('其他')
+    other.append(['序号'])
+    other.append([7])
+    path = tmp_path / 'input.xlsx'
+    wb.save(path)
+    return str(path)
+
+@pytest.fixture(params=['calamine', 'openpyxl'])
+def engine(request, monkeypatch):
+    if request.param == 'openpyxl':
+        monkeypatch.setattr(reader, 'python_calamine', None)
+    elif reader.python_calamine is None:
+        pytest.skip('python-calamine未安装')
+    return request.param
+
+def test_frame_matches_pandas_layout(workbook, engine):
+    df = read_workbook_frame(workbook)
+    assert df.columns.tolist() == ['Title', 'Unnamed: 1', 'Title.1', 2020]
+    # 中间的空行保留，末尾的空行去掉
+    assert df['Title'].isna().tolist() == [False, True, False]
+    assert df['Title'].iloc[[0, 2]].tolist() == ['A', 'C']
+    assert df[2020].tolist()[0] == 1.0
+
+def test_projection_keeps_row_positions(workbook, engine):
+    seen = []
+    df = read_workbook_frame(workbook, columns=['Title.1'], progress=seen.append)
+    assert df.columns.tolist() == ['Title.1']
+    assert df['Title.1'].isna().tolist() == [False, True, True]
+    assert seen[-1] == 3
+
+def test_named_sheet_and_integer_column(workbook, engine):
+    df = read_workbook_frame(workbook, sheet='其他')
+    assert df['序号'].tolist() == [7]
+    assert df['序号'].dtype.kind == 'i'
+
+def test_header_and_sample(workbook):
+    header, sample, total_rows = read_workbook_header(workbook, sample_rows=1)
+    assert header == ['Title', 'Unnamed: 1', 'Title.1', 2020]
+    assert total_rows == 4
+    preview = sample_frame(header, sample)
+    assert preview.iloc[0].tolist() == ['A', 'x', 'B', 1.0]
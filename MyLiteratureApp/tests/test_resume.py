@@ -0,0 +1,76 @@
+"""从导出结果恢复筛选进度"""
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from screening.decisions import DecisionStore
+from screening.export import write_results_workbook
+from screening.resume import is_results_workbook, load_results_workbook, workbook_sheet_names
+
+def _export(tmp_path, serials, labels, notes=None, file_hash=None):
+    df = pd.DataFrame({'序号': serials, '标题': [f'Title {i}' for i in range(len(serials))]})
+    decisions = DecisionStore(len(df))
+    for pos, label in enumerate(labels):
+        if label:
+            decisions.set(pos, label)
+    decisions.notes.update(notes or {})
+    path = tmp_path / 'results.xlsx'
+    write_results_workbook(str(path), df, decisions, file_hash=file_hash)
+    return str(path)
+
+def test_round_trip_numeric_serials(tmp_path):
+    path = _export(tmp_path, [1, 2, 3, 4], ['纳入', None, '排除', '待定'], {0: '符合'})
+    assert is_results_workbook(path)
+    project = load_results_workbook(path)
+    assert project.decisions.status.tolist() == [1, 0, 3, 2]
+    assert project.current_index == 1
+    assert project.unmatched_rows == 0
+    assert project.df['备注'].tolist()[0] == '符合'
+    assert project.decisions.notes == {0: '符合'}
+
+def test_source_hash_links_journal_only_if_order_unchanged(tmp_path):
+    path = _export(tmp_path, [3, 1, 2], ['纳入', None, None], file_hash='abc123')
+    assert load_results_workbook(path).file_hash == 'abc123'
+    assert load_workbook(path).custom_doc_props['LiteratureReviewFileHash'].value == 'abc123'
+    assert load_results_workbook(_export(tmp_path, [3, 1, 2], ['纳入', None, None])).file_hash is None
+    
+    # 在Excel中排序后，位置与原来的日志对不上，不再关联
+    wb = load_workbook(path)
+    sheet = wb['所有文献']
+    rows = sorted(sheet.iter_rows(min_row=2, values_only=True))
+    for row_idx, row in enumerate(rows, start=2):
+        for col_idx, value in enumerate(row, start=1):
+            sheet.cell(row_idx, col_idx, value)
+    wb.save(path)
+    project = load_results_workbook(path)
+    assert project.file_hash is None
+    assert project.decisions.status.tolist() == [0, 0, 1]
+
+def test_text_serials(tmp_path):
+    path = _export(tmp_path, ['A-1', 'A-2', 'B-12'], ['排除', None, '纳入'])
+    project = load_results_workbook(path)
+    assert project.decisions.status.tolist() == [3, 0, 1]
+    assert project.unmatched_rows == 0
+
+def test_duplicate_serials_follow_row_order(tmp_path):
+    path = _export(tmp_path, [1, 1, 2, 1], ['纳入', '纳入', '排除', None])
+    project = load_results_workbook(path)
+    assert project.decisions.status.tolist() == [1, 1, 3, 0]
+    assert project.unmatched_rows == 0
+
+def test_unmatched_rows_are_counted(tmp_path):
+    path = _export(tmp_path, [1, 2], ['纳入', '排除'])
+    wb = load_workbook(path)
+    wb['排除文章'].append([99, 'Unknown', None])
+    wb.save(path)
+    project = load_results_workbook(path)
+    assert project.decisions.status.tolist() == [1, 3]
+    assert project.unmatched_rows == 1
+
+def test_rejects_other_workbooks(tmp_path):
+    path = tmp_path / 'plain.xlsx'
+    pd.DataFrame({'标题': ['x']}).to_excel(path, index=False)
+    assert workbook_sheet_names(str(path)) == ['Sheet1']
+    assert not is_results_workbook(str(path))
+    with pytest.raises(ValueError):
+        load_results_workbook(str(path))
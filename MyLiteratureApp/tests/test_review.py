@@ -0,0 +1,45 @@
+"""多人筛选对照和一致性统计"""
+import numpy as np
+import pytest
+
+from screening.review import ReviewBoard
+
+def test_incremental_counts_match_rebuild():
+    board = ReviewBoard(6)
+    board.add_reviewer('甲', [1, 1, 3, 0, 2, 0])
+    board.add_reviewer('乙', [1, 3, 3, 2, 0, 0])
+    board.set('乙', [4, 5], '排除')
+    board.set('甲', [1], '排除')
+    
+    rebuilt = ReviewBoard(6)
+    rebuilt.add_reviewer('甲', board.columns['甲'])
+    rebuilt.add_reviewer('乙', board.columns['乙'])
+    assert np.array_equal(board.pairs[('乙', '甲')], rebuilt.pairs[('乙', '甲')])
+    assert np.array_equal(board.conflict, rebuilt.conflict)
+    assert board.n_conflicts == rebuilt.n_conflicts == 1
+
+def test_conflicts_and_agreement():
+    board = ReviewBoard(4)
+    board.add_reviewer('甲', [1, 1, 3, 3])
+    board.add_reviewer('乙', [1, 3, 3, 0])
+    assert board.conflict.tolist() == [False, True, False, False]
+    assert board.next_conflict(1) == 1
+    assert board.next_conflict(3) == 1
+    assert board.decisions_at(1) == {'甲': '纳入', '乙': '排除'}
+    
+    row = board.agreement().iloc[0]
+    assert row['共同筛选'] == 3
+    assert row['一致率'] == pytest.approx(0.667)
+    assert row['Kappa'] == pytest.approx(0.4)
+    
+    frame = board.frame([10, 11, 12, 13])
+    assert frame['乙'].tolist() == ['纳入', '排除', '排除', '']
+    assert frame['存在分歧'].tolist() == ['', '是', '', '']
+
+def test_agreement_without_overlap():
+    board = ReviewBoard(2)
+    board.add_reviewer('甲', [1, 0])
+    board.add_reviewer('乙', [0, 1])
+    row = board.agreement().iloc[0]
+    assert row['共同筛选'] == 0
+    assert board.next_conflict(0) is None
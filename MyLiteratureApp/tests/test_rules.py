@@ -0,0 +1,58 @@
+"""规则预筛选：关键词与附加条件"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from screening.decisions import DecisionStore
+from screening.rules import apply_rules, evaluate_rules
+
+MAPPING = {'title': '标题', 'abstract': '摘要'}
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        '标题': ['A systematic review of statins', 'Statins in rats', 'Randomized trial of statins', '肺癌综述'],
+        '摘要': ['', 'Effects in mice and rats', None, '文献综述'],
+        '年份': [2020, 2012, 2019, None],
+    })
+
+def test_keywords_and_include_label(df):
+    rules = {'exclude_keywords': ['review', '综述'], 'include_keywords': ['randomized'], 'include_label': '纳入'}
+    results = evaluate_rules(df, MAPPING, rules)
+    assert results['pos'].tolist() == [0, 2, 3]
+    assert results['label'].tolist() == ['排除', '纳入', '排除']
+    assert results['note'].tolist()[0] == '规则排除：命中关键词“review”'
+
+def test_regex_keywords_with_own_groups(df):
+    rules = {'exclude_keywords': [r'(rat|mouse)s?', r'(?P<x>review)'], 'use_regex': True}
+    results = evaluate_rules(df, MAPPING, rules)
+    assert results['pos'].tolist() == [0, 1]
+    assert results['note'].tolist() == ['规则排除：命中关键词“review”', '规则排除：命中关键词“rats”']
+
+def test_conditions_take_precedence_and_skip_missing(df):
+    rules = {'conditions': [{'column': '年份', 'op': 'between', 'value': [2015, None]}],
+             'exclude_keywords': ['statins']}
+    results = evaluate_rules(df, MAPPING, rules)
+    assert results['pos'].tolist() == [0, 1, 2]
+    assert results['note'].tolist()[1] == '规则排除：年份小于2015'
+
+def test_in_condition_matches_integral_floats(df):
+    # 年份列含缺失值，读入后是浮点数2020.0，应与取值2020相等
+    rules = {'conditions': [{'column': '年份', 'op': 'in', 'value': [2020, '2019']}]}
+    assert evaluate_rules(df, MAPPING, rules)['pos'].tolist() == [1]
+    rules = {'conditions': [{'column': '年份', 'op': 'not_in', 'value': [2012.0]}]}
+    assert evaluate_rules(df, MAPPING, rules)['pos'].tolist() == [1]
+
+def test_only_unscreened_and_apply(df):
+    status = np.array([0, 1, 0, 0], dtype=np.int8)
+    results = evaluate_rules(df, MAPPING, {'exclude_keywords': ['statins']}, status=status)
+    assert results['pos'].tolist() == [0, 2]
+    
+    decisions = DecisionStore(len(df))
+    assert apply_rules(decisions, results) == 2
+    assert decisions.get(0) == '排除'
+    assert decisions.get_note(2) == '规则排除：命中关键词“statins”'
+
+def test_unknown_condition_column(df):
+    with pytest.raises(KeyError):
+        evaluate_rules(df, MAPPING, {'conditions': [{'column': '期刊', 'op': 'in', 'value': ['x']}]})
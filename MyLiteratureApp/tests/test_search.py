@@ -0,0 +1,38 @@
+"""全文检索：中文词项哈希与倒排索引"""
+import numpy as np
+
+from screening.dedup import normalize_text
+from screening.search import SearchIndex, mix64, token_hashes
+
+def _index(texts):
+    return SearchIndex([normalize_text(text) for text in texts])
+
+def test_chinese_bigrams_do_not_collide():
+    # 癌(U+764C)与炎(U+708E)只有低13位不同，旧的键拼接方式会把“肺癌”“肺炎”当作同一词项
+    index = _index(['肺炎链球菌感染的临床研究', '非小细胞肺癌的靶向治疗', '胃癌筛查'])
+    assert [pos for pos, _ in index.search('肺癌')] == [1]
+    assert [pos for pos, _ in index.search('肺炎')] == [0]
+
+def test_single_char_and_english_terms():
+    index = _index(['癌 screening', 'Lung cancer screening', 'cancer'])
+    assert [pos for pos, _ in index.search('癌')] == [0]
+    assert sorted(pos for pos, _ in index.search('cancer')) == [1, 2]
+    assert index.search('nothing') == []
+
+def test_rarer_terms_rank_higher():
+    index = _index(['cancer screening', 'cancer therapy', 'cancer therapy trial'])
+    hits = index.search('cancer trial')
+    assert hits[0][0] == 2
+    assert len(hits) == 3
+
+def test_hash_low_bits_are_mixed():
+    _, hashes = token_hashes(['肺癌 肺炎'])
+    assert len(set((hashes & np.uint64(0xFFFF)).tolist())) == 2
+    assert mix64(np.array([1, 2], dtype=np.uint64)).tolist() != [1, 2]
+
+def test_segments_cover_all_documents():
+    texts = [f'doc{i} common' for i in range(SearchIndex.SEGMENT_DOCS + 5)]
+    index = SearchIndex(texts)
+    assert len(index.segments) == 2
+    assert [pos for pos, _ in index.search(f'doc{SearchIndex.SEGMENT_DOCS + 3}')] == [SearchIndex.SEGMENT_DOCS + 3]
+    assert len(index.search('common', limit=10)) == 10